@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -24,3 +24,30 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def ensure_columns():
+    """Mevcut tablolara modelde olup veritabanında olmayan (nullable) kolonları ekle.
+
+    ``create_all`` sadece eksik tabloları oluşturur; yeni eklenen kolonlar eski
+    veritabanlarında bu fonksiyonla tamamlanır. Kolonun ``info["backfill"]`` SQL
+    ifadesi varsa mevcut satırlar bu değerle doldurulur.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                default = ""
+                if column.default is not None and column.default.is_scalar:
+                    value = column.default.arg
+                    default = f" DEFAULT {int(value) if isinstance(value, bool) else repr(value)}"
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}{default}'))
+                if column.info.get("backfill"):
+                    conn.execute(text(f'UPDATE {table.name} SET {column.name} = {column.info["backfill"]}'))
+                print(f"🛠️ Kolon eklendi: {table.name}.{column.name}")
@@ -5,15 +5,17 @@ from fastapi.middleware.cors import CORSMiddleware
 import os
 from dotenv import load_dotenv
 
-from app.database.database import engine, Base
-from app.models import user, document, chat as chat_models  # Import models to create tables
-from app.routers import auth, documents, chat, search
+from app.database.database import engine, Base, ensure_columns
+from app.models import user, document, cache, job, chat as chat_models  # Import models to create tables
+from app.routers import auth, documents, chat, search, embeddings, jobs
+from app.services.rate_limiter import scheduler
 
 # Load environment variables
 load_dotenv()
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+ensure_columns()
 
 app = FastAPI(
     title="AI Document Management System",
@@ -40,6 +42,28 @@ app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(documents.router, prefix="/api/documents", tags=["documents"])
 app.include_router(chat.router, prefix="/api/chat", tags=["chat"])
 app.include_router(search.router, prefix="/api/search", tags=["search"])
+app.include_router(embeddings.router, prefix="/api/embeddings", tags=["embeddings"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+
+# Tek süreçli geliştirme ortamı için: işleme worker'ını API süreci içinde çalıştır
+if os.getenv("EMBEDDED_WORKER", "false").lower() in ("1", "true", "yes"):
+    import asyncio
+    from app.worker import Worker
+    
+    @app.on_event("startup")
+    async def start_embedded_worker():
+        app.state.worker = Worker(concurrency=1)
+        app.state.worker_task = asyncio.create_task(app.state.worker.run())
+    
+    @app.on_event("shutdown")
+    async def stop_embedded_worker():
+        app.state.worker.stop()
+        await app.state.worker_task
+
+@app.get("/api/ai/metrics")
+async def ai_metrics():
+    """Gemini çağrı kuyruğu ve bekleme süresi metrikleri"""
+    return scheduler.metrics()
 
 @app.get("/")
 async def read_root(request: Request):
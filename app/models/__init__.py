@@ -1,5 +1,10 @@
 from .user import User
-from .document import Document, DocumentChunk
+from .document import Document, DocumentChunk, ChunkEmbedding, EmbeddingIndex
 from .chat import ChatSession, ChatMessage
+from .cache import EmbeddingCache, GenerationCache, ExtractionCache
+from .job import ProcessingJob
 
-__all__ = ["User", "Document", "DocumentChunk", "ChatSession", "ChatMessage"]
+__all__ = [
+    "User", "Document", "DocumentChunk", "ChunkEmbedding", "EmbeddingIndex", "ChatSession", "ChatMessage",
+    "EmbeddingCache", "GenerationCache", "ExtractionCache", "ProcessingJob",
+]
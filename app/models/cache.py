@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy.sql import func
+from app.database.database import Base
+
+class EmbeddingCache(Base):
+    __tablename__ = "embedding_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String, unique=True, index=True, nullable=False)  # model:task_type:sha256(normalized text)
+    model = Column(String, nullable=False)
+    task_type = Column(String, nullable=False)
+    embeddings = Column(Text, nullable=False)  # Vector embeddings (JSON)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+class GenerationCache(Base):
+    __tablename__ = "generation_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String, unique=True, index=True, nullable=False)  # sha256(model, prompt version, input)
+    kind = Column(String, nullable=False, index=True)  # summary, keywords, analysis, vision
+    model = Column(String, nullable=False)
+    response = Column(Text, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+class ExtractionCache(Base):
+    __tablename__ = "extraction_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String, unique=True, index=True, nullable=False)  # sha256(extractor, versiyon, içerik hash, ayarlar)
+    extractor = Column(String, nullable=False, index=True)  # pdf, docx, excel, image, ocr_page, ...
+    text = Column(Text, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -12,6 +12,8 @@ class ChatSession(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     is_active = Column(Boolean, default=True)
+    history_summary = Column(Text)  # Rolling summary of turns older than the recent window
+    summarized_until_id = Column(Integer)  # Last ChatMessage.id folded into history_summary
     
     # Relationships
     user = relationship("User", back_populates="chat_sessions")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database.database import Base
@@ -16,7 +16,13 @@ class Document(Base):
     summary = Column(Text)  # AI generated summary
     keywords = Column(Text)  # AI generated keywords (JSON)
     embeddings = Column(Text)  # Vector embeddings for AI search (JSON)
-    processed = Column(Boolean, default=False)
+    processed = Column(Boolean, default=False)  # Searchable: chunks indexed and embedded
+    # Indexing phase: pending | indexing | ready | failed
+    index_status = Column(String, default="pending",
+                          info={"backfill": "CASE WHEN processed THEN 'ready' ELSE 'pending' END"})
+    # Enrichment phase (summary, keywords): pending | running | done | failed
+    enrichment_status = Column(String, default="pending",
+                               info={"backfill": "CASE WHEN summary IS NOT NULL THEN 'done' ELSE 'pending' END"})
     upload_date = Column(DateTime(timezone=True), server_default=func.now())
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
@@ -31,7 +37,37 @@ class DocumentChunk(Base):
     chunk_text = Column(Text, nullable=False)
     chunk_index = Column(Integer, nullable=False)
     embeddings = Column(Text)  # Vector embeddings for this chunk
+    embedding_model = Column(String, index=True)  # Model that produced `embeddings` (NULL = provider default)
+    # Reindex output not yet live: swapped in (and old chunks deleted) in one transaction
+    staged = Column(Boolean, default=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     document = relationship("Document")
+
+class ChunkEmbedding(Base):
+    """Shadow index: chunk vectors from a model other than the active one (migration / rollback)"""
+    __tablename__ = "chunk_embeddings"
+    __table_args__ = (UniqueConstraint("chunk_id", "model", name="uq_chunk_embedding_model"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    chunk_id = Column(Integer, ForeignKey("document_chunks.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    model = Column(String, nullable=False, index=True)
+    embeddings = Column(Text, nullable=False)  # Vector embeddings (JSON)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class EmbeddingIndex(Base):
+    """Per-user embedding index state: active model and shadow migration progress"""
+    __tablename__ = "embedding_indexes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True, index=True)
+    active_model = Column(String)  # NULL = provider default
+    previous_model = Column(String)  # Rollback target
+    shadow_model = Column(String)  # Migration target
+    status = Column(String, default="idle")  # idle | shadowing | ready | failed
+    total_chunks = Column(Integer, default=0)
+    shadowed_chunks = Column(Integer, default=0)
+    last_error = Column(Text)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
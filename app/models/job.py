@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database.database import Base
+
+class ProcessingJob(Base):
+    __tablename__ = "processing_jobs"
+    __table_args__ = (Index("ix_processing_jobs_claim", "status", "priority", "run_after"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String, nullable=False)  # index_document, enrich_document, embed_shadow
+    document_id = Column(Integer, index=True)  # No FK: job history must not block document deletion
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    priority = Column(Integer, nullable=False, default=0)  # Higher runs first
+    status = Column(String, nullable=False, default="queued")  # queued | running | succeeded | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime(timezone=True), nullable=False)  # Not claimed before this time (retry backoff)
+    lease_until = Column(DateTime(timezone=True))  # Running job is reclaimable after this time
+    worker_id = Column(String)
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
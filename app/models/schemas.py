@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from fastapi import UploadFile
 
 # User schemas
@@ -48,6 +48,8 @@ class Document(DocumentBase):
     summary: Optional[str] = None
     keywords: Optional[str] = None
     processed: bool
+    index_status: Optional[str] = None
+    enrichment_status: Optional[str] = None
     upload_date: datetime
     user_id: int
     
@@ -98,6 +100,41 @@ class ChatResponse(BaseModel):
     response: str
     session_id: int
     context_documents: List[int] = []
+    timings: Optional[Dict[str, float]] = None  # Aşama süreleri (ms)
+
+# Processing job schemas
+class ProcessingJob(BaseModel):
+    id: int
+    job_type: str
+    document_id: Optional[int] = None
+    priority: int
+    status: str
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    lease_until: Optional[datetime] = None
+    worker_id: Optional[str] = None
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+# Embedding index schemas
+class EmbeddingMigrationRequest(BaseModel):
+    model: str
+
+class EmbeddingIndexStatus(BaseModel):
+    active_model: str
+    previous_model: Optional[str] = None
+    shadow_model: Optional[str] = None
+    status: str
+    total_chunks: int = 0
+    shadowed_chunks: int = 0
+    last_error: Optional[str] = None
+    running: bool = False
 
 # Search schemas
 class SearchRequest(BaseModel):
@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
+import asyncio
 import json
 
-from app.database.database import get_db
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
+
+from app.database.database import get_db, SessionLocal
 from app.models.user import User
 from app.models.chat import ChatSession, ChatMessage
 from app.models.document import Document, DocumentChunk
@@ -12,152 +19,147 @@ from app.models.schemas import (
     ChatMessage as ChatMessageSchema
 )
 from app.utils.auth import get_current_active_user
-from app.services.gemini_service import GeminiService
+from app.services.gemini_service import GeminiService, CHAT_ERROR_MESSAGE
+from app.services.fallbacks import lexical_search
+from app.services.chat_history import load_history, pack_history, update_session_history
+from app.services.vector_index import vector_index
+from app.services import job_queue
+from app.utils.timing import StageTimer
 
 router = APIRouter()
 gemini_service = GeminiService()
 
-async def get_relevant_chunks_for_chat(query: str, user_id: int, db: Session):
+def _keyword_search_in_chunks(query: str, chunks: List[DocumentChunk]) -> List[dict]:
+    """Keyword tabanlı chunk arama (fallback)"""
+    try:
+        query_lower = query.lower()
+        keyword_results = []
+
+        for chunk in chunks:
+            chunk_text_lower = chunk.chunk_text.lower()
+
+            # Query'deki kelimeleri chunk'ta ara
+            query_words = query_lower.split()
+            match_score = 0
+
+            for word in query_words:
+                if word in chunk_text_lower:
+                    match_score += 1
+
+            # Eğer en az 2 kelime eşleşiyorsa ekle
+            if match_score >= 2:
+                keyword_results.append({
+                    'document_id': chunk.document_id,
+                    'chunk_text': chunk.chunk_text,
+                    'chunk_index': chunk.chunk_index,
+                    'score': 0.5 + (match_score * 0.1)  # Keyword match score
+                })
+
+        return keyword_results[:20]  # En fazla 20 keyword result
+
+    except Exception as e:
+        print(f"Keyword search error: {e}")
+        return []
+
+def _lexical_chunk_results(query: str, chunks: List[DocumentChunk], limit: int) -> List[dict]:
+    """Query embedding alınamadığında sadece sözcüksel (lexical) sıralama"""
+    ranked = lexical_search(query, chunks, text_of=lambda chunk: chunk.chunk_text, limit=limit)
+    print(f"🔤 Lexical retrieval returned {len(ranked)} chunks")
+    return [{
+        'document_id': r['item'].document_id,
+        'chunk_text': r['item'].chunk_text,
+        'chunk_index': r['item'].chunk_index,
+        'score': r['score']
+    } for r in ranked]
+
+async def _embed_query_or_none(query: str, model: Optional[str] = None):
+    """Query embedding'i al - alınamazsa None (lexical yedek kullanılır)"""
+    try:
+        return await gemini_service.embed_query(query, model=model)
+    except Exception as e:
+        print(f"⚠️ Query embedding unavailable ({e}), using lexical-only retrieval")
+        return None
+
+async def get_relevant_chunks_for_chat(query: str, user_id: int, timer: Optional[StageTimer] = None):
     """Chat için en alakalı chunk'ları bul"""
+    timer = timer or StageTimer()
     try:
         print(f"🔍 Chat search query: '{query}' for user {user_id}")
         
-        # Query embedding'i oluştur
-        import google.generativeai as genai
-        import numpy as np
-        import json
-        
-        query_response = genai.embed_content(
-            model="models/embedding-001",
-            content=query,
-            task_type="retrieval_query"
+        # Query embedding'i ve kullanıcının vektör kümesi eşzamanlı hazırlanır
+        query_model = vector_index.model_hint(user_id) or gemini_service.embedding_model
+        query_embedding, vectors = await asyncio.gather(
+            timer.measure("embedding", _embed_query_or_none(query, query_model)),
+            timer.measure("vectors", run_in_threadpool(vector_index.load, user_id))
         )
-        query_embedding = query_response['embedding']
+        chunks = vectors.chunks
         
-        # Kullanıcının tüm chunk'larını al
-        chunks = db.query(DocumentChunk).join(Document).filter(
-            Document.user_id == user_id,
-            DocumentChunk.embeddings.isnot(None)
-        ).all()
+        # Kullanıcı başka bir embedding modeline geçmişse sorgu o modelle yeniden embed edilir
+        if query_embedding is not None and vectors.model and vectors.model != query_model:
+            query_embedding = await timer.measure(
+                "embedding_model_switch", _embed_query_or_none(query, vectors.model)
+            )
         
         print(f"📊 Found {len(chunks)} chunks for user {user_id}")
         
-        # Cosine similarity hesapla
-        results = []
-        for chunk in chunks:
-            try:
-                chunk_embedding = json.loads(chunk.embeddings)
-                similarity = np.dot(query_embedding, chunk_embedding) / (
-                    np.linalg.norm(query_embedding) * np.linalg.norm(chunk_embedding)
-                )
-                
-                # Debug: Tüm chunk'ları logla
-                if "sürdürülebilirlik" in chunk.chunk_text.lower() or "endeks" in chunk.chunk_text.lower():
-                    print(f"🎯 Found relevant chunk: {chunk.chunk_text[:100]}... (similarity: {similarity:.3f})")
-                
-                if similarity > 0.15:  # Çok düşük threshold - tüm chunk'ları bul
-                    results.append({
-                        'document_id': chunk.document_id,
-                        'chunk_text': chunk.chunk_text,
-                        'chunk_index': chunk.chunk_index,
-                        'score': float(similarity)
-                    })
-            except Exception as e:
-                print(f"❌ Error processing chunk: {e}")
-                continue
-        
-        print(f"✅ Found {len(results)} chunks above threshold 0.15")
-        
-        # Eğer embedding ile yeterli sonuç bulunamadıysa, keyword search yap
-        if len(results) < 5:
-            print("🔍 Embedding results insufficient, trying keyword search...")
-            keyword_results = self._keyword_search_in_chunks(query, chunks)
-            results.extend(keyword_results)
-            print(f"🔍 Keyword search added {len(keyword_results)} results")
-        
-        # En iyi chunk'ları döndür ve komşu chunk'ları ekle
-        results.sort(key=lambda x: x['score'], reverse=True)
-        top_results = results[:50]  # Top 50 sonucu al
-        
-        # Komşu chunk'ları bul ve ekle
-        enhanced_results = []
-        for result in top_results[:12]:  # En iyi 12 chunk'ı işle
-            enhanced_results.append(result)
+        with timer.stage("retrieval"):
+            similarities = vectors.similarities(query_embedding) if query_embedding is not None else None
+            if similarities is None:
+                return _lexical_chunk_results(query, chunks, limit=12)
             
-            # Komşu chunk'ları bul (chunk_index ±1)
-            document_id = result['document_id']
-            chunk_index = result['chunk_index']
+            # Cosine similarity - çok düşük threshold, tüm ilgili chunk'ları bul
+            results = [{
+                'document_id': chunks[i].document_id,
+                'chunk_text': chunks[i].chunk_text,
+                'chunk_index': chunks[i].chunk_index,
+                'score': float(similarities[i])
+            } for i in np.flatnonzero(similarities > 0.15)]
             
-            neighbor_chunks = db.query(DocumentChunk).filter(
-                DocumentChunk.document_id == document_id,
-                DocumentChunk.chunk_index.in_([chunk_index - 1, chunk_index + 1])
-            ).all()
+            print(f"✅ Found {len(results)} chunks above threshold 0.15")
             
-            for neighbor in neighbor_chunks:
-                if neighbor.embeddings:
-                    try:
-                        neighbor_embedding = json.loads(neighbor.embeddings)
-                        neighbor_similarity = np.dot(query_embedding, neighbor_embedding) / (
-                            np.linalg.norm(query_embedding) * np.linalg.norm(neighbor_embedding)
-                        )
-                        
-                        enhanced_results.append({
-                            'document_id': neighbor.document_id,
-                            'chunk_text': neighbor.chunk_text,
-                            'chunk_index': neighbor.chunk_index,
-                            'score': float(neighbor_similarity)
-                        })
-                    except:
+            # Eğer embedding ile yeterli sonuç bulunamadıysa, keyword search yap
+            if len(results) < 5:
+                print("🔍 Embedding results insufficient, trying keyword search...")
+                keyword_results = _keyword_search_in_chunks(query, chunks)
+                results.extend(keyword_results)
+                print(f"🔍 Keyword search added {len(keyword_results)} results")
+            
+            # En iyi chunk'ları döndür ve komşu chunk'ları ekle
+            results.sort(key=lambda x: x['score'], reverse=True)
+            top_results = results[:50]  # Top 50 sonucu al
+            
+            # Komşu chunk'ları (chunk_index ±1) bellekteki vektör kümesinden ekle
+            enhanced_results = []
+            for result in top_results[:12]:  # En iyi 12 chunk'ı işle
+                enhanced_results.append(result)
+                for neighbor_index in (result['chunk_index'] - 1, result['chunk_index'] + 1):
+                    position = vectors.positions.get((result['document_id'], neighbor_index))
+                    if position is None:
                         continue
-        
-        # Duplicate'leri kaldır ve en iyi 12'yi döndür
-        seen = set()
-        final_results = []
-        for result in enhanced_results:
-            key = (result['document_id'], result['chunk_index'])
-            if key not in seen:
-                seen.add(key)
-                final_results.append(result)
-                if len(final_results) >= 12:
-                    break
-        
-        return final_results
+                    neighbor = chunks[position]
+                    enhanced_results.append({
+                        'document_id': neighbor.document_id,
+                        'chunk_text': neighbor.chunk_text,
+                        'chunk_index': neighbor.chunk_index,
+                        'score': float(similarities[position])
+                    })
+            
+            # Duplicate'leri kaldır ve en iyi 12'yi döndür
+            seen = set()
+            final_results = []
+            for result in enhanced_results:
+                key = (result['document_id'], result['chunk_index'])
+                if key not in seen:
+                    seen.add(key)
+                    final_results.append(result)
+                    if len(final_results) >= 12:
+                        break
+            
+            return final_results
         
     except Exception as e:
         print(f"Chat chunk search error: {e}")
         return []
-    
-    def _keyword_search_in_chunks(self, query: str, chunks: List[DocumentChunk]) -> List[dict]:
-        """Keyword tabanlı chunk arama (fallback)"""
-        try:
-            query_lower = query.lower()
-            keyword_results = []
-            
-            for chunk in chunks:
-                chunk_text_lower = chunk.chunk_text.lower()
-                
-                # Query'deki kelimeleri chunk'ta ara
-                query_words = query_lower.split()
-                match_score = 0
-                
-                for word in query_words:
-                    if word in chunk_text_lower:
-                        match_score += 1
-                
-                # Eğer en az 2 kelime eşleşiyorsa ekle
-                if match_score >= 2:
-                    keyword_results.append({
-                        'document_id': chunk.document_id,
-                        'chunk_text': chunk.chunk_text,
-                        'chunk_index': chunk.chunk_index,
-                        'score': 0.5 + (match_score * 0.1)  # Keyword match score
-                    })
-            
-            return keyword_results[:20]  # En fazla 20 keyword result
-            
-        except Exception as e:
-            print(f"Keyword search error: {e}")
-            return []
 
 @router.post("/sessions", response_model=ChatSessionSchema)
 async def create_chat_session(
@@ -219,136 +221,246 @@ async def reprocess_all_documents(
 ):
     """Tüm dökümanları yeni chunk ayarlarıyla yeniden işle"""
     try:
-        from app.services.document_processor import DocumentProcessor
-        
-        # Mevcut chunk'ları sil
-        chunks_deleted = db.query(DocumentChunk).join(Document).filter(
-            Document.user_id == current_user.id
-        ).delete()
-        
-        # Dökümanları yeniden işle
-        processor = DocumentProcessor()
+        # Dökümanlar worker kuyruğunda tek tek yeniden indekslenir; yeni chunk'lar
+        # staged yazılır ve tek transaction'da devreye girer - o ana kadar eski chunk'lar aranır
         documents = db.query(Document).filter(
             Document.user_id == current_user.id,
             Document.processed == True
         ).all()
         
-        reprocessed_count = 0
-        for doc in documents:
-            try:
-                doc.processed = False
-                await processor.process_document(doc, db)
-                reprocessed_count += 1
-            except Exception as e:
-                print(f"Error reprocessing document {doc.id}: {e}")
-        
-        db.commit()
+        job_ids = [
+            job_queue.enqueue(db, "index_document", current_user.id, doc.id, priority=job_queue.REINDEX_PRIORITY).id
+            for doc in documents
+        ]
         
         return {
-            "message": f"Successfully reprocessed {reprocessed_count} documents",
-            "chunks_deleted": chunks_deleted,
-            "documents_reprocessed": reprocessed_count
+            "message": f"Queued {len(job_ids)} documents for reprocessing",
+            "documents_reprocessed": len(job_ids),
+            "job_ids": job_ids
         }
         
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/", response_model=ChatResponse)
-async def chat_with_ai(
-    chat_request: ChatRequest,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """AI ile sohbet et"""
+def _get_or_create_session(chat_request: ChatRequest, user_id: int, db: Session) -> ChatSession:
+    """İstekteki oturumu bul veya yeni oturum oluştur (commit çağırana bırakılır)"""
+    if chat_request.session_id:
+        session = db.query(ChatSession).filter(
+            ChatSession.id == chat_request.session_id,
+            ChatSession.user_id == user_id
+        ).first()
+        if not session:
+            raise HTTPException(status_code=404, detail="Chat session not found")
+        return session
+    
+    # Yeni session oluştur
+    session = ChatSession(
+        session_name="Yeni Sohbet",
+        user_id=user_id
+    )
+    db.add(session)
+    db.flush()
+    return session
+
+def _start_turn(chat_request: ChatRequest, user_id: int) -> Tuple[int, str]:
+    """Oturumu hazırla, geçmişi yükle ve kullanıcı mesajını tek işlemde kaydet.
+
+    Retrieval ile eşzamanlı çalıştığı için kendi veritabanı oturumunu açar.
+    """
+    db = SessionLocal()
     try:
-        # Session kontrolü veya oluştur
-        if chat_request.session_id:
-            session = db.query(ChatSession).filter(
-                ChatSession.id == chat_request.session_id,
-                ChatSession.user_id == current_user.id
-            ).first()
-            if not session:
-                raise HTTPException(status_code=404, detail="Chat session not found")
-        else:
-            # Yeni session oluştur
-            session = ChatSession(
-                session_name="Yeni Sohbet",
-                user_id=current_user.id
-            )
-            db.add(session)
-            db.commit()
-            db.refresh(session)
+        session = _get_or_create_session(chat_request, user_id, db)
+        # Oturum özeti + son turlar (yeni mesaj eklenmeden önce)
+        history = pack_history(load_history(session, db))
         
         # Kullanıcı mesajını kaydet
-        user_message = ChatMessage(
+        db.add(ChatMessage(
             session_id=session.id,
             message_type="user",
             content=chat_request.message
-        )
-        db.add(user_message)
-        
-        # Chunk bazlı context arama - çok daha etkili
-        relevant_chunks = await get_relevant_chunks_for_chat(
-            chat_request.message, current_user.id, db
-        )
-        
-        # Context'i chunk'lardan oluştur
-        context_docs = []
-        relevant_doc_ids = set()
-        
-        print(f"🎯 Using top {len(relevant_chunks)} chunks for context")
-        
-        # En iyi 12 chunk'ı kullan (daha fazla context)
-        for chunk_data in relevant_chunks[:12]:
-            doc = db.query(Document).filter(Document.id == chunk_data['document_id']).first()
-            if doc:
-                context_docs.append({
-                    'filename': doc.original_filename,
-                    'content_text': chunk_data['chunk_text'],  # Chunk text kullan
-                    'summary': doc.summary or '',
-                    'chunk_score': chunk_data['score']
-                })
-                relevant_doc_ids.add(doc.id)
-                
-                # Debug: Hangi chunk'ların kullanıldığını logla
-                if "sürdürülebilirlik" in chunk_data['chunk_text'].lower() or "endeks" in chunk_data['chunk_text'].lower():
-                    print(f"📄 Using chunk with 'sürdürülebilirlik endeks': {chunk_data['chunk_text'][:100]}...")
-        
-        relevant_doc_ids = list(relevant_doc_ids)
-        print(f"📚 Total context documents: {len(context_docs)}")
-        print(f"📊 Context chunks total length: {sum(len(doc['content_text']) for doc in context_docs)} characters")
-        
-        # AI yanıtı al
-        ai_response = await gemini_service.chat_with_context(
-            chat_request.message, context_docs
-        )
-        
-        # AI yanıtını kaydet
-        ai_message = ChatMessage(
-            session_id=session.id,
+        ))
+        db.commit()
+        return session.id, history
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def _build_context_docs(relevant_chunks: List[dict]):
+    """Chunk'lardan AI bağlamını ve kullanılan döküman ID'lerini oluştur"""
+    print(f"🎯 Using top {len(relevant_chunks)} chunks for context")
+    
+    # En iyi 12 chunk'ı kullan (daha fazla context) - dökümanlar tek sorguda alınır
+    top_chunks = relevant_chunks[:12]
+    db = SessionLocal()
+    try:
+        documents = {
+            doc.id: doc for doc in db.query(
+                Document.id, Document.original_filename, Document.summary
+            ).filter(Document.id.in_({c['document_id'] for c in top_chunks})).all()
+        } if top_chunks else {}
+    finally:
+        db.close()
+    
+    context_docs = []
+    relevant_doc_ids = []
+    for chunk_data in top_chunks:
+        doc = documents.get(chunk_data['document_id'])
+        if doc:
+            context_docs.append({
+                'document_id': doc.id,
+                'filename': doc.original_filename,
+                'content_text': chunk_data['chunk_text'],  # Chunk text kullan
+                'summary': doc.summary or '',
+                'chunk_index': chunk_data.get('chunk_index', 0),
+                'chunk_score': chunk_data['score']
+            })
+            if doc.id not in relevant_doc_ids:
+                relevant_doc_ids.append(doc.id)
+    
+    print(f"📚 Total context documents: {len(context_docs)}")
+    print(f"📊 Context chunks total length: {sum(len(doc['content_text']) for doc in context_docs)} characters")
+    return context_docs, relevant_doc_ids
+
+async def _prepare_chat(chat_request: ChatRequest, user_id: int, timer: StageTimer):
+    """Oturum/mesaj kaydı ile retrieval'ı eşzamanlı çalıştır ve bağlamı hazırla"""
+    (session_id, history), relevant_chunks = await asyncio.gather(
+        timer.measure("session", run_in_threadpool(_start_turn, chat_request, user_id)),
+        get_relevant_chunks_for_chat(chat_request.message, user_id, timer)
+    )
+    context_docs, relevant_doc_ids = await timer.measure(
+        "context", run_in_threadpool(_build_context_docs, relevant_chunks)
+    )
+    return session_id, history, context_docs, relevant_doc_ids
+
+def _save_assistant_message(session_id: int, content: str, relevant_doc_ids: List[int]):
+    """AI yanıtını kaydet ve oturumun güncelleme zamanını güncelle"""
+    db = SessionLocal()
+    try:
+        db.add(ChatMessage(
+            session_id=session_id,
             message_type="assistant",
-            content=ai_response,
+            content=content,
             context_documents=json.dumps(relevant_doc_ids)
-        )
-        db.add(ai_message)
+        ))
         
         # Session güncelleme zamanını güncelle
-        from sqlalchemy import func
-        session.updated_at = func.now()
-        
+        db.query(ChatSession).filter(ChatSession.id == session_id).update(
+            {ChatSession.updated_at: func.now()}, synchronize_session=False
+        )
         db.commit()
+    except Exception as e:
+        print(f"❌ Assistant message save error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+async def _finish_turn(session_id: int, parts: List[str], relevant_doc_ids: List[int],
+                       stream_state: Optional[dict] = None):
+    """Yanıt gönderildikten sonra: asistan mesajını kaydet ve oturum özetini güncelle.
+    
+    Akış yarıda kestiyse yarım yanıt kaydedilmez (geçmişe ve özete girmez).
+    """
+    if stream_state is not None and stream_state.get("failed"):
+        print(f"⚠️ Yarım kalan yanıt kaydedilmedi (session {session_id})")
+        return
+    await run_in_threadpool(_save_assistant_message, session_id, "".join(parts).strip(), relevant_doc_ids)
+    await update_session_history(session_id, gemini_service.summarize_history)
+
+@router.post("/", response_model=ChatResponse)
+async def chat_with_ai(
+    chat_request: ChatRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_active_user)
+):
+    """AI ile sohbet et"""
+    timer = StageTimer()
+    try:
+        # Oturum kaydı, query embedding ve vektör yükleme eşzamanlı
+        session_id, history, context_docs, relevant_doc_ids = await _prepare_chat(
+            chat_request, current_user.id, timer
+        )
+        
+        # AI yanıtı al
+        ai_response = await timer.measure("generation", gemini_service.chat_with_context(
+            chat_request.message, context_docs, history
+        ))
         
+        # Yanıt kaydı ve özet güncellemesi kritik yolun dışında
+        background_tasks.add_task(_finish_turn, session_id, [ai_response], relevant_doc_ids)
+        
+        timings = timer.as_dict()
+        print(f"⏱️ Chat timings (ms): {timings}")
         return ChatResponse(
             response=ai_response,
-            session_id=session.id,
-            context_documents=relevant_doc_ids
+            session_id=session_id,
+            context_documents=relevant_doc_ids,
+            timings=timings
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
 
+def _sse_event(data: dict, event: Optional[str] = None) -> str:
+    """Server-Sent Events formatında tek bir olay"""
+    payload = json.dumps(data, ensure_ascii=False)
+    if event:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return f"data: {payload}\n\n"
+
+@router.post("/stream")
+async def chat_with_ai_stream(
+    chat_request: ChatRequest,
+    current_user: User = Depends(get_current_active_user)
+):
+    """AI ile sohbet et - yanıtı üretildikçe Server-Sent Events olarak gönder"""
+    timer = StageTimer()
+    try:
+        session_id, history, context_docs, relevant_doc_ids = await _prepare_chat(
+            chat_request, current_user.id, timer
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
+    
+    parts: List[str] = []
+    stream_state = {"failed": False}
+    
+    async def event_stream():
+        with timer.stage("generation"):
+            try:
+                async for text in gemini_service.stream_chat_with_context(chat_request.message, context_docs, history):
+                    if not parts:
+                        timer.mark("first_token")
+                    parts.append(text)
+                    yield _sse_event({"text": text}, event="token")
+            except Exception as e:
+                print(f"❌ Chat stream error: {e}")
+                stream_state["failed"] = True
+                yield _sse_event({"text": ("\n\n" if parts else "") + CHAT_ERROR_MESSAGE}, event="token")
+        
+        timings = timer.as_dict()
+        print(f"⏱️ Chat stream timings (ms): {timings}")
+        yield _sse_event({
+            "session_id": session_id,
+            "context_documents": relevant_doc_ids,
+            "timings": timings,
+            "incomplete": stream_state["failed"]
+        }, event="done")
+    
+    # Yanıt tamamlandıktan sonra kaydedilir (istek oturumu o sırada kapanmış olabilir)
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(_finish_turn, session_id, parts, relevant_doc_ids, stream_state)
+    )
+
 @router.delete("/sessions/{session_id}")
 async def delete_chat_session(
     session_id: int,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List
 import os
@@ -9,14 +9,12 @@ from app.models.document import Document
 from app.models.schemas import Document as DocumentSchema
 from app.utils.auth import get_current_active_user
 from app.utils.file_utils import save_upload_file, delete_file, get_file_extension
-from app.services.document_processor import DocumentProcessor
+from app.services import job_queue
 
 router = APIRouter()
-document_processor = DocumentProcessor()
 
 @router.post("/upload", response_model=DocumentSchema)
 async def upload_document(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -54,10 +52,10 @@ async def upload_document(
         db.refresh(document)
         print(f"✅ Document saved to DB with ID: {document.id}")
         
-        print(f"🤖 Starting AI processing...")
-        # Background task olarak AI işleme başlat
-        background_tasks.add_task(process_document_background, document.id, db)
-        print(f"✅ Background task added")
+        print(f"🤖 Queueing AI processing...")
+        # İşleme kalıcı kuyruğa eklenir ve ayrı worker sürecinde çalışır
+        job_queue.enqueue(db, "index_document", current_user.id, document.id)
+        print(f"✅ Processing job queued")
         
         print(f"🎉 Upload completed successfully!")
         return document
@@ -69,19 +67,9 @@ async def upload_document(
         print(f"❌ Traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
-async def process_document_background(document_id: int, db: Session):
-    """Arka planda döküman işleme"""
-    try:
-        document = db.query(Document).filter(Document.id == document_id).first()
-        if document:
-            await document_processor.process_document(document, db)
-    except Exception as e:
-        print(f"Background processing error: {e}")
-
 @router.post("/{document_id}/reprocess")
 async def reprocess_document(
     document_id: int,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -97,11 +85,16 @@ async def reprocess_document(
         
         print(f"🔄 Reprocessing document: {document.filename}")
         
-        # Background task olarak yeniden işleme başlat
-        background_tasks.add_task(process_document_background, document.id, db)
+        # İşleme durumunu sıfırla ve yeniden işlemeyi kuyruğa ekle
+        document.index_status = "pending"
+        document.enrichment_status = "pending"
+        db.commit()
+        job = job_queue.enqueue(db, "index_document", current_user.id, document.id)
         
-        return {"message": "Document reprocessing started"}
+        return {"message": "Document reprocessing started", "job_id": job.id}
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Reprocess error: {e}")
         raise HTTPException(status_code=500, detail=f"Reprocessing failed: {str(e)}")
@@ -180,30 +173,7 @@ async def get_document_content(
         "content_text": document.content_text,
         "summary": document.summary,
         "keywords": document.keywords,
-        "processed": document.processed
+        "processed": document.processed,
+        "index_status": document.index_status,
+        "enrichment_status": document.enrichment_status
     }
-
-@router.post("/{document_id}/reprocess")
-async def reprocess_document(
-    document_id: int,
-    background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """Dökümanı yeniden işle"""
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.user_id == current_user.id
-    ).first()
-    
-    if not document:
-        raise HTTPException(status_code=404, detail="Document not found")
-    
-    # İşleme durumunu sıfırla
-    document.processed = False
-    db.commit()
-    
-    # Yeniden işleme başlat
-    background_tasks.add_task(process_document_background, document_id, db)
-    
-    return {"message": "Document reprocessing started"}
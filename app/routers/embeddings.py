@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.database.database import get_db
+from app.models.user import User
+from app.models.schemas import EmbeddingMigrationRequest, EmbeddingIndexStatus
+from app.utils.auth import get_current_active_user
+from app.services.embedding_migration import get_embedding_migrator
+
+router = APIRouter()
+
+@router.get("/index", response_model=EmbeddingIndexStatus)
+async def get_embedding_index(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Kullanıcının aktif embedding modeli ve göç durumu"""
+    return get_embedding_migrator().status(db, current_user.id)
+
+@router.post("/migrate", response_model=EmbeddingIndexStatus)
+async def start_embedding_migration(
+    migration_request: EmbeddingMigrationRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Yeni embedding modeline shadow index ile göçü başlat - arama bu sırada etkilenmez.
+    
+    Shadow re-embed işi kuyruğa eklenir ve worker tarafından çalıştırılır.
+    """
+    migrator = get_embedding_migrator()
+    try:
+        migrator.start(db, current_user.id, migration_request.model)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    return migrator.status(db, current_user.id)
+
+@router.post("/cutover", response_model=EmbeddingIndexStatus)
+async def cutover_embedding_index(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Shadow index'e atomik geçiş"""
+    try:
+        return await get_embedding_migrator().cutover(current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/rollback", response_model=EmbeddingIndexStatus)
+async def rollback_embedding_index(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Önceki embedding modeline geri dön"""
+    try:
+        return await get_embedding_migrator().rollback(current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
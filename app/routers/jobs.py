@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.database.database import get_db
+from app.models.user import User
+from app.models.job import ProcessingJob
+from app.models.schemas import ProcessingJob as ProcessingJobSchema
+from app.utils.auth import get_current_active_user
+from app.services import job_queue
+
+router = APIRouter()
+
+@router.get("/", response_model=List[ProcessingJobSchema])
+async def get_jobs(
+    status: Optional[str] = None,
+    document_id: Optional[int] = None,
+    limit: int = 50,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Kullanıcının işleme işlerini listele (en yeniler önce)"""
+    query = db.query(ProcessingJob).filter(ProcessingJob.user_id == current_user.id)
+    if status:
+        query = query.filter(ProcessingJob.status == status)
+    if document_id is not None:
+        query = query.filter(ProcessingJob.document_id == document_id)
+    return query.order_by(ProcessingJob.id.desc()).limit(min(limit, 500)).all()
+
+@router.get("/{job_id}", response_model=ProcessingJobSchema)
+async def get_job(
+    job_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Tek bir işin durumunu getir"""
+    job = db.query(ProcessingJob).filter(
+        ProcessingJob.id == job_id,
+        ProcessingJob.user_id == current_user.id
+    ).first()
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
+
+@router.post("/{job_id}/retry", response_model=ProcessingJobSchema)
+async def retry_job(
+    job_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Başarısız işi tekrar kuyruğa al"""
+    job = db.query(ProcessingJob).filter(
+        ProcessingJob.id == job_id,
+        ProcessingJob.user_id == current_user.id
+    ).first()
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "failed":
+        raise HTTPException(status_code=409, detail="Only failed jobs can be retried")
+    
+    return job_queue.retry(db, job)
@@ -10,6 +10,8 @@ from app.models.document import Document, DocumentChunk
 from app.models.schemas import SearchRequest, SearchResult, Document as DocumentSchema
 from app.utils.auth import get_current_active_user
 from app.services.gemini_service import GeminiService
+from app.services.embedding_migration import active_model
+from app.services.fallbacks import lexical_search
 
 router = APIRouter()
 gemini_service = GeminiService()
@@ -17,21 +19,30 @@ gemini_service = GeminiService()
 async def search_in_chunks(query: str, user_id: int, db: Session):
     """Chunk'larda embedding tabanlı arama yap"""
     try:
-        # Query embedding'i oluştur
-        import google.generativeai as genai
-        query_response = genai.embed_content(
-            model="models/embedding-001",
-            content=query,
-            task_type="retrieval_query"
-        )
-        query_embedding = query_response['embedding']
+        # Query embedding'i kullanıcının aktif embedding modeliyle oluştur
+        try:
+            query_embedding = await gemini_service.embed_query(query, model=active_model(db, user_id))
+        except Exception as e:
+            print(f"⚠️ Query embedding unavailable ({e}), using lexical-only search")
+            query_embedding = None
         
         # Kullanıcının tüm chunk'larını al - limit kaldırıldı
+        # Sadece indekslemesi tamamlanmış (aranabilir) dökümanların chunk'ları
         chunks = db.query(DocumentChunk).join(Document).filter(
             Document.user_id == user_id,
+            Document.processed == True,
+            DocumentChunk.staged == False,
             DocumentChunk.embeddings.isnot(None)
         ).order_by(DocumentChunk.document_id, DocumentChunk.chunk_index).all()  # Tüm chunk'ları sıralı al
         
+        if query_embedding is None:
+            ranked = lexical_search(query, chunks, text_of=lambda chunk: chunk.chunk_text, limit=20)
+            return [{
+                'document_id': r['item'].document_id,
+                'chunk_text': r['item'].chunk_text,
+                'score': r['score']
+            } for r in ranked]
+        
         # Cosine similarity hesapla
         import numpy as np
         results = []
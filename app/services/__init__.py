@@ -1,4 +1,12 @@
-from .gemini_service import GeminiService
-from .document_processor import DocumentProcessor
-
 __all__ = ["GeminiService", "DocumentProcessor"]
+
+def __getattr__(name):
+    """Servisler ilk erişimde yüklenir - çıkarma/OCR alt süreçleri ``app.services.extractors``'ı
+    içe aktarırken sağlayıcı, veritabanı ve numpy yüklenmez"""
+    if name == "GeminiService":
+        from .gemini_service import GeminiService
+        return GeminiService
+    if name == "DocumentProcessor":
+        from .document_processor import DocumentProcessor
+        return DocumentProcessor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
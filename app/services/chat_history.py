@@ -0,0 +1,110 @@
+import os
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from app.database.database import SessionLocal
+from app.models.chat import ChatSession, ChatMessage
+from app.services.context_packer import estimate_tokens
+
+load_dotenv()
+
+# Prompt'a olduğu gibi eklenen son tur (kullanıcı + asistan) sayısı
+CHAT_HISTORY_TURNS = int(os.getenv("CHAT_HISTORY_TURNS", "3"))
+# Özet + son turlar için toplam token bütçesi
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1500"))
+# Kayıtlı özetin en fazla uzunluğu (karakter)
+CHAT_HISTORY_SUMMARY_MAX_CHARS = int(os.getenv("CHAT_HISTORY_SUMMARY_MAX_CHARS", "2000"))
+
+_ROLE_LABELS = {"user": "Kullanıcı", "assistant": "Asistan"}
+
+# Aynı oturum için eşzamanlı özet güncellemelerini engelle
+_updating_sessions = set()
+
+def format_messages(messages: List[Tuple[str, str]]) -> str:
+    """(rol, içerik) listesini 'Kullanıcı: ...' satırlarına çevir"""
+    return "\n".join(f"{_ROLE_LABELS.get(role, role)}: {content}" for role, content in messages)
+
+def load_history(session: ChatSession, db: Session) -> Dict:
+    """Oturum özeti ve özete katılmamış son N turu döndür"""
+    query = db.query(ChatMessage.message_type, ChatMessage.content).filter(
+        ChatMessage.session_id == session.id
+    )
+    if session.summarized_until_id:
+        query = query.filter(ChatMessage.id > session.summarized_until_id)
+    recent = query.order_by(ChatMessage.id.desc()).limit(CHAT_HISTORY_TURNS * 2).all()
+    return {
+        'summary': session.history_summary or '',
+        'turns': [(role, content) for role, content in reversed(recent)]
+    }
+
+def pack_history(history: Optional[Dict], token_budget: int = CHAT_HISTORY_TOKEN_BUDGET) -> str:
+    """Özet + son turları token bütçesine sığacak şekilde prompt metnine çevir.
+
+    Özet en fazla bütçenin yarısını kullanır; kalan bütçe en yeni turlardan
+    başlanarak doldurulur.
+    """
+    if not history:
+        return ""
+
+    parts = []
+    used = 0
+    summary = history.get('summary', '')
+    if summary:
+        summary = summary[:(token_budget // 2) * 4]
+        parts.append(f"Önceki konuşmanın özeti: {summary}")
+        used += estimate_tokens(summary)
+
+    turns = []
+    for role, content in reversed(history.get('turns', [])):
+        line = format_messages([(role, content)])
+        cost = estimate_tokens(line)
+        if used + cost > token_budget:
+            break
+        turns.append(line)
+        used += cost
+    parts.extend(reversed(turns))
+    return "\n".join(parts)
+
+async def update_session_history(session_id: int, summarize: Callable[[str, str], Awaitable[str]]):
+    """Son N turun dışında kalan yeni mesajları oturum özetine kat.
+
+    Her asistan turundan sonra çağrılır; sadece son güncellemeden beri pencereden
+    çıkan mesajlar özetlenir, bu yüzden maliyet oturum uzunluğundan bağımsızdır.
+    ``summarize(önceki_özet, yeni_mesajlar)`` güncel özeti döndürür.
+    """
+    if session_id in _updating_sessions:
+        return
+    _updating_sessions.add(session_id)
+
+    db = SessionLocal()
+    try:
+        session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
+        if not session:
+            return
+
+        query = db.query(ChatMessage.id, ChatMessage.message_type, ChatMessage.content).filter(
+            ChatMessage.session_id == session_id
+        )
+        if session.summarized_until_id:
+            query = query.filter(ChatMessage.id > session.summarized_until_id)
+        pending = query.order_by(ChatMessage.id.asc()).all()
+
+        to_fold = pending[:max(0, len(pending) - CHAT_HISTORY_TURNS * 2)]
+        if not to_fold:
+            return
+
+        new_messages = format_messages([(role, content) for _, role, content in to_fold])
+        summary = await summarize(session.history_summary or "", new_messages)
+
+        session.history_summary = summary[:CHAT_HISTORY_SUMMARY_MAX_CHARS]
+        session.summarized_until_id = to_fold[-1][0]
+        db.commit()
+        print(f"🧠 Session {session_id} history summary updated ({len(to_fold)} messages folded)")
+    except Exception as e:
+        print(f"❌ Session history update error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+        _updating_sessions.discard(session_id)
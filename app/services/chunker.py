@@ -0,0 +1,186 @@
+import os
+import re
+from typing import Iterator, List, NamedTuple, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Chunk boyutu birimi: "chars" (karakter) ya da "tokens" (yaklaşık token)
+CHUNK_SIZE_UNIT = os.getenv("CHUNK_SIZE_UNIT", "chars").lower()
+_DEFAULT_SIZES = {"chars": ("1200", "250"), "tokens": ("300", "60")}
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", _DEFAULT_SIZES.get(CHUNK_SIZE_UNIT, _DEFAULT_SIZES["chars"])[0]))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", _DEFAULT_SIZES.get(CHUNK_SIZE_UNIT, _DEFAULT_SIZES["chars"])[1]))
+
+# Yaklaşık token: en fazla 4 harflik kelime parçası ya da tek noktalama işareti
+_TOKEN = re.compile(r"\w{1,4}|[^\w\s]")
+# Satır sonunda bölünmüş kelime: "söz-\nleşme" → "sözleşme"
+_HYPHENATED = re.compile(r"(?<=\w)-$")
+_LINE = re.compile(r"[^\n]*\n?")
+_SENTENCE_ENDS = (". ", "? ", "! ", ".\n", "?\n", "!\n", "\n")
+
+def count_tokens(text: str) -> int:
+    """Yaklaşık token sayısı (kelime parçaları + noktalama)"""
+    return sum(1 for _ in _TOKEN.finditer(text))
+
+def normalize_text(text: str, keep_lines: bool = False) -> str:
+    """Metni tek geçişte temizle - paragraf yapısı korunur.
+
+    Boş satırla ayrılan bloklar paragraftır (``\\n\\n``); paragraf içindeki satırlar
+    birleştirilir ve satır sonunda bölünmüş kelimeler yeniden birleştirilir.
+    ``keep_lines=True`` ise her satır ayrı paragraf sayılır (DOCX gibi satır = paragraf).
+    """
+    if not text:
+        return ""
+
+    paragraphs: List[str] = []
+    current: List[str] = []
+    for match in _LINE.finditer(text):
+        line = " ".join(match.group().split())
+        if not line:
+            if current:
+                paragraphs.append("".join(current))
+                current = []
+            if not match.group():
+                break
+            continue
+        if current:
+            previous = current[-1]
+            if _HYPHENATED.search(previous) and line[0].islower():
+                current[-1] = previous[:-1]
+            else:
+                current.append(" ")
+        current.append(line)
+        if keep_lines:
+            paragraphs.append("".join(current))
+            current = []
+    if current:
+        paragraphs.append("".join(current))
+    return "\n\n".join(paragraphs)
+
+class Chunk(NamedTuple):
+    text: str
+    start: int  # Metin başından itibaren karakter konumu
+    end: int
+
+class TextChunker:
+    """Metni parça parça (sayfa sayfa) alıp paragraf/cümle sınırlarında overlapping chunk'lar üretir.
+
+    Tüm metni bellekte tutmaz; sadece henüz kesinleşmemiş kuyruk saklanır. Kesme noktaları
+    tampon üzerinde konumlarla bulunur, her karakter sabit sayıda taranır.
+    """
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP, unit: str = CHUNK_SIZE_UNIT):
+        if unit not in _DEFAULT_SIZES:
+            raise ValueError(f"Geçersiz chunk birimi: {unit}")
+        self.chunk_size = max(1, chunk_size)
+        self.overlap = max(0, min(overlap, self.chunk_size - 1))
+        self.unit = unit
+        # Tek eşleşmede en fazla chunk_size token (açgözlü, geri izleme yapmaz)
+        self._token_window = re.compile(r"(?:\s*(?:\w{1,4}|[^\w\s])){0,%d}" % self.chunk_size)
+        self._buffer = ""
+        self._offset = 0  # Tampon başlangıcının metindeki konumu
+
+    def feed(self, text: str) -> List[str]:
+        """Yeni metni ekle ve kesinleşen chunk'ları döndür"""
+        return [chunk.text for chunk in self.feed_spans(text)]
+
+    def flush(self) -> List[str]:
+        """Kalan metni chunk'la (metin sonu)"""
+        return [chunk.text for chunk in self.flush_spans()]
+
+    def feed_spans(self, text: str) -> List[Chunk]:
+        if not text:
+            return []
+        if self._buffer and not self._buffer[-1].isspace() and not text[0].isspace():
+            self._buffer += "\n"  # Sayfa/blok sınırı cümle sınırı gibi değerlendirilir
+        self._buffer += text
+        return self._drain(final=False)
+
+    def flush_spans(self) -> List[Chunk]:
+        return self._drain(final=True)
+
+    def _drain(self, final: bool) -> List[Chunk]:
+        text = self._buffer
+        chunks = []
+        start = self._skip_space(text, 0)
+        while start < len(text):
+            span = self._next_span(text, start, final)
+            if span is None:
+                break
+            end, next_start = span
+            chunk = text[start:end].rstrip()
+            if chunk:
+                chunks.append(Chunk(chunk, self._offset + start, self._offset + start + len(chunk)))
+            start = next_start
+
+        self._buffer = text[start:]
+        self._offset += start
+        return chunks
+
+    def _next_span(self, text: str, start: int, final: bool):
+        """(chunk sonu, sonraki chunk başlangıcı) - metin yetmiyorsa None"""
+        if self.unit == "tokens":
+            return self._next_token_span(text, start, final)
+
+        limit = start + self.chunk_size
+        if limit >= len(text):
+            # Son parça - kesme noktası sonraki metne bağlı
+            return (len(text), len(text)) if final else None
+        end = self._cut(text, start, limit, start + self.chunk_size // 2)
+        return end, self._overlap_start(text, start, end, end - self.overlap)
+
+    def _next_token_span(self, text: str, start: int, final: bool):
+        limit = self._token_window.match(text, start).end()
+        if _TOKEN.search(text, limit) is None:
+            return (len(text), len(text)) if final else None
+
+        end = self._cut(text, start, limit, (start + limit) // 2)
+        if self.overlap == 0:
+            return end, self._overlap_start(text, start, end, end)
+        # Son ``overlap`` token'ın başlangıcı - sadece chunk sonundaki kısa bölge taranır
+        lower = max(start, end - self.overlap * 16)
+        token_starts = [match.start() for match in _TOKEN.finditer(text, lower, end)]
+        target = token_starts[-self.overlap] if len(token_starts) >= self.overlap else lower
+        return end, self._overlap_start(text, start, end, target)
+
+    def _cut(self, text: str, start: int, limit: int, earliest: int) -> int:
+        """Pencerenin ikinci yarısında paragraf > cümle > kelime sınırında kes"""
+        position = text.rfind("\n\n", earliest, limit + 1)
+        if position > start:
+            return position
+        position = max(text.rfind(mark, earliest, limit + 1) for mark in _SENTENCE_ENDS)
+        if position > start:
+            return position + 1
+        position = max(text.rfind(" ", start, limit + 1), text.rfind("\n", start, limit + 1))
+        if position > start:
+            return position
+        return limit  # Boşluksuz dev kelime
+
+    def _overlap_start(self, text: str, start: int, end: int, target: int) -> int:
+        """Overlap başlangıcını kelime başına hizala; ilerlemeyi garanti et"""
+        if self.overlap == 0 or target >= end:
+            return self._skip_space(text, end)
+        target = max(target, start + 1)
+        if not text[target - 1].isspace():
+            space = text.find(" ", target, end)
+            target = space + 1 if space != -1 else end
+        return self._skip_space(text, target)
+
+    @staticmethod
+    def _skip_space(text: str, position: int) -> int:
+        while position < len(text) and text[position].isspace():
+            position += 1
+        return position
+
+def iter_chunks(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP,
+                unit: str = CHUNK_SIZE_UNIT) -> Iterator[Chunk]:
+    """Tek parça metni (konumlarıyla) chunk'la"""
+    chunker = TextChunker(chunk_size, overlap, unit)
+    yield from chunker.feed_spans(text)
+    yield from chunker.flush_spans()
+
+def split_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP,
+               unit: Optional[str] = None) -> List[str]:
+    """Tek parça metni chunk metinlerine böl"""
+    return [chunk.text for chunk in iter_chunks(text, chunk_size, overlap, unit or CHUNK_SIZE_UNIT)]
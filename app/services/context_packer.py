@@ -0,0 +1,101 @@
+import os
+from typing import Dict, List
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Chat prompt'undaki kaynak bağlamı için token bütçesi
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "6000"))
+
+# Ardışık chunk'lar arasında aranacak en uzun örtüşme (chunk overlap'inden biraz fazla)
+MAX_OVERLAP_CHARS = 400
+_OVERLAP_PROBE = 40
+
+def estimate_tokens(text: str) -> int:
+    """Yaklaşık token sayısı (~4 karakter / token)"""
+    return (len(text) + 3) // 4
+
+def merge_overlapping(left: str, right: str) -> str:
+    """Ardışık iki chunk'ı ortak kısmı tekrar etmeden birleştir"""
+    probe = left[-_OVERLAP_PROBE:]
+    if len(probe) == _OVERLAP_PROBE:
+        idx = right.find(probe, 0, MAX_OVERLAP_CHARS + _OVERLAP_PROBE)
+        if idx != -1:
+            overlap = idx + len(probe)
+            if left.endswith(right[:overlap]):
+                return left + right[overlap:]
+    return f"{left} {right}"
+
+def _build_spans(context_documents: List[Dict]) -> List[Dict]:
+    """Aynı dökümanın komşu chunk'larını tek bir metin aralığında birleştir"""
+    by_document: Dict = {}
+    for doc in context_documents:
+        by_document.setdefault(doc.get('document_id', doc.get('filename')), []).append(doc)
+
+    spans = []
+    for document_id, docs in by_document.items():
+        docs.sort(key=lambda d: d.get('chunk_index', 0))
+        current = None
+        for doc in docs:
+            index = doc.get('chunk_index', 0)
+            score = doc.get('chunk_score', 0.0)
+            if current and index - current['last_index'] <= 1:
+                if index != current['last_index']:
+                    current['text'] = merge_overlapping(current['text'], doc.get('content_text', ''))
+                current['last_index'] = index
+                current['score'] = max(current['score'], score)
+                continue
+
+            current = {
+                'document_id': document_id,
+                'filename': doc.get('filename', 'Bilinmeyen'),
+                'summary': doc.get('summary', ''),
+                'first_index': index,
+                'last_index': index,
+                'text': doc.get('content_text', ''),
+                'score': score
+            }
+            spans.append(current)
+    return spans
+
+def pack_context(context_documents: List[Dict], token_budget: int = CHAT_CONTEXT_TOKEN_BUDGET) -> List[Dict]:
+    """Chunk'ları prompt için paketle.
+
+    Komşu/örtüşen chunk'lar birleştirilir, her döküman özeti bir kez yazılır ve
+    aralıklar skora göre token bütçesi dolana kadar eklenir. Dönen liste döküman
+    başına bir kaynaktır: ``{'filename', 'summary', 'spans': [str, ...]}``.
+    """
+    spans = sorted(_build_spans(context_documents), key=lambda s: s['score'], reverse=True)
+
+    sources: Dict = {}
+    used = 0
+    for span in spans:
+        source = sources.get(span['document_id'])
+        cost = estimate_tokens(span['text'])
+        if source is None and span['summary']:
+            cost += estimate_tokens(span['summary'])
+        if used + cost > token_budget:
+            if sources:
+                continue
+            # En iyi aralık tek başına bütçeyi aşıyorsa bütçeye sığacak kadarını al
+            span['text'] = span['text'][:max(0, token_budget - (cost - estimate_tokens(span['text']))) * 4]
+            cost = token_budget - used
+
+        used += cost
+        if source is None:
+            source = sources[span['document_id']] = {
+                'filename': span['filename'],
+                'summary': span['summary'],
+                'spans': []
+            }
+        source['spans'].append(span)
+
+    packed = []
+    for source in sources.values():
+        # Döküman içindeki aralıkları okuma sırasına koy
+        source['spans'] = [s['text'] for s in sorted(source['spans'], key=lambda s: s['first_index'])]
+        packed.append(source)
+
+    print(f"📦 Context packed: {len(context_documents)} chunks → {sum(len(s['spans']) for s in packed)} spans, ~{used} tokens")
+    return packed
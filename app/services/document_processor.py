@@ -1,173 +1,327 @@
 import os
 import json
-import io
-from typing import Optional
-import fitz  # PyMuPDF
-import pytesseract
-from PIL import Image
-from docx import Document as DocxDocument
-import openpyxl
+import asyncio
+import zipfile
+from typing import AsyncIterator, List, Optional
 from sqlalchemy.orm import Session
 
-from app.models.document import Document, DocumentChunk
-from app.services.gemini_service import GeminiService
+from app.models.document import Document, DocumentChunk, ChunkEmbedding
+from app.services.gemini_service import GeminiService, EMBED_BATCH_SIZE
+from app.services.embedding_migration import active_model
+from app.services.fallbacks import extractive_summary, local_keywords
+from app.services.extractors import extraction_pool
+from app.services.extractors import docx_text, html_text, ocr, pdf, plain_text, quality, spreadsheet, word97
+from app.services.chunker import TextChunker, normalize_text
+from app.services.extraction_cache import DegradedText, extraction_cache, file_sha256, make_extraction_key
+from app.services.ingest_pipeline import (
+    INGEST_CONTENT_MAX_CHARS, RunningMean, iterate_in_thread, run_pipeline
+)
+
+# Gerçek dosya formatı -> çıkarıcı (önbellek anahtarı ve versiyonu için)
+EXTRACTORS_BY_TYPE = {
+    "pdf": "pdf",
+    "docx": "docx",
+    "doc": "doc",
+    "xlsx": "excel", "xls": "excel",
+    "jpg": "image", "jpeg": "image", "png": "image", "gif": "image", "bmp": "image", "tiff": "image",
+}
+def _office_container_type(file_path: str, header: bytes) -> Optional[str]:
+    """ZIP (OOXML) ve OLE konteynerlerinde Word ile Excel'i ayırt et - içerikten anlaşılmazsa None"""
+    if header.startswith(b'PK\x03\x04'):
+        with zipfile.ZipFile(file_path) as archive:
+            names = set(archive.namelist())
+        if "word/document.xml" in names:
+            return "docx"
+        if "xl/workbook.xml" in names:
+            return "xlsx"
+    elif header.startswith(word97.OLE_SIGNATURE):
+        streams = word97.ole_stream_names(file_path)
+        if "WordDocument" in streams:
+            return "doc"
+        if "Workbook" in streams or "Book" in streams:
+            return "xls"
+    return None
+
+# Akış halinde (blok blok) okunan, dosya önbelleğine alınmayan düz metin formatları
+STREAMED_TEXT_READERS = {
+    "txt": plain_text.iter_text_blocks,
+    "html": html_text.iter_html_blocks, "htm": html_text.iter_html_blocks,
+}
+# Çıkarıcıların hata durumunda döndürdüğü metinlerde geçer - bunlar önbelleğe alınmaz
+EXTRACTION_ERROR_MARKER = "metin çıkarılamadı"
 
 class DocumentProcessor:
     def __init__(self):
         self.gemini_service = GeminiService()
-        # Tesseract path'ini ayarla (Windows için)
-        tesseract_cmd = os.getenv("TESSERACT_CMD", "tesseract")
-        if os.name == 'nt' and tesseract_cmd == "tesseract":
-            # Windows için varsayılan path
-            possible_paths = [
-                r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-                r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe"
-            ]
-            for path in possible_paths:
-                if os.path.exists(path):
-                    pytesseract.pytesseract.tesseract_cmd = path
-                    break
     
     async def process_document(self, document: Document, db: Session) -> bool:
-        """Dökümanı işle ve AI analizi yap"""
+        """Dökümanı iki aşamada işle: önce indeksle (aranabilir yap), sonra zenginleştir"""
+        if not await self.index_document(document, db):
+            return False
+        
+        # Özet/anahtar kelime hatası dökümanın aranabilirliğini etkilemez
+        await self.enrich_document(document, db)
+        return True
+    
+    async def index_document(self, document: Document, db: Session) -> bool:
+        """İndeksleme aşaması: metni çıkar, chunk'la, embed et, kaydet ve aranabilir işaretle.
+        
+        Çıkarılabilir metin yoksa (desteklenmeyen/boş/okunamayan dosya) False döner - yeniden
+        denemek anlamsızdır. Geçici hatalar (embedding, OCR) temizlikten sonra yükseltilir.
+        """
+        was_processed = bool(document.processed)
         try:
-            print(f"🚀 Döküman işleme başlıyor: {document.filename}")
+            print(f"🚀 Döküman indeksleme başlıyor: {document.filename}")
             print(f"📁 Dosya yolu: {document.file_path}")
             print(f"🔧 Dosya tipi: {document.file_type}")
             
-            # İçeriği çıkar
-            print(f"📖 Metin çıkarma başlıyor...")
-            content_text = await self.extract_text_content(document.file_path, document.file_type)
+            # Aranabilir döküman yeniden indekslenirken eski chunk'larıyla aranabilir kalır
+            document.index_status = "indexing"
+            db.commit()
+            
+            # Sayfa sayfa çıkar → chunk'la → embed et → kaydet (aşamalar eşzamanlı)
+            print(f"📖 Metin çıkarma ve chunk'lama başlıyor...")
+            pages = self.iter_text_pages(document.file_path, document.file_type)
+            content_text, embeddings = await self.create_document_chunks(document, pages, db)
             
             if not content_text:
                 print(f"❌ No content extracted from {document.filename}")
+                db.rollback()
+                self._discard_staged_chunks(document, db)
+                self._set_status(document, db, processed=was_processed, index_status="failed")
                 return False
             
             print(f"✅ Metin çıkarma tamamlandı: {len(content_text)} karakter")
+            document.content_text = content_text
+            
+            # Döküman vektörü = chunk vektörlerinin ortalaması (ikinci kez embed etmeye gerek yok)
+            print(f"🧠 Döküman embedding'i chunk'lardan türetildi: {len(embeddings)} boyut")
+            document.embeddings = json.dumps(embeddings)
+            document.processed = True
+            document.index_status = "ready"
+            
+            print(f"💾 Veritabanı commit ediliyor...")
+            db.commit()
+            print(f"✅ Döküman aranabilir: {document.filename}")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Document indexing error for {document.filename}: {e}")
+            print(f"❌ Hata türü: {type(e)}")
+            import traceback
+            print(f"❌ Traceback: {traceback.format_exc()}")
+            db.rollback()
+            self._discard_staged_chunks(document, db)
+            self._set_status(document, db, processed=was_processed, index_status="failed")
+            raise
+    
+    async def enrich_document(self, document: Document, db: Session) -> bool:
+        """Zenginleştirme aşaması: özet ve anahtar kelimeleri çıkar"""
+        try:
+            document.enrichment_status = "running"
+            db.commit()
             
-            # AI analizi yap
+            content_text = document.content_text or ""
             print(f"🤖 AI analizi başlıyor...")
             try:
-                print(f"📝 Özet oluşturuluyor...")
-                summary = await self.gemini_service.generate_summary(content_text)
+                print(f"📝 Özet ve anahtar kelimeler çıkarılıyor...")
+                analysis = await self.gemini_service.analyze_document(content_text)
+                summary = analysis["summary"]
+                keywords = analysis["keywords"]
                 print(f"✅ Özet tamamlandı: {len(summary)} karakter")
-                
-                print(f"🔑 Anahtar kelimeler çıkarılıyor...")
-                keywords = await self.gemini_service.extract_keywords(content_text)
                 print(f"✅ Anahtar kelimeler tamamlandı: {len(keywords)} kelime")
                 
-                print(f"🧠 Embedding oluşturuluyor...")
-                embeddings = await self.gemini_service.generate_embeddings(content_text)
-                print(f"✅ Embedding tamamlandı: {len(embeddings)} vektör")
-                
             except Exception as ai_error:
                 print(f"❌ AI analizi hatası: {ai_error}")
                 print(f"❌ AI hata türü: {type(ai_error)}")
-                # AI hatası durumunda varsayılan değerler kullan
-                summary = "AI analizi başarısız"
-                keywords = ["hata"]
-                embeddings = []
+                # AI erişilemezse yerel özet ve anahtar kelimeler kullan
+                summary = extractive_summary(content_text)
+                keywords = local_keywords(content_text)
             
-            # Veritabanını güncelle
-            print(f"💾 Veritabanı güncelleniyor...")
-            document.content_text = content_text
             document.summary = summary
             document.keywords = json.dumps(keywords, ensure_ascii=False)
-            document.embeddings = json.dumps(embeddings)
-            document.processed = True
-            
-            print(f"✅ Veritabanı güncellendi")
-            
-            # Dökümanı parçalara böl ve kaydet
-            print(f"✂️ Döküman chunk'lara bölünüyor...")
-            await self.create_document_chunks(document, content_text, db)
-            
-            print(f"💾 Veritabanı commit ediliyor...")
+            document.enrichment_status = "done"
             db.commit()
-            print(f"✅ Döküman işleme tamamlandı: {document.filename}")
+            print(f"✅ Döküman zenginleştirme tamamlandı: {document.filename}")
             return True
             
         except Exception as e:
-            print(f"❌ Document processing error for {document.filename}: {e}")
-            print(f"❌ Hata türü: {type(e)}")
-            print(f"❌ Hata detayı: {str(e)}")
-            import traceback
-            print(f"❌ Traceback: {traceback.format_exc()}")
+            print(f"❌ Document enrichment error for {document.filename}: {e}")
             db.rollback()
+            self._set_status(document, db, enrichment_status="failed")
             return False
     
-    async def extract_text_content(self, file_path: str, file_type: str) -> Optional[str]:
-        """Dosyadan metin içeriği çıkar - Akıllı format tespiti ile"""
+    def _delete_chunks(self, db: Session, chunk_filter):
+        """Chunk'ları shadow vektörleriyle birlikte sil (commit çağırana bırakılır)"""
+        chunk_ids = db.query(DocumentChunk.id).filter(chunk_filter)
+        db.query(ChunkEmbedding).filter(ChunkEmbedding.chunk_id.in_(chunk_ids)).delete(synchronize_session=False)
+        db.query(DocumentChunk).filter(chunk_filter).delete(synchronize_session=False)
+    
+    def _discard_staged_chunks(self, document: Document, db: Session):
+        """Başarısız yeniden indekslemenin yarım kalan (staged) chunk'larını sil"""
         try:
-            # Dosya header'ını kontrol et ve gerçek formatı tespit et
-            real_file_type = await self._detect_real_file_type(file_path, file_type)
-            print(f"🔍 Dosya uzantısı: {file_type}, Gerçek format: {real_file_type}")
-            
-            if real_file_type == "pdf":
-                return await self._extract_pdf_text(file_path)
-            elif real_file_type == "docx":
-                return await self._extract_docx_text(file_path)
-            elif real_file_type == "doc":
-                return await self._extract_doc_text(file_path)
-            elif real_file_type in ["xlsx", "xls"]:
-                return await self._extract_excel_text(file_path)
-            elif real_file_type in ["jpg", "jpeg", "png", "gif", "bmp", "tiff"]:
-                return await self._extract_image_text(file_path)
-            elif real_file_type in ["html", "htm"]:
-                return await self._extract_html_text(file_path)
-            elif real_file_type == "txt":
-                return await self._extract_txt_text(file_path)
-            else:
-                print(f"⚠️ Desteklenmeyen dosya formatı: {real_file_type}")
-                return None
+            self._delete_chunks(db, (DocumentChunk.document_id == document.id) & (DocumentChunk.staged == True))
+            db.commit()
         except Exception as e:
-            print(f"Text extraction error: {e}")
-            return None
+            print(f"❌ Staged chunk'lar silinemedi: {e}")
+            db.rollback()
     
-    async def _extract_pdf_text(self, file_path: str) -> str:
-        """PDF'den metin çıkar - PyMuPDF ile optimize edilmiş"""
-        text = ""
+    def _set_status(self, document: Document, db: Session, **statuses):
+        """Hata sonrası aşama durumunu kaydet (kayıt da başarısız olursa sadece logla)"""
         try:
-            pdf_document = fitz.open(file_path)
-            for page_num in range(pdf_document.page_count):
-                page = pdf_document[page_num]
-                page_text = page.get_text()
-                if page_text.strip():
-                    text += page_text + "\n"
-                else:
-                    # Eğer metin yoksa OCR dene
-                    pix = page.get_pixmap()
-                    img_data = pix.tobytes("png")
-                    try:
-                        ocr_text = pytesseract.image_to_string(Image.open(io.BytesIO(img_data)), lang='tur+eng')
-                        text += ocr_text + "\n"
-                    except:
-                        pass
-            pdf_document.close()
+            for field, value in statuses.items():
+                setattr(document, field, value)
+            db.commit()
+        except Exception as e:
+            print(f"❌ Durum kaydedilemedi: {e}")
+            db.rollback()
+    
+    async def iter_text_pages(self, file_path: str, file_type: str) -> AsyncIterator[str]:
+        """Metni sayfa sayfa üret - PDF'ler pencereler halinde, TXT/HTML bloklar halinde, diğerleri tek parça"""
+        real_file_type = await self._detect_real_file_type(file_path, file_type)
+        print(f"🔍 Dosya uzantısı: {file_type}, Gerçek format: {real_file_type}")
+        if real_file_type == "pdf":
+            async for page in self._iter_pdf_pages(file_path):
+                if quality.looks_like_garbage(page):
+                    print(f"🗑️ Okunamayan PDF sayfası atlandı ({len(page)} karakter)")
+                    continue
+                yield page
+            return
+        
+        if real_file_type in STREAMED_TEXT_READERS:
+            # Okuma zaten ucuz - önbellek yerine sabit bellekle doğrudan akış
+            async for block in self._iter_streamed_text(file_path, real_file_type):
+                if quality.looks_like_garbage(block):
+                    print(f"🗑️ Okunamayan metin bloğu atlandı ({len(block)} karakter)")
+                    continue
+                yield block
+            return
+        
+        text = await self._extract_cached(file_path, real_file_type)
+        if not text:
+            return
+        # Hata mesajları ve ikili/bozuk metin chunk'lanıp embed edilmez
+        if EXTRACTION_ERROR_MARKER in text[:200]:
+            print(f"⚠️ Metin çıkarılamadı, indekslenmeyecek: {text[:200]}")
+            return
+        if quality.looks_like_garbage(text):
+            print(f"🗑️ Çıkarılan metin okunabilir değil (okunabilir oran "
+                  f"{quality.readable_ratio(text):.2f}), indekslenmeyecek")
+            return
+        yield text
+    
+    async def _iter_streamed_text(self, file_path: str, real_file_type: str) -> AsyncIterator[str]:
+        """TXT/HTML bloklarını üret - HTML ayrıştırılamazsa (blok üretilmeden) düz metin olarak okunur"""
+        reader = STREAMED_TEXT_READERS[real_file_type]
+        yielded = False
+        try:
+            async for block in iterate_in_thread(reader(file_path)):
+                yielded = True
+                yield block
         except Exception as e:
-            print(f"PDF extraction error: {e}")
+            if yielded or reader is plain_text.iter_text_blocks:
+                raise
+            print(f"❌ HTML metin çıkarma hatası: {e} - düz metin olarak okunuyor")
+            async for block in iterate_in_thread(plain_text.iter_text_blocks(file_path)):
+                yield block
+    
+    async def _extract_cached(self, file_path: str, real_file_type: str) -> Optional[str]:
+        """Çıkarma önbelleğini kullanarak metni çıkar"""
+        try:
+            # Dosya bazında önbellek - PDF'ler bu yoldan geçmez, OCR sayfaları ayrıca önbelleğe alınır
+            extractor = EXTRACTORS_BY_TYPE.get(real_file_type)
+            if extractor is None:
+                return await self._extract_by_type(file_path, real_file_type)
+            
+            content_hash = await asyncio.to_thread(file_sha256, file_path)
+            cache_key = make_extraction_key(extractor, content_hash, *self._extraction_settings(extractor))
+            cached = extraction_cache.get(cache_key)
+            if cached is not None:
+                print(f"♻️ Çıkarılmış metin önbellekten alındı ({extractor})")
+                return cached
+            
+            text = await self._extract_by_type(file_path, real_file_type)
+            if isinstance(text, DegradedText):
+                print(f"⚠️ Fallback ile çıkarılan metin önbelleğe alınmadı ({extractor})")
+            elif text and EXTRACTION_ERROR_MARKER not in text[:200]:
+                extraction_cache.put(cache_key, extractor, text)
+            return text
+        except ocr.OcrFailed:
+            raise  # Geçici OCR hatası - iş yeniden denenir
+        except Exception as e:
+            print(f"Text extraction error: {e}")
+            return None
+    
+    def _extraction_settings(self, extractor: str) -> List[str]:
+        """Çıkarılan metni etkileyen ayarlar (model, OCR dili vb.)"""
+        if extractor == "image":
+            return [self.gemini_service.provider.vision_model, ocr.settings_key()]
+        return []
+    
+    async def _extract_by_type(self, file_path: str, real_file_type: str) -> Optional[str]:
+        """Formata uygun çıkarıcıyı çalıştır (PDF'ler sayfa sayfa, TXT/HTML bloklar halinde ayrıca işlenir)"""
+        if real_file_type == "docx":
+            return await self._extract_docx_text(file_path)
+        elif real_file_type == "doc":
+            return await self._extract_doc_text(file_path)
+        elif real_file_type in ["xlsx", "xls"]:
+            return await self._extract_excel_text(file_path, real_file_type)
+        elif real_file_type in ["jpg", "jpeg", "png", "gif", "bmp", "tiff"]:
+            return await self._extract_image_text(file_path)
+        else:
+            print(f"⚠️ Desteklenmeyen dosya formatı: {real_file_type}")
+            return None
+    
+    async def _iter_pdf_pages(self, file_path: str) -> AsyncIterator[str]:
+        """PDF sayfalarını ``PDF_PAGE_WINDOW``'luk pencerelerle çıkar, temizle ve sırayla üret"""
+        page_count = await extraction_pool.run(pdf.pdf_page_count, file_path)
+        print(f"📄 PDF sayfa sayısı: {page_count}")
+        
+        total_chars = 0
+        for start in range(0, page_count, pdf.PDF_PAGE_WINDOW):
+            pages = await extraction_pool.run(pdf.extract_pdf_pages, file_path, start, start + pdf.PDF_PAGE_WINDOW)
+            for text in await self._ocr_scanned_pages(file_path, start, pages):
+                # Metni temizle ve normalize et
+                cleaned_text = normalize_text(text)
+                if cleaned_text:
+                    total_chars += len(cleaned_text)
+                    yield cleaned_text
+        print(f"🧹 PDF metni temizlendi: {total_chars} karakter")
+    
+    async def _ocr_scanned_pages(self, file_path: str, start: int, pages: List[pdf.PdfPage]) -> List[str]:
+        """Metin katmanı olmayan (taranmış) sayfaları OCR'la - sonuçlar sayfa özetine göre önbellekte"""
+        texts = [page.text for page in pages]
+        scanned = {i: make_extraction_key("ocr_page", page.fingerprint, ocr.settings_key())
+                   for i, page in enumerate(pages) if page.fingerprint}
+        if not scanned:
+            return texts
+        
+        cached = extraction_cache.get_many(list(scanned.values()))
+        for index, cache_key in scanned.items():
+            if cache_key in cached:
+                texts[index] = cached[cache_key]
         
-        # Metni temizle ve normalize et
-        cleaned_text = self._clean_and_normalize_text(text)
-        return cleaned_text
+        missing = [i for i, cache_key in scanned.items() if cache_key not in cached]
+        print(f"🔎 Sayfa {start + 1}-{start + len(pages)}: {len(scanned)} taranmış sayfa, "
+              f"{len(scanned) - len(missing)} önbellekten, {len(missing)} OCR ({ocr.OCR_DPI} DPI)")
+        if missing:
+            # OCR'lanamayan sayfa varsa OcrFailed yükselir ve döküman indekslenmez (iş yeniden denenir)
+            results = await ocr.ocr_pdf_pages(file_path, [start + i for i in missing])
+            for index, page_text in zip(missing, results):
+                texts[index] = page_text
+            extraction_cache.put_many({
+                scanned[index]: page_text for index, page_text in zip(missing, results)
+            }, "ocr_page")
+        return texts
     
     async def _extract_docx_text(self, file_path: str) -> str:
-        """DOCX dosyasından metin çıkar"""
+        """DOCX dosyasından metin çıkar - süreç havuzunda"""
         try:
             print(f"📝 DOCX dosyası işleniyor: {file_path}")
-            doc = DocxDocument(file_path)
-            text = ""
-            
-            print(f"📊 DOCX paragraf sayısı: {len(doc.paragraphs)}")
-            
-            for i, paragraph in enumerate(doc.paragraphs):
-                if paragraph.text.strip():
-                    text += paragraph.text + "\n"
-                    if i < 5:  # İlk 5 paragrafı logla
-                        print(f"📝 Paragraf {i+1}: {paragraph.text[:100]}...")
+            text = await extraction_pool.run(docx_text.extract_docx_text, file_path)
             
             # Metni temizle ve normalize et
-            cleaned_text = self._clean_and_normalize_text(text)
+            cleaned_text = normalize_text(text, keep_lines=True)
             print(f"✅ DOCX metin çıkarma başarılı: {len(cleaned_text)} karakter")
             return cleaned_text
             
@@ -183,69 +337,71 @@ class DocumentProcessor:
             
             # Dosya header'ını kontrol et
             with open(file_path, 'rb') as f:
-                header = f.read(16)
+                header = f.read(8)
                 print(f"🔍 DOC header (hex): {header.hex()}")
-                print(f"🔍 DOC header (ascii): {repr(header)}")
             
-            # 1. Yöntem: python-docx ile dene (bazen .doc dosyaları .docx olarak açılabilir)
-            try:
-                print("📝 python-docx ile DOC deneniyor...")
-                doc = DocxDocument(file_path)
-                text = ""
-                
-                for i, paragraph in enumerate(doc.paragraphs):
-                    if paragraph.text.strip():
-                        text += paragraph.text + "\n"
-                        if i < 5:
-                            print(f"📝 Paragraf {i+1}: {paragraph.text[:100]}...")
-                
-                if text.strip():
-                    print(f"✅ python-docx ile DOC başarılı: {len(text)} karakter")
-                    return text.strip()
-                else:
-                    print("⚠️ python-docx ile çıkarılan metin boş")
+            # 1. Yöntem: Word 97-2003 ikili formatı (OLE) - piece table'dan saf Python ile
+            if header == word97.OLE_SIGNATURE:
+                try:
+                    print("📝 Word 97 çıkarıcı ile DOC deneniyor...")
+                    text = await extraction_pool.run(word97.extract_doc_text, file_path)
+                    if text.strip():
+                        print(f"✅ Word 97 çıkarıcı ile DOC başarılı: {len(text)} karakter")
+                        return text
+                    print("⚠️ Word 97 çıkarıcı ile çıkarılan metin boş")
+                except Exception as doc_error:
+                    print(f"❌ Word 97 çıkarıcı hatası: {doc_error}")
+            
+            # 2. Yöntem: .doc uzantılı DOCX (zip) dosyaları
+            elif header.startswith(b"PK"):
+                try:
+                    print("📝 DOCX çıkarıcı ile DOC deneniyor...")
+                    text = await extraction_pool.run(docx_text.extract_docx_text, file_path)
+                    if text.strip():
+                        print(f"✅ DOCX çıkarıcı ile DOC başarılı: {len(text)} karakter")
+                        return text
+                    print("⚠️ DOCX çıkarıcı ile çıkarılan metin boş")
+                except Exception as docx_error:
+                    print(f"❌ DOCX çıkarıcı ile DOC hatası: {docx_error}")
+            
+            # 3. Yöntem: Windows COM ile dene (Windows sistemlerde)
+            if os.name == 'nt':
+                try:
+                    print("📝 Windows COM ile DOC deneniyor...")
+                    import win32com.client
                     
-            except Exception as docx_error:
-                print(f"❌ python-docx ile DOC hatası: {docx_error}")
-            
-            # 2. Yöntem: Windows COM ile dene (Windows sistemlerde)
-            try:
-                print("📝 Windows COM ile DOC deneniyor...")
-                import win32com.client
-                import os
-                
-                # Word uygulamasını başlat
-                word = win32com.client.Dispatch("Word.Application")
-                word.Visible = False
-                
-                # Dökümanı aç
-                doc = word.Documents.Open(os.path.abspath(file_path))
-                text = doc.Content.Text
-                
-                # Dökümanı kapat
-                doc.Close()
-                word.Quit()
-                
-                if text.strip():
-                    print(f"✅ Windows COM ile DOC başarılı: {len(text)} karakter")
-                    return text.strip()
-                else:
-                    print("⚠️ Windows COM ile çıkarılan metin boş")
+                    # Word uygulamasını başlat
+                    word = win32com.client.Dispatch("Word.Application")
+                    word.Visible = False
+                    
+                    # Dökümanı aç
+                    doc = word.Documents.Open(os.path.abspath(file_path))
+                    text = doc.Content.Text
                     
-            except Exception as com_error:
-                print(f"❌ Windows COM hatası: {com_error}")
+                    # Dökümanı kapat
+                    doc.Close()
+                    word.Quit()
+                    
+                    if text.strip():
+                        print(f"✅ Windows COM ile DOC başarılı: {len(text)} karakter")
+                        return text.strip()
+                    else:
+                        print("⚠️ Windows COM ile çıkarılan metin boş")
+                        
+                except Exception as com_error:
+                    print(f"❌ Windows COM hatası: {com_error}")
             
-            # 3. Son çare: Düz metin olarak oku
+            # 4. Son çare: Düz metin olarak oku (RTF/metin dosyası .doc uzantılı olabilir)
             try:
                 print("📝 Düz metin olarak DOC deneniyor...")
                 with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                     text = f.read()
                 
-                if len(text.strip()) > 10:
+                if quality.looks_like_garbage(text):
+                    print(f"⚠️ Düz metin okunabilir değil (okunabilir oran {quality.readable_ratio(text):.2f})")
+                else:
                     print(f"✅ Düz metin olarak DOC başarılı: {len(text)} karakter")
                     return text.strip()
-                else:
-                    print("⚠️ Düz metin çok kısa")
                     
             except Exception as text_error:
                 print(f"❌ Düz metin hatası: {text_error}")
@@ -258,139 +414,25 @@ class DocumentProcessor:
             print(f"❌ Hata türü: {type(e)}")
             return f"DOC dosyasından metin çıkarılamadı: {str(e)}"
     
-    async def _extract_excel_text(self, file_path: str) -> str:
-        """Excel dosyasından metin çıkar - Hem .xlsx hem .xls formatlarını destekler"""
+    async def _extract_excel_text(self, file_path: str, real_file_type: str) -> str:
+        """Excel dosyasından metin çıkar - Hem .xlsx hem .xls, süreç havuzunda"""
         try:
-            text = ""
-            
-            # Dosya detaylarını logla
-            print(f"🔍 Excel dosya analizi başlıyor...")
-            print(f"📁 Dosya yolu: {file_path}")
-            print(f"📏 Dosya boyutu: {os.path.getsize(file_path)} bytes")
-            
-            # Dosya header'ını kontrol et
-            with open(file_path, 'rb') as f:
-                header = f.read(16)  # İlk 16 byte
-                print(f"🔍 Dosya header (hex): {header.hex()}")
-                print(f"🔍 Dosya header (ascii): {repr(header)}")
-            
-            # Dosya uzantısına göre uygun yöntemi kullan
-            if file_path.lower().endswith('.xlsx'):
-                print("📊 .xlsx dosyası openpyxl ile işleniyor...")
-                try:
-                    workbook = openpyxl.load_workbook(file_path, data_only=True)
-                    
-                    for sheet_name in workbook.sheetnames:
-                        sheet = workbook[sheet_name]
-                        text += f"\n--- {sheet_name} ---\n"
-                        
-                        for row in sheet.iter_rows(values_only=True):
-                            row_text = " | ".join([str(cell) if cell is not None else "" for cell in row])
-                            if row_text.strip():
-                                text += row_text + "\n"
-                    
-                    workbook.close()
-                    print(f"✅ openpyxl başarılı: {len(text)} karakter")
-                    
-                except Exception as xlsx_error:
-                    print(f"❌ openpyxl hatası: {xlsx_error}")
-                    raise xlsx_error
-                
-            elif file_path.lower().endswith('.xls'):
-                print("📊 .xls dosyası xlrd ile işleniyor...")
-                try:
-                    import xlrd
-                    
-                    # xlrd versiyonunu kontrol et
-                    print(f"📊 xlrd versiyonu: {xlrd.__version__}")
-                    
-                    # Dosya formatını kontrol et
-                    try:
-                        workbook = xlrd.open_workbook(file_path)
-                        print(f"✅ xlrd workbook açıldı, sheet sayısı: {workbook.nsheets}")
-                        
-                        for sheet_name in workbook.sheet_names():
-                            sheet = workbook.sheet_by_name(sheet_name)
-                            text += f"\n--- {sheet_name} ---\n"
-                            print(f"📊 Sheet işleniyor: {sheet_name} ({sheet.nrows} satır, {sheet.ncols} sütun)")
-                            
-                            for row_idx in range(sheet.nrows):
-                                row_values = sheet.row_values(row_idx)
-                                row_text = " | ".join([str(cell) if cell != "" else "" for cell in row_values])
-                                if row_text.strip():
-                                    text += row_text + "\n"
-                        
-                        print(f"✅ xlrd başarılı: {len(text)} karakter")
-                        
-                    except Exception as xlrd_error:
-                        print(f"❌ xlrd hatası: {xlrd_error}")
-                        print(f"❌ Hata türü: {type(xlrd_error)}")
-                        
-                        # Alternatif yöntemler dene
-                        print("🔄 Alternatif yöntemler deneniyor...")
-                        
-                        # 1. pandas ile dene
-                        try:
-                            import pandas as pd
-                            print("📊 pandas ile deneniyor...")
-                            df = pd.read_excel(file_path, engine='xlrd')
-                            text = f"Pandas ile okunan veri:\n{df.to_string()}"
-                            print(f"✅ pandas başarılı: {len(text)} karakter")
-                            return text.strip()
-                        except Exception as pd_error:
-                            print(f"❌ pandas hatası: {pd_error}")
-                        
-                        # 2. openpyxl ile dene (bazen .xls dosyaları .xlsx olarak açılabilir)
-                        try:
-                            print("📊 openpyxl ile .xls deneniyor...")
-                            workbook = openpyxl.load_workbook(file_path, data_only=True)
-                            for sheet_name in workbook.sheetnames:
-                                sheet = workbook[sheet_name]
-                                text += f"\n--- {sheet_name} ---\n"
-                                for row in sheet.iter_rows(values_only=True):
-                                    row_text = " | ".join([str(cell) if cell is not None else "" for cell in row])
-                                    if row_text.strip():
-                                        text += row_text + "\n"
-                            workbook.close()
-                            print(f"✅ openpyxl .xls başarılı: {len(text)} karakter")
-                            return text.strip()
-                        except Exception as openpyxl_xls_error:
-                            print(f"❌ openpyxl .xls hatası: {openpyxl_xls_error}")
-                        
-                        raise xlrd_error
-                        
-                except Exception as xlrd_error:
-                    print(f"❌ xlrd genel hatası: {xlrd_error}")
-                    raise xlrd_error
-                
-            else:
-                print(f"⚠️ Bilinmeyen Excel formatı: {file_path}")
-                return f"Desteklenmeyen Excel formatı: {file_path}"
-            
-            if not text.strip():
-                print("⚠️ Çıkarılan metin boş!")
-                return "Excel dosyasından metin çıkarılamadı: Boş içerik"
-            
-            print(f"✅ Excel metin çıkarma başarılı: {len(text)} karakter")
-            return text.strip()
-            
+            return await extraction_pool.run(spreadsheet.extract_excel_text, file_path, real_file_type)
         except Exception as e:
             print(f"❌ Excel metin çıkarma hatası: {e}")
-            print(f"❌ Hata türü: {type(e)}")
-            print(f"❌ Hata detayı: {str(e)}")
-            
-            # Dosya hakkında ek bilgi
-            try:
-                import magic
-                mime_type = magic.from_file(file_path, mime=True)
-                print(f"🔍 MIME type: {mime_type}")
-            except:
-                print("🔍 MIME type tespit edilemedi")
-            
             return f"Excel dosyasından metin çıkarılamadı: {str(e)}"
     
     async def _extract_image_text(self, file_path: str) -> str:
         """Resimden OCR ile metin çıkar - Gemini Vision API kullanarak"""
+        # Çok sayfalı TIFF: her kare OCR süreçlerinde paralel işlenir. OCR'lanamayan kare
+        # varsa OcrFailed yükselir - eksik metin üretilip önbelleğe alınmaz
+        if file_path.lower().endswith((".tif", ".tiff")):
+            frame_count = await ocr.ocr_pool.run(ocr.image_frame_count, file_path)
+            if frame_count > 1:
+                frames = await ocr.ocr_image_frames(file_path, frame_count)
+                print(f"✅ Çok sayfalı resim OCR'landı: {frame_count} sayfa")
+                return "\n".join(frame.strip() for frame in frames if frame.strip())
+        
         try:
             print(f"🖼️ Gemini Vision API ile resim işleniyor: {file_path}")
             
@@ -399,32 +441,29 @@ class DocumentProcessor:
             
             if extracted_text and len(extracted_text.strip()) > 10:
                 print(f"✅ Gemini OCR başarılı: {len(extracted_text)} karakter çıkarıldı")
+                if isinstance(extracted_text, DegradedText):
+                    return DegradedText(extracted_text.strip())
                 return extracted_text.strip()
             else:
                 print("⚠️ Gemini OCR sonucu çok kısa, Tesseract fallback kullanılıyor...")
                 # Fallback olarak Tesseract kullan
-                image = Image.open(file_path)
-                text = pytesseract.image_to_string(image, lang='tur+eng')
+                text = await ocr.ocr_pool.run(ocr.ocr_image_file, file_path)
                 print(f"✅ Tesseract fallback başarılı: {len(text)} karakter çıkarıldı")
+                if isinstance(extracted_text, DegradedText):
+                    return DegradedText(text.strip())
                 return text.strip()
                 
         except Exception as e:
             print(f"❌ Gemini OCR hatası: {e}")
             try:
                 print("🔄 Tesseract fallback deneniyor...")
-                image = Image.open(file_path)
-                text = pytesseract.image_to_string(image, lang='tur+eng')
+                text = await ocr.ocr_pool.run(ocr.ocr_image_file, file_path)
                 print(f"✅ Tesseract fallback başarılı: {len(text)} karakter çıkarıldı")
-                return text.strip()
+                return DegradedText(text.strip())
             except Exception as fallback_error:
                 print(f"❌ Tesseract fallback da başarısız: {fallback_error}")
                 return f"Resimden metin çıkarılamadı. Hata: {str(e)}"
     
-    async def _extract_txt_text(self, file_path: str) -> str:
-        """TXT dosyasından metin çıkar"""
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
-    
     async def _detect_real_file_type(self, file_path: str, file_extension: str) -> str:
         """Dosya header'ına göre gerçek formatı tespit et"""
         try:
@@ -438,25 +477,18 @@ class DocumentProcessor:
                 print("📄 PDF formatı tespit edildi")
                 return "pdf"
             
-            # DOCX tespiti (ZIP formatı)
-            elif header.startswith(b'PK\x03\x04'):
-                print("📝 DOCX formatı tespit edildi")
-                return "docx"
-            
-            # DOC tespiti (OLE formatı)
-            elif header.startswith(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'):
-                print("📝 DOC formatı tespit edildi")
-                return "doc"
-            
-            # XLSX tespiti (ZIP formatı)
-            elif header.startswith(b'PK\x03\x04'):
-                print("📊 XLSX formatı tespit edildi")
-                return "xlsx"
-            
-            # XLS tespiti (OLE formatı)
-            elif header.startswith(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'):
-                print("📊 XLS formatı tespit edildi")
-                return "xls"
+            # Office konteynerleri: ZIP (DOCX/XLSX) ve OLE (DOC/XLS) - içeriğe bakılarak ayrılır
+            elif header.startswith(b'PK\x03\x04') or header.startswith(word97.OLE_SIGNATURE):
+                try:
+                    container_type = await asyncio.to_thread(_office_container_type, file_path, header)
+                except Exception as e:
+                    print(f"⚠️ Office konteyneri okunamadı ({e})")
+                    container_type = None
+                if container_type:
+                    print(f"📦 {container_type.upper()} formatı tespit edildi")
+                    return container_type
+                print(f"⚠️ Office içeriği belirsiz, uzantıya göre işleniyor: {file_extension}")
+                return file_extension.lower()
             
             # HTML tespiti
             elif header.startswith(b'<html') or header.startswith(b'<!DOCTYPE') or header.startswith(b'<'):
@@ -486,113 +518,87 @@ class DocumentProcessor:
             print(f"❌ Format tespit hatası: {e}")
             return file_extension.lower()
     
-    async def _extract_html_text(self, file_path: str) -> str:
-        """HTML dosyasından metin çıkar - Tag'leri temizleyerek"""
-        try:
-            print(f"🌐 HTML dosyası işleniyor: {file_path}")
-            
-            # Dosya header'ını kontrol et
-            with open(file_path, 'rb') as f:
-                header = f.read(50)  # İlk 50 byte
-                print(f"🔍 HTML header: {repr(header)}")
-            
-            # HTML'i oku
-            with open(file_path, 'r', encoding='utf-8') as file:
-                html_content = file.read()
-            
-            # Basit HTML tag temizleme
-            import re
-            
-            # Script ve style tag'lerini kaldır
-            html_content = re.sub(r'<script[^>]*>.*?</script>', '', html_content, flags=re.DOTALL | re.IGNORECASE)
-            html_content = re.sub(r'<style[^>]*>.*?</style>', '', html_content, flags=re.DOTALL | re.IGNORECASE)
-            
-            # HTML tag'lerini kaldır
-            html_content = re.sub(r'<[^>]+>', '', html_content)
-            
-            # Çoklu boşlukları temizle
-            html_content = re.sub(r'\s+', ' ', html_content)
-            
-            # HTML entities'leri decode et
-            html_content = html_content.replace('&nbsp;', ' ')
-            html_content = html_content.replace('&amp;', '&')
-            html_content = html_content.replace('&lt;', '<')
-            html_content = html_content.replace('&gt;', '>')
-            html_content = html_content.replace('&quot;', '"')
-            
-            # Başındaki ve sonundaki boşlukları temizle
-            html_content = html_content.strip()
-            
-            print(f"✅ HTML metin çıkarma başarılı: {len(html_content)} karakter")
-            return html_content
-            
-        except Exception as e:
-            print(f"❌ HTML metin çıkarma hatası: {e}")
-            # Fallback olarak düz metin olarak oku
-            try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    raw_content = file.read()
-                print(f"✅ HTML fallback başarılı: {len(raw_content)} karakter")
-                return raw_content
-            except Exception as fallback_error:
-                print(f"❌ HTML fallback da başarısız: {fallback_error}")
-                return f"HTML dosyasından metin çıkarılamadı: {str(e)}"
-    
-    async def create_document_chunks(self, document: Document, content_text: str, db: Session):
-        """Dökümanı parçalara böl ve kaydet - Optimize edilmiş"""
+    async def create_document_chunks(self, document: Document, pages: AsyncIterator[str], db: Session):
+        """Sayfaları akış halinde chunk'la, toplu embed et ve batch batch kaydet.
+        
+        Yeni dökümanda ilk batch kaydedildiğinde döküman aranabilir olur; sonraki sayfalar
+        çıkarılırken arama ilk chunk'lar üzerinde çalışabilir. Aranabilir döküman yeniden
+        indekslenirken yeni chunk'lar staged yazılır ve eski chunk'lar aranmaya devam eder;
+        değişim (eski chunk'ları silme + yenileri devreye alma) çağıranın commit'iyle
+        tek transaction'da gerçekleşir. (tam metin, döküman vektörü) döndürür.
+        """
         try:
             print(f"✂️ Chunk oluşturma başlıyor...")
-            print(f"📏 Toplam metin uzunluğu: {len(content_text)} karakter")
-            
-            chunks = self._split_text_into_chunks(content_text, chunk_size=1200, overlap=250)
-            print(f"📊 Toplam {len(chunks)} chunk oluşturuldu")
             
-            # Batch processing için chunks'ları grupla
-            batch_size = 5
-            total_batches = (len(chunks) + batch_size - 1) // batch_size
-            print(f"🔄 {total_batches} batch işlenecek")
+            this_document = DocumentChunk.document_id == document.id
+            staging = bool(document.processed)
+            # Önceki başarısız denemelerin yarım kalan chunk'ları (ve shadow vektörleri) silinir
+            self._delete_chunks(db, this_document & (DocumentChunk.staged == True) if staging else this_document)
+            db.commit()
             
-            for batch_num, i in enumerate(range(0, len(chunks), batch_size), 1):
-                batch_chunks = chunks[i:i+batch_size]
-                print(f"🔄 Batch {batch_num}/{total_batches} işleniyor ({len(batch_chunks)} chunk)")
-                
-                for j, chunk_text in enumerate(batch_chunks):
-                    chunk_index = i + j
-                    print(f"📝 Chunk {chunk_index + 1}/{len(chunks)} işleniyor ({len(chunk_text)} karakter)")
-                    
-                    try:
-                        # Her parça için embedding oluştur
-                        print(f"🧠 Chunk {chunk_index + 1} için embedding oluşturuluyor...")
-                        chunk_embeddings = await self.gemini_service.generate_embeddings(chunk_text)
-                        print(f"✅ Chunk {chunk_index + 1} embedding tamamlandı: {len(chunk_embeddings)} vektör")
-                        
-                        chunk = DocumentChunk(
-                            document_id=document.id,
-                            chunk_text=chunk_text,
-                            chunk_index=chunk_index,
-                            embeddings=json.dumps(chunk_embeddings)
-                        )
-                        db.add(chunk)
-                        print(f"✅ Chunk {chunk_index + 1} veritabanına eklendi")
-                        
-                    except Exception as chunk_error:
-                        print(f"❌ Chunk {chunk_index + 1} hatası: {chunk_error}")
-                        # Hata durumunda boş embedding kullan
-                        chunk = DocumentChunk(
-                            document_id=document.id,
-                            chunk_text=chunk_text,
-                            chunk_index=chunk_index,
-                            embeddings=json.dumps([])
-                        )
-                        db.add(chunk)
-                        print(f"⚠️ Chunk {chunk_index + 1} boş embedding ile eklendi")
+            # Chunk'lar kullanıcının aktif embedding modeliyle embed edilir ve etiketlenir
+            model = active_model(db, document.user_id)
+            
+            content_pages = []
+            content = {"chars": 0, "truncated": False}
+            document_vector = RunningMean()
+            progress = {"batches": 0, "chunks": 0, "pages": 0}
+            
+            async def collect_pages():
+                async for page in pages:
+                    progress["pages"] += 1
+                    # content_text sınırlı tutulur; chunk'lama tüm metin üzerinden devam eder
+                    room = INGEST_CONTENT_MAX_CHARS - content["chars"]
+                    if room > 0:
+                        content_pages.append(page[:room])
+                        content["chars"] += min(len(page), room) + 1
+                    elif not content["truncated"]:
+                        content["truncated"] = True
+                        print(f"✂️ content_text {INGEST_CONTENT_MAX_CHARS} karakterde kesildi")
+                    yield page
+            
+            async def embed_batch(batch_chunks: List[str]) -> List[List[float]]:
+                # Her batch tek bir batchEmbedContents isteği ile embed edilir. Hata vektörsüz
+                # chunk olarak kaydedilmez: indeksleme başarısız olur, staged chunk'lar silinir
+                # ve iş kuyruğu yeniden dener (eski chunk'lar aranabilir kalır)
+                try:
+                    return await self.gemini_service.embed_documents_cached(batch_chunks, model=model)
+                except Exception as batch_error:
+                    print(f"❌ Batch embedding hatası: {batch_error}")
+                    raise
+            
+            async def persist_batch(batch_chunks: List[str], batch_embeddings: List[List[float]]):
+                for chunk_text, chunk_embeddings in zip(batch_chunks, batch_embeddings):
+                    db.add(DocumentChunk(
+                        document_id=document.id,
+                        chunk_text=chunk_text,
+                        chunk_index=progress["chunks"],
+                        embeddings=json.dumps(chunk_embeddings),
+                        embedding_model=model,
+                        staged=staging
+                    ))
+                    document_vector.add(chunk_embeddings)
+                    progress["chunks"] += 1
+                progress["batches"] += 1
                 
-                # Batch'i commit et
-                print(f"💾 Batch {batch_num} commit ediliyor...")
+                if not staging and not document.processed:
+                    # İlk chunk'lar aranabilir - indeksleme sürerken (index_status=indexing)
+                    document.processed = True
                 db.commit()
-                print(f"✅ Batch {batch_num} commit edildi")
+                print(f"💾 Batch {progress['batches']} kaydedildi ({progress['chunks']} chunk, "
+                      f"{progress['pages']} sayfa çıkarıldı)")
             
-            print(f"🎉 Tüm chunk'lar başarıyla oluşturuldu ve kaydedildi")
+            await run_pipeline(collect_pages(), TextChunker(), EMBED_BATCH_SIZE, embed_batch, persist_batch)
+            
+            if staging and progress["chunks"]:
+                # Eski chunk'ları sil, yenileri devreye al - çağıranın commit'iyle birlikte
+                self._delete_chunks(db, this_document & (DocumentChunk.staged == False))
+                db.query(DocumentChunk).filter(this_document & (DocumentChunk.staged == True)).update(
+                    {DocumentChunk.staged: False}, synchronize_session=False
+                )
+            
+            print(f"🎉 Toplam {progress['chunks']} chunk oluşturuldu ve kaydedildi")
+            return " ".join(content_pages), document_vector.value()
             
         except Exception as e:
             print(f"❌ Chunk oluşturma hatası: {e}")
@@ -600,60 +606,3 @@ class DocumentProcessor:
             import traceback
             print(f"❌ Traceback: {traceback.format_exc()}")
             raise e
-    
-    def _clean_and_normalize_text(self, text: str) -> str:
-        """Metni temizle ve normalize et - PDF'den gelen parçalı metni düzelt"""
-        if not text:
-            return ""
-        
-        # Gereksiz boşlukları ve satır sonlarını temizle
-        lines = text.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if line:  # Boş satırları atla
-                # Satır sonundaki tire işaretlerini kaldır (kelime bölünmesi)
-                if line.endswith('-') and len(line) > 1:
-                    line = line[:-1]
-                cleaned_lines.append(line)
-        
-        # Satırları birleştir ve normal cümle yapısına getir
-        normalized_text = ' '.join(cleaned_lines)
-        
-        # Çoklu boşlukları tek boşluk yap
-        import re
-        normalized_text = re.sub(r'\s+', ' ', normalized_text)
-        
-        # Noktalama işaretlerinden sonra tek boşluk bırak
-        normalized_text = re.sub(r'([.!?])\s*', r'\1 ', normalized_text)
-        
-        # Paragraf yapısını koru (çift satır sonu)
-        normalized_text = re.sub(r'\n\s*\n', '\n\n', normalized_text)
-        
-        print(f"🧹 Text cleaned: {len(text)} → {len(normalized_text)} characters")
-        return normalized_text.strip()
-    
-    def _split_text_into_chunks(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> list:
-        """Metni overlapping parçalara böl"""
-        chunks = []
-        start = 0
-        
-        while start < len(text):
-            end = start + chunk_size
-            chunk = text[start:end]
-            
-            # Kelime ortasında kesmemek için
-            if end < len(text) and not text[end].isspace():
-                last_space = chunk.rfind(' ')
-                if last_space > 0:
-                    chunk = chunk[:last_space]
-                    end = start + last_space
-            
-            chunks.append(chunk.strip())
-            start = end - overlap
-            
-            if start >= len(text):
-                break
-        
-        return [chunk for chunk in chunks if chunk.strip()]
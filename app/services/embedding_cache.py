@@ -0,0 +1,118 @@
+import os
+import json
+import hashlib
+import unicodedata
+from typing import Dict, List, Sequence
+
+from sqlalchemy import func
+from dotenv import load_dotenv
+
+from app.database.database import SessionLocal
+from app.models.cache import EmbeddingCache
+
+load_dotenv()
+
+# Önbellekte tutulacak en fazla vektör sayısı (en eski kullanılanlar silinir)
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+# SQLite'ın IN (...) parametre sınırının altında kal
+_LOOKUP_BATCH = 500
+
+def normalize_text(text: str) -> str:
+    """Önbellek anahtarı için metni normalize et (Unicode NFC + boşluk sadeleştirme)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def make_cache_key(text: str, model: str, task_type: str) -> str:
+    """sha256(normalize metin) + model + task_type anahtarı"""
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{model}:{task_type}:{digest}"
+
+class EmbeddingCacheStore:
+    """Dökümanlar ve yeniden işlemeler arasında paylaşılan kalıcı embedding önbelleği"""
+
+    def __init__(self, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+
+    def get_many(self, texts: Sequence[str], model: str, task_type: str) -> Dict[int, List[float]]:
+        """Toplu arama - bulunan metinlerin indeksi -> vektör"""
+        keys = [make_cache_key(text, model, task_type) for text in texts]
+        found: Dict[str, List[float]] = {}
+
+        db = SessionLocal()
+        try:
+            unique_keys = list(dict.fromkeys(keys))
+            for i in range(0, len(unique_keys), _LOOKUP_BATCH):
+                batch = unique_keys[i:i + _LOOKUP_BATCH]
+                rows = db.query(EmbeddingCache.cache_key, EmbeddingCache.embeddings).filter(
+                    EmbeddingCache.cache_key.in_(batch)
+                ).all()
+                for cache_key, embeddings in rows:
+                    found[cache_key] = json.loads(embeddings)
+
+                if rows:
+                    # LRU tahliyesi için son kullanım zamanını güncelle
+                    db.query(EmbeddingCache).filter(
+                        EmbeddingCache.cache_key.in_([row[0] for row in rows])
+                    ).update({EmbeddingCache.last_used_at: func.now()}, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            print(f"❌ Embedding önbellek okuma hatası: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+        return {i: found[key] for i, key in enumerate(keys) if key in found}
+
+    def put_many(self, texts: Sequence[str], embeddings: Sequence[List[float]], model: str, task_type: str):
+        """Yeni vektörleri kaydet ve gerekirse boyut sınırına göre tahliye et"""
+        entries = {}
+        for text, vector in zip(texts, embeddings):
+            if vector:
+                entries[make_cache_key(text, model, task_type)] = vector
+        if not entries:
+            return
+
+        db = SessionLocal()
+        try:
+            existing = set()
+            keys = list(entries)
+            for i in range(0, len(keys), _LOOKUP_BATCH):
+                batch = keys[i:i + _LOOKUP_BATCH]
+                existing.update(row[0] for row in db.query(EmbeddingCache.cache_key).filter(
+                    EmbeddingCache.cache_key.in_(batch)
+                ).all())
+
+            for cache_key, vector in entries.items():
+                if cache_key not in existing:
+                    db.add(EmbeddingCache(
+                        cache_key=cache_key,
+                        model=model,
+                        task_type=task_type,
+                        embeddings=json.dumps(vector)
+                    ))
+            db.commit()
+            self._evict(db)
+        except Exception as e:
+            print(f"❌ Embedding önbellek yazma hatası: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def _evict(self, db):
+        """Sınırı aşan en eski kullanılan kayıtları sil"""
+        total = db.query(func.count(EmbeddingCache.id)).scalar() or 0
+        overflow = total - self.max_entries
+        if overflow <= 0:
+            return
+
+        oldest_ids = [row[0] for row in db.query(EmbeddingCache.id).order_by(
+            EmbeddingCache.last_used_at.asc(), EmbeddingCache.id.asc()
+        ).limit(overflow).all()]
+        for i in range(0, len(oldest_ids), _LOOKUP_BATCH):
+            db.query(EmbeddingCache).filter(
+                EmbeddingCache.id.in_(oldest_ids[i:i + _LOOKUP_BATCH])
+            ).delete(synchronize_session=False)
+        db.commit()
+        print(f"🧹 Embedding önbelleğinden {len(oldest_ids)} kayıt silindi")
+
+embedding_cache = EmbeddingCacheStore()
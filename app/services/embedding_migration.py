@@ -0,0 +1,232 @@
+import json
+from collections import defaultdict
+from typing import Dict, Optional
+
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+from app.database.database import SessionLocal
+from app.models.document import Document, DocumentChunk, ChunkEmbedding, EmbeddingIndex
+from app.services import job_queue
+from app.services.gemini_service import GeminiService, EMBED_BATCH_SIZE, mean_embedding
+from app.services.providers import get_provider
+from app.services.vector_index import vector_index
+
+# Kullanıcı (tenant) başına embedding modeli göçü:
+# 1. shadow: chunk'lar hedef modelle ``chunk_embeddings`` tablosuna embed edilir,
+#    retrieval bu sırada ``document_chunks`` üzerinden aynen devam eder
+# 2. cutover: tek işlemde vektörler yer değiştirir; eski vektörler rollback için saklanır
+# 3. rollback: aynı değişim ters yönde yapılır
+# Shadow re-embed iş kuyruğunda (``embed_shadow``) worker tarafından çalışır - API yeniden
+# başlasa da yarım kalmaz, hata verirse kuyruk yeniden dener.
+
+def default_model() -> str:
+    """Sağlayıcının varsayılan embedding modeli (etiketsiz eski chunk'ların modeli)"""
+    return get_provider().embedding_model
+
+def active_model(db: Session, user_id: int) -> str:
+    """Kullanıcının chunk'larının (ve sorgularının) embed edildiği model"""
+    row = db.query(EmbeddingIndex.active_model).filter(EmbeddingIndex.user_id == user_id).first()
+    return (row[0] if row else None) or default_model()
+
+def _chunk_model():
+    return func.coalesce(DocumentChunk.embedding_model, default_model())
+
+def _user_chunks(db: Session, user_id: int, *columns):
+    return db.query(*columns).join(Document, Document.id == DocumentChunk.document_id).filter(
+        Document.user_id == user_id,
+        DocumentChunk.staged == False
+    )
+
+def _missing_chunks(db: Session, user_id: int, model: str):
+    """Hedef modelde ne kendi vektörü ne de shadow vektörü olan chunk'lar"""
+    return _user_chunks(db, user_id, DocumentChunk.id, DocumentChunk.chunk_text).outerjoin(
+        ChunkEmbedding, and_(ChunkEmbedding.chunk_id == DocumentChunk.id, ChunkEmbedding.model == model)
+    ).filter(
+        _chunk_model() != model,
+        ChunkEmbedding.id.is_(None)
+    )
+
+def _shadow_job_active(db: Session, user_id: int) -> bool:
+    return job_queue.active_job(db, "embed_shadow", user_id) is not None
+
+class EmbeddingMigrator:
+    """Shadow index'e arka planda embed etme, atomik cutover ve rollback"""
+
+    def __init__(self):
+        self.gemini_service = GeminiService()
+
+    def _state(self, db: Session, user_id: int) -> EmbeddingIndex:
+        state = db.query(EmbeddingIndex).filter(EmbeddingIndex.user_id == user_id).first()
+        if not state:
+            state = EmbeddingIndex(user_id=user_id, status="idle", total_chunks=0, shadowed_chunks=0)
+            db.add(state)
+            db.flush()
+        return state
+
+    def status(self, db: Session, user_id: int) -> Dict:
+        state = db.query(EmbeddingIndex).filter(EmbeddingIndex.user_id == user_id).first()
+        return {
+            "active_model": (state.active_model if state else None) or default_model(),
+            "previous_model": state.previous_model if state else None,
+            "shadow_model": state.shadow_model if state else None,
+            "status": state.status if state else "idle",
+            "total_chunks": state.total_chunks if state else 0,
+            "shadowed_chunks": state.shadowed_chunks if state else 0,
+            "last_error": state.last_error if state else None,
+            "running": _shadow_job_active(db, user_id),
+        }
+
+    def start(self, db: Session, user_id: int, model: str):
+        """Hedef modele göçü başlat (veya yarım kalan göçü sürdür) ve shadow re-embed işini kuyruğa ekle"""
+        state = self._state(db, user_id)
+        if model == (state.active_model or default_model()):
+            raise ValueError(f"{model} zaten aktif embedding modeli")
+        if _shadow_job_active(db, user_id):
+            raise ValueError("Bu kullanıcı için göç zaten çalışıyor")
+
+        if state.shadow_model != model:
+            # Yeni hedef: eski shadow/rollback vektörleri artık gerekmez
+            db.query(ChunkEmbedding).filter(
+                ChunkEmbedding.user_id == user_id,
+                ChunkEmbedding.model != model
+            ).delete(synchronize_session=False)
+            state.previous_model = None
+
+        state.shadow_model = model
+        state.status = "shadowing"
+        state.last_error = None
+        state.total_chunks = _user_chunks(db, user_id, func.count(DocumentChunk.id)).scalar()
+        state.shadowed_chunks = db.query(func.count(ChunkEmbedding.id)).filter(
+            ChunkEmbedding.user_id == user_id,
+            ChunkEmbedding.model == model
+        ).scalar()
+        db.commit()
+        job_queue.enqueue(db, "embed_shadow", user_id)
+
+    async def run_shadow(self, user_id: int):
+        """Hedef modelde vektörü olmayan tüm chunk'ları shadow index'e embed et (worker işi).
+
+        Hata durumu kaydedilip yükseltilir - iş kuyruğu kaldığı yerden yeniden dener.
+        """
+        db = SessionLocal()
+        try:
+            state = self._state(db, user_id)
+            model = state.shadow_model
+            if not model:
+                return
+            print(f"🔁 Shadow re-embed başlıyor: user {user_id} → {model}")
+            state.status = "shadowing"
+            db.commit()
+            await self._fill_missing(db, user_id, model, state)
+            state.status = "ready"
+            state.last_error = None
+            db.commit()
+            print(f"✅ Shadow index hazır: user {user_id} ({model})")
+        except Exception as e:
+            print(f"❌ Shadow re-embed hatası: {e}")
+            db.rollback()
+            state = self._state(db, user_id)
+            state.status = "failed"
+            state.last_error = str(e)
+            db.commit()
+            raise
+        finally:
+            db.close()
+
+    async def _fill_missing(self, db: Session, user_id: int, model: str,
+                            state: Optional[EmbeddingIndex] = None):
+        """Eksik vektörleri batch'ler halinde embed et - her batch ayrı commit edilir"""
+        while True:
+            rows = _missing_chunks(db, user_id, model).order_by(DocumentChunk.id.asc()).limit(EMBED_BATCH_SIZE).all()
+            if not rows:
+                return
+
+            embeddings = await self.gemini_service.embed_documents_cached([text for _, text in rows], model=model)
+            for (chunk_id, _), vector in zip(rows, embeddings):
+                db.add(ChunkEmbedding(chunk_id=chunk_id, user_id=user_id, model=model,
+                                      embeddings=json.dumps(vector)))
+            if state is not None:
+                state.shadowed_chunks = (state.shadowed_chunks or 0) + len(rows)
+                state.total_chunks = max(state.total_chunks or 0, state.shadowed_chunks)
+            db.commit()
+
+    async def cutover(self, user_id: int) -> Dict:
+        """Shadow modeline atomik geçiş"""
+        db = SessionLocal()
+        try:
+            state = self._state(db, user_id)
+            if not state.shadow_model or state.status not in ("ready", "shadowing"):
+                raise ValueError("Geçiş için hazır bir shadow index yok")
+            if _shadow_job_active(db, user_id):
+                raise ValueError("Shadow re-embed devam ediyor")
+            return await self._switch(db, user_id, state.shadow_model)
+        finally:
+            db.close()
+
+    async def rollback(self, user_id: int) -> Dict:
+        """Önceki modele geri dön"""
+        db = SessionLocal()
+        try:
+            state = self._state(db, user_id)
+            if not state.previous_model:
+                raise ValueError("Geri dönülecek önceki model yok")
+            return await self._switch(db, user_id, state.previous_model)
+        finally:
+            db.close()
+
+    async def _switch(self, db: Session, user_id: int, target: str) -> Dict:
+        """Son eklenen chunk'ları tamamla, sonra vektörleri tek işlemde yer değiştir"""
+        await self._fill_missing(db, user_id, target)
+
+        state = self._state(db, user_id)
+        current = state.active_model or default_model()
+        if _missing_chunks(db, user_id, target).first():
+            raise ValueError("Geçiş sırasında yeni chunk eklendi, tekrar deneyin")
+
+        # Eski modelin artık vektörleri (önceki göçlerden) yer değiştirmeden önce temizlenir
+        db.query(ChunkEmbedding).filter(
+            ChunkEmbedding.user_id == user_id,
+            ChunkEmbedding.model == current
+        ).delete(synchronize_session=False)
+
+        shadow = {row.chunk_id: row for row in db.query(ChunkEmbedding).filter(
+            ChunkEmbedding.user_id == user_id,
+            ChunkEmbedding.model == target
+        )}
+        chunks = _user_chunks(db, user_id, DocumentChunk).all()
+        vectors_by_document = defaultdict(list)
+        swapped = 0
+        for chunk in chunks:
+            row = shadow.get(chunk.id)
+            if row is not None and (chunk.embedding_model or default_model()) != target:
+                # Shadow satırı eski vektörü tutar, chunk yeni vektörü alır (rollback için)
+                row.model, row.embeddings, chunk.embedding_model, chunk.embeddings = (
+                    current, chunk.embeddings, target, row.embeddings
+                )
+                swapped += 1
+            vectors_by_document[chunk.document_id].append(json.loads(chunk.embeddings or "[]"))
+
+        # Döküman vektörleri yeni modelin chunk ortalamasından yeniden türetilir
+        for document in db.query(Document).filter(Document.id.in_(vectors_by_document.keys())):
+            document.embeddings = json.dumps(mean_embedding(vectors_by_document[document.id]))
+
+        state.previous_model = current
+        state.active_model = target
+        state.shadow_model = None
+        state.status = "idle"
+        db.commit()
+        vector_index.invalidate(user_id)
+
+        print(f"🔀 Embedding index cutover: user {user_id} {current} → {target} ({swapped} chunk)")
+        return self.status(db, user_id)
+
+_migrator: Optional[EmbeddingMigrator] = None
+
+def get_embedding_migrator() -> EmbeddingMigrator:
+    """Paylaşılan migrator - sağlayıcı modül yüklenirken değil ilk kullanımda oluşturulur
+    (çıkarma/OCR alt süreçleri bu modülü içe aktarır ama sağlayıcıya ihtiyaç duymaz)"""
+    global _migrator
+    if _migrator is None:
+        _migrator = EmbeddingMigrator()
+    return _migrator
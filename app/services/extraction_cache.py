@@ -0,0 +1,168 @@
+import os
+import sys
+import hashlib
+import argparse
+from typing import Dict, Optional, Sequence
+
+from sqlalchemy import func
+from dotenv import load_dotenv
+
+from app.database.database import SessionLocal, engine, Base
+from app.models.cache import ExtractionCache
+
+load_dotenv()
+
+# Önbelleğin diskte kaplayabileceği en fazla metin boyutu (byte)
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(500 * 1024 * 1024)))
+
+class DegradedText(str):
+    """Geçici bir hatanın fallback yolundan üretilen metin - önbelleğe alınmaz, sonraki işlemede yeniden denenir"""
+
+# Çıkarıcı versiyonları - bir çıkarıcının çıktısı değişirse versiyonu artırın,
+# eski kayıtlar kendiliğinden kullanılmaz hale gelir
+EXTRACTOR_VERSIONS = {
+    "pdf": "1",
+    "ocr_page": "1",
+    "docx": "3",
+    "doc": "2",
+    "excel": "4",
+    "image": "1",
+}
+
+# SQLite'ın IN (...) parametre sınırının altında kal
+_LOOKUP_BATCH = 500
+
+def file_sha256(file_path: str) -> str:
+    """Dosya içeriğinin sha256 özeti (parça parça okunur)"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def make_extraction_key(extractor: str, content_hash: str, *params: str) -> str:
+    """hash(çıkarıcı, versiyonu, içerik hash'i, çıktıyı etkileyen ayarlar) anahtarı"""
+    digest = hashlib.sha256(f"{extractor}\0{EXTRACTOR_VERSIONS[extractor]}\0{content_hash}\0".encode("utf-8"))
+    for param in params:
+        digest.update(f"{param}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+class ExtractionCacheStore:
+    """Çıkarılmış metin önbelleği - dosya (veya PDF sayfası) içeriği değişmedikçe yeniden çıkarılmaz"""
+
+    def __init__(self, max_bytes: int = EXTRACTION_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+
+    def get(self, cache_key: str) -> Optional[str]:
+        return self.get_many([cache_key]).get(cache_key)
+
+    def get_many(self, cache_keys: Sequence[str]) -> Dict[str, str]:
+        """Toplu arama - bulunan anahtar -> metin"""
+        found: Dict[str, str] = {}
+        db = SessionLocal()
+        try:
+            unique_keys = list(dict.fromkeys(cache_keys))
+            for i in range(0, len(unique_keys), _LOOKUP_BATCH):
+                batch = unique_keys[i:i + _LOOKUP_BATCH]
+                rows = db.query(ExtractionCache.cache_key, ExtractionCache.text).filter(
+                    ExtractionCache.cache_key.in_(batch)
+                ).all()
+                found.update(rows)
+                if rows:
+                    db.query(ExtractionCache).filter(
+                        ExtractionCache.cache_key.in_([row[0] for row in rows])
+                    ).update({ExtractionCache.last_used_at: func.now()}, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            print(f"❌ Çıkarma önbelleği okuma hatası: {e}")
+            db.rollback()
+        finally:
+            db.close()
+        return found
+
+    def put(self, cache_key: str, extractor: str, text: str):
+        self.put_many({cache_key: text}, extractor)
+
+    def put_many(self, entries: Dict[str, str], extractor: str):
+        """Yeni metinleri kaydet ve boyut sınırı aşılırsa en eski kullanılanları sil"""
+        if not entries:
+            return
+        db = SessionLocal()
+        try:
+            keys = list(entries)
+            existing = set()
+            for i in range(0, len(keys), _LOOKUP_BATCH):
+                existing.update(row[0] for row in db.query(ExtractionCache.cache_key).filter(
+                    ExtractionCache.cache_key.in_(keys[i:i + _LOOKUP_BATCH])
+                ).all())
+
+            for cache_key, text in entries.items():
+                if cache_key not in existing:
+                    db.add(ExtractionCache(
+                        cache_key=cache_key,
+                        extractor=extractor,
+                        text=text,
+                        size_bytes=len(text.encode("utf-8"))
+                    ))
+            db.commit()
+            self._evict(db)
+        except Exception as e:
+            print(f"❌ Çıkarma önbelleği yazma hatası: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def invalidate(self, extractor: Optional[str] = None) -> int:
+        """Önbelleği (veya sadece bir çıkarıcıyı) temizle - silinen kayıt sayısını döndür"""
+        db = SessionLocal()
+        try:
+            query = db.query(ExtractionCache)
+            if extractor:
+                query = query.filter(ExtractionCache.extractor == extractor)
+            deleted = query.delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def _evict(self, db):
+        """Toplam boyut sınırı aşıldıysa en eski kullanılan kayıtları sil"""
+        total = db.query(func.coalesce(func.sum(ExtractionCache.size_bytes), 0)).scalar()
+        if total <= self.max_bytes:
+            return
+
+        stale_ids = []
+        for entry_id, size_bytes in db.query(ExtractionCache.id, ExtractionCache.size_bytes).order_by(
+            ExtractionCache.last_used_at.asc(), ExtractionCache.id.asc()
+        ).all():
+            if total <= self.max_bytes:
+                break
+            stale_ids.append(entry_id)
+            total -= size_bytes
+
+        for i in range(0, len(stale_ids), _LOOKUP_BATCH):
+            db.query(ExtractionCache).filter(
+                ExtractionCache.id.in_(stale_ids[i:i + _LOOKUP_BATCH])
+            ).delete(synchronize_session=False)
+        db.commit()
+        print(f"🧹 Çıkarma önbelleğinden {len(stale_ids)} kayıt silindi")
+
+extraction_cache = ExtractionCacheStore()
+
+def main(argv=None):
+    """Önbellek yönetim komutu: python -m app.services.extraction_cache clear [--extractor pdf]"""
+    parser = argparse.ArgumentParser(description="Çıkarılmış metin (PDF/OCR/Office) önbelleği yönetimi")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    clear_parser = subparsers.add_parser("clear", help="Önbelleği temizle")
+    clear_parser.add_argument("--extractor", choices=sorted(EXTRACTOR_VERSIONS),
+                              help="Sadece bu çıkarıcının kayıtlarını sil")
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    if args.command == "clear":
+        deleted = extraction_cache.invalidate(args.extractor)
+        print(f"✅ {deleted} önbellek kaydı silindi")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
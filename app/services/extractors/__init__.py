@@ -0,0 +1,5 @@
+# Süreç havuzunda çalışan senkron metin çıkarıcılar
+from .pool import extraction_pool, ExtractionPool, ExtractionTimeout
+from .ocr import ocr_pool
+
+__all__ = ["extraction_pool", "ocr_pool", "ExtractionPool", "ExtractionTimeout"]
@@ -0,0 +1,122 @@
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Iterator, List
+
+# WordprocessingML etiketleri
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_P, _T, _TAB, _BR, _CR = f"{_W}p", f"{_W}t", f"{_W}tab", f"{_W}br", f"{_W}cr"
+_NO_BREAK_HYPHEN = f"{_W}noBreakHyphen"
+_TBL, _TR, _TC = f"{_W}tbl", f"{_W}tr", f"{_W}tc"
+
+_HEADER_PART = re.compile(r"word/header\d*\.xml$")
+_FOOTER_PART = re.compile(r"word/footer\d*\.xml$")
+
+def _iter_part_blocks(stream) -> Iterator[str]:
+    """Bir XML parçasındaki paragrafları ve tablo satırlarını belge sırasıyla üret.
+
+    iterparse ile okunur; işlenen paragraf/tablo elemanları hemen temizlenir,
+    böylece bellek kullanımı belge boyutundan bağımsız kalır.
+    """
+    paragraphs: List[List[str]] = []  # İç içe paragraflar (metin kutuları) için yığın
+    tables: List[dict] = []           # İç içe tablolar için yığın: {"row": [...], "cell": [...]}
+    skip_depth = 0                     # mc:Fallback içeriği (Choice'un kopyası) atlanır
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if tag == _MC_FALLBACK:
+            skip_depth += 1 if event == "start" else -1
+            if event == "end":
+                elem.clear()
+            continue
+        if skip_depth:
+            continue
+
+        if event == "start":
+            if tag == _P:
+                paragraphs.append([])
+            elif tag == _TBL:
+                tables.append({"row": None, "cell": None})
+            elif tag == _TR and tables:
+                tables[-1]["row"] = []
+            elif tag == _TC and tables:
+                tables[-1]["cell"] = []
+            continue
+
+        # end olayları
+        if tag == _T:
+            if paragraphs and elem.text:
+                paragraphs[-1].append(elem.text)
+        elif tag == _TAB:
+            if paragraphs:
+                paragraphs[-1].append("\t")
+        elif tag in (_BR, _CR):
+            if paragraphs:
+                paragraphs[-1].append("\n")
+        elif tag == _NO_BREAK_HYPHEN:
+            if paragraphs:
+                paragraphs[-1].append("-")
+        elif tag == _P:
+            text = "".join(paragraphs.pop()).strip() if paragraphs else ""
+            elem.clear()
+            if not text:
+                continue
+            if tables and tables[-1]["cell"] is not None:
+                tables[-1]["cell"].append(text)
+            else:
+                yield text
+        elif tag == _TC and tables:
+            cell = " ".join(" ".join(tables[-1]["cell"] or []).split())
+            if tables[-1]["row"] is not None:
+                tables[-1]["row"].append(cell)
+            tables[-1]["cell"] = None
+            elem.clear()
+        elif tag == _TR and tables:
+            cells = [cell for cell in tables[-1]["row"] or [] if cell]
+            tables[-1]["row"] = None
+            elem.clear()
+            if not cells:
+                continue
+            row_text = " | ".join(cells)
+            # İç içe tablo satırı dış tablonun hücresine eklenir
+            if len(tables) > 1 and tables[-2]["cell"] is not None:
+                tables[-2]["cell"].append(row_text)
+            else:
+                yield row_text
+        elif tag == _TBL and tables:
+            tables.pop()
+            elem.clear()
+
+def iter_docx_blocks(file_path: str) -> Iterator[str]:
+    """DOCX'in başlık, gövde (paragraf + tablo), dipnot ve altbilgi metinlerini sırayla üret"""
+    with zipfile.ZipFile(file_path) as archive:
+        names = archive.namelist()
+        headers = sorted(name for name in names if _HEADER_PART.match(name))
+        footers = sorted(name for name in names if _FOOTER_PART.match(name))
+        notes = [name for name in ("word/footnotes.xml", "word/endnotes.xml") if name in names]
+
+        # Aynı başlık/altbilgi farklı bölümlerde tekrarlanabilir - bir kez yazılır
+        seen_repeated = set()
+        for part in headers:
+            with archive.open(part) as stream:
+                for block in _iter_part_blocks(stream):
+                    if block not in seen_repeated:
+                        seen_repeated.add(block)
+                        yield block
+
+        with archive.open("word/document.xml") as stream:
+            yield from _iter_part_blocks(stream)
+
+        for part in notes + footers:
+            with archive.open(part) as stream:
+                for block in _iter_part_blocks(stream):
+                    if block not in seen_repeated:
+                        seen_repeated.add(block)
+                        yield block
+
+def extract_docx_text(file_path: str) -> str:
+    """DOCX dosyasındaki paragrafların ve tabloların metni"""
+    blocks = list(iter_docx_blocks(file_path))
+    print(f"📊 DOCX blok sayısı (paragraf + tablo satırı): {len(blocks)}")
+    return "\n".join(blocks)
@@ -0,0 +1,101 @@
+from html.parser import HTMLParser
+from typing import Iterator, List
+
+from app.services.extractors.plain_text import TEXT_BLOCK_CHARS, detect_file_encoding, iter_decoded
+
+# İçeriği metne dahil edilmeyen etiketler
+SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg"}
+# Satır sonu üreten blok etiketleri
+BLOCK_TAGS = {
+    "p", "div", "br", "hr", "li", "ul", "ol", "dl", "dt", "dd", "tr", "table", "thead", "tbody", "tfoot",
+    "h1", "h2", "h3", "h4", "h5", "h6", "section", "article", "header", "footer", "nav", "aside",
+    "blockquote", "pre", "form", "fieldset", "figure", "figcaption", "address", "main", "title", "caption",
+}
+CELL_TAGS = {"td", "th"}
+# <head> içinde bulunabilen etiketler - diğerleri (ve görünen metin) gövdenin başladığını gösterir,
+# böylece </head> ya da <body> yazılmamış sayfalarda gövde metni kaybolmaz
+HEAD_TAGS = {"head", "title", "meta", "link", "base", "style", "script", "noscript", "template"}
+
+class HtmlTextExtractor(HTMLParser):
+    """HTML'i parça parça besleyip görünen metni toplayan ayrıştırıcı.
+
+    Tüm karakter/varlık referansları (``&nbsp;``, ``&#351;``, ``&scaron;`` ...) HTMLParser
+    tarafından çözülür; ``drain()`` o ana kadar tamamlanan satırları döndürür.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._skip_depth = 0
+        self._in_head = False
+        self._in_title = False
+        self._lines: List[str] = []
+        self._current: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if self._in_head and tag not in HEAD_TAGS:
+            self._in_head = False
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "head":
+            self._in_head = True
+        elif tag == "body":
+            self._in_head = False
+        elif tag in BLOCK_TAGS:
+            self._in_title = tag == "title"
+            self._break()
+        elif tag in CELL_TAGS:
+            self._current.append(" | ")
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "head":
+            self._in_head = False
+        elif tag in BLOCK_TAGS:
+            self._in_title = False
+            self._break()
+
+    def handle_startendtag(self, tag, attrs):
+        if self._in_head and tag not in HEAD_TAGS:
+            self._in_head = False
+        if tag in BLOCK_TAGS:
+            self._break()
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._in_head and not self._in_title:
+            if not data.strip():
+                return  # <head> içinden sadece <title> metni alınır
+            self._in_head = False  # <title> dışındaki görünen metin gövdeye aittir
+        self._current.append(data)
+
+    def _break(self):
+        line = " ".join("".join(self._current).split()).strip(" |")
+        if line:
+            self._lines.append(line)
+        self._current = []
+
+    def drain(self) -> str:
+        """Tamamlanan satırları döndür ve bırak"""
+        lines, self._lines = self._lines, []
+        return "\n".join(lines)
+
+    def close(self):
+        super().close()
+        self._break()
+
+def iter_html_blocks(file_path: str, block_chars: int = TEXT_BLOCK_CHARS) -> Iterator[str]:
+    """HTML dosyasının görünen metnini bloklar halinde üret - sabit bellek"""
+    encoding = detect_file_encoding(file_path, html=True)
+    print(f"🔤 HTML kodlaması: {encoding}")
+    parser = HtmlTextExtractor()
+    for block in iter_decoded(file_path, encoding, block_chars):
+        parser.feed(block)
+        text = parser.drain()
+        if text:
+            yield text
+    parser.close()
+    text = parser.drain()
+    if text:
+        yield text
@@ -0,0 +1,122 @@
+import io
+import os
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from PIL import Image, ImageOps
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Resim ön işleme ayarları
+VISION_MAX_SIDE = int(os.getenv("VISION_MAX_SIDE", "2048"))    # Vision'a gönderilen en uzun kenar (px)
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "3500"))          # ~A4 @ 300 DPI - üstü Tesseract'ı yavaşlatır
+OCR_BINARIZE = os.getenv("OCR_BINARIZE", "false").lower() == "true"
+VISION_JPEG_QUALITY = int(os.getenv("VISION_JPEG_QUALITY", "85"))
+
+# Kayıpsız kaynaklar (ekran görüntüsü vb.) PNG olarak kalır, fotoğraflar JPEG'e çevrilir
+_LOSSLESS_FORMATS = {"PNG", "GIF", "BMP", "TIFF"}
+
+def _downscale(image: Image.Image, max_side: int) -> Image.Image:
+    if max_side and max(image.size) > max_side:
+        image = image.copy()
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+    return image
+
+def _to_grayscale(image: Image.Image) -> Image.Image:
+    """Şeffaf arka planı beyaza oturt ve gri tonlamaya çevir"""
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image.convert("RGBA"), mask=image.convert("RGBA").split()[-1])
+        image = background
+    return image.convert("L")
+
+def _otsu_threshold(image: Image.Image) -> int:
+    """Gri resim için Otsu eşiği (histogramdan, numpy gerektirmez)"""
+    histogram = image.histogram()[:256]
+    total = sum(histogram)
+    sum_all = sum(i * count for i, count in enumerate(histogram))
+    sum_background = weight_background = 0
+    best_threshold, best_variance = 127, 0.0
+    for threshold, count in enumerate(histogram):
+        weight_background += count
+        if weight_background == 0:
+            continue
+        weight_foreground = total - weight_background
+        if weight_foreground == 0:
+            break
+        sum_background += threshold * count
+        mean_background = sum_background / weight_background
+        mean_foreground = (sum_all - sum_background) / weight_foreground
+        variance = weight_background * weight_foreground * (mean_background - mean_foreground) ** 2
+        if variance > best_variance:
+            best_threshold, best_variance = threshold, variance
+    return best_threshold
+
+def binarize(image: Image.Image) -> Image.Image:
+    """Gri resmi siyah-beyaza çevir"""
+    threshold = _otsu_threshold(image)
+    return image.point(lambda value: 255 if value > threshold else 0, mode="1")
+
+def prepare_for_ocr(image: Image.Image, binarize_image: bool = OCR_BINARIZE) -> Image.Image:
+    """Tesseract için: EXIF yönü, boyut sınırı, gri ton (isteğe bağlı ikili)"""
+    image = ImageOps.exif_transpose(image)
+    image = _downscale(image, OCR_MAX_SIDE)
+    image = _to_grayscale(image)
+    return binarize(image) if binarize_image else image
+
+def prepare_for_vision(file_path: str, max_side: int = VISION_MAX_SIDE) -> Tuple[bytes, str]:
+    """Vision modeline gönderilecek küçültülmüş resim ve doğru MIME tipi"""
+    with Image.open(file_path) as image:
+        source_format = image.format or ""
+        image.seek(0)
+        image = ImageOps.exif_transpose(image)
+        image = _to_grayscale(_downscale(image, max_side))
+
+    buffer = io.BytesIO()
+    if source_format.upper() in _LOSSLESS_FORMATS:
+        image.save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue(), "image/png"
+    image.save(buffer, format="JPEG", quality=VISION_JPEG_QUALITY, optimize=True)
+    return buffer.getvalue(), "image/jpeg"
+
+# Tesseract OSD betik adı → dil paketleri
+SCRIPT_LANGS = {
+    "Latin": None,  # Varsayılan OCR_LANG (tur+eng)
+    "Cyrillic": "rus+eng",
+    "Arabic": "ara+eng",
+    "Greek": "ell+eng",
+    "Hebrew": "heb+eng",
+    "Han": "chi_sim+eng",
+    "Japanese": "jpn+eng",
+    "Hangul": "kor+eng",
+}
+
+@lru_cache(maxsize=1)
+def installed_langs() -> frozenset:
+    """Tesseract'ta kurulu dil paketleri - süreç başına bir kez sorgulanır"""
+    import pytesseract
+
+    try:
+        return frozenset(pytesseract.get_languages(config=""))
+    except Exception as e:
+        print(f"⚠️ Tesseract dil paketleri okunamadı: {e}")
+        return frozenset()
+
+def detect_lang(image: Image.Image) -> Optional[str]:
+    """Hızlı OSD geçişiyle betiği tespit edip uygun dil paketlerini öner.
+
+    Önerilen paketlerden biri kurulu değilse None döner (varsayılan OCR_LANG kullanılır).
+    """
+    import pytesseract
+
+    try:
+        osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
+    except Exception:
+        # OSD verisi (osd.traineddata) yok ya da resimde yeterli metin yok
+        return None
+    lang = SCRIPT_LANGS.get(osd.get("script"))
+    if lang and not set(lang.split("+")) <= installed_langs():
+        print(f"⚠️ {osd.get('script')} betiği için dil paketi kurulu değil ({lang}), varsayılan dil kullanılıyor")
+        return None
+    return lang
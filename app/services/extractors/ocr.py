@@ -0,0 +1,150 @@
+import os
+import asyncio
+from typing import Dict, List, Optional
+
+import pytesseract
+from PIL import Image, ImageSequence
+from dotenv import load_dotenv
+
+from app.services.extractors.image_prep import OCR_BINARIZE, OCR_MAX_SIDE, detect_lang, prepare_for_ocr
+from app.services.extractors.pool import ExtractionPool
+
+load_dotenv()
+
+# OCR ayarları
+OCR_LANG = os.getenv("OCR_LANG", "tur+eng")
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 2)))
+# true: her resimde önce hızlı OSD ile betik tespit edilip dil paketleri seçilir
+OCR_AUTO_LANG = os.getenv("OCR_AUTO_LANG", "false").lower() == "true"
+# Hata veren ya da süre aşan sayfa bu kadar kez yeniden denenir
+OCR_PAGE_RETRIES = int(os.getenv("OCR_PAGE_RETRIES", "1"))
+
+class OcrFailed(RuntimeError):
+    """Bazı sayfalar yeniden denemeye rağmen OCR'lanamadı - boş metinle indekslenmemeli"""
+
+# Süreç başına bir kez yüklenen tesserocr motoru (yoksa pytesseract kullanılır)
+_engine = None
+_engine_lang: Optional[str] = None
+
+def _configure_tesseract():
+    """Tesseract yolunu ayarla - her çıkarma sürecinde modül yüklenirken çalışır"""
+    tesseract_cmd = os.getenv("TESSERACT_CMD", "tesseract")
+    if tesseract_cmd != "tesseract":
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    elif os.name == 'nt':
+        # Windows için varsayılan path
+        possible_paths = [
+            r"C:\Program Files\Tesseract-OCR\tesseract.exe",
+            r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe"
+        ]
+        for path in possible_paths:
+            if os.path.exists(path):
+                pytesseract.pytesseract.tesseract_cmd = path
+                break
+
+_configure_tesseract()
+
+def init_ocr_worker(lang: str = OCR_LANG):
+    """OCR süreci başlangıcı: dil modellerini bir kez yükle.
+
+    Sayfalar süreçler arasında paylaştırıldığı için Tesseract'ın kendi
+    OpenMP thread'leri kapatılır (çekirdekler aşırı paylaştırılmasın).
+    """
+    global _engine, _engine_lang
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    try:
+        import tesserocr
+        tessdata = os.getenv("TESSDATA_PREFIX")
+        _engine = tesserocr.PyTessBaseAPI(path=tessdata, lang=lang) if tessdata else tesserocr.PyTessBaseAPI(lang=lang)
+        _engine_lang = lang
+    except ImportError:
+        print("⚠️ tesserocr kurulu değil - her sayfa ayrı tesseract süreciyle OCR'lanacak (yavaş)")
+        _engine = None
+    except Exception as e:
+        print(f"⚠️ tesserocr başlatılamadı, pytesseract kullanılacak: {e}")
+        _engine = None
+
+def ocr_image(image: Image.Image, lang: Optional[str] = None) -> str:
+    """PIL resminden Tesseract ile metin çıkar - önce ön işlemeden geçirilir"""
+    image = prepare_for_ocr(image)
+    if lang is None:
+        lang = (detect_lang(image) if OCR_AUTO_LANG else None) or OCR_LANG
+    if _engine is not None and lang == _engine_lang:
+        _engine.SetImage(image)
+        return _engine.GetUTF8Text()
+    return pytesseract.image_to_string(image, lang=lang)
+
+def ocr_image_file(file_path: str, lang: Optional[str] = None) -> str:
+    """Resim dosyasından Tesseract ile metin çıkar"""
+    with Image.open(file_path) as image:
+        return ocr_image(image, lang)
+
+def image_frame_count(file_path: str) -> int:
+    """Çok sayfalı resimlerin (TIFF) kare sayısı"""
+    with Image.open(file_path) as image:
+        return getattr(image, "n_frames", 1)
+
+def ocr_image_frame(file_path: str, frame_index: int, lang: Optional[str] = None) -> str:
+    """Çok sayfalı resmin tek bir karesini OCR'la"""
+    with Image.open(file_path) as image:
+        frame = ImageSequence.Iterator(image)[frame_index]
+        return ocr_image(frame.copy(), lang)
+
+def ocr_pdf_page(file_path: str, page_index: int, dpi: int = OCR_DPI, lang: Optional[str] = None) -> str:
+    """PDF sayfasını ``dpi`` çözünürlükte gri tonlamalı render edip OCR'la"""
+    import fitz  # PyMuPDF
+
+    with fitz.open(file_path) as pdf_document:
+        pixmap = pdf_document[page_index].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+        image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+    return ocr_image(image, lang)
+
+# Uzun ömürlü OCR süreçleri - dil modelleri her sayfada yeniden yüklenmez
+ocr_pool = ExtractionPool(max_workers=OCR_WORKERS, max_tasks_per_child=0,
+                          initializer=init_ocr_worker, initargs=(OCR_LANG,), name="OCR")
+
+def settings_key() -> str:
+    """OCR çıktısını etkileyen ayarlar - önbellek anahtarlarına eklenir"""
+    return f"{OCR_LANG}|{OCR_AUTO_LANG}|{OCR_DPI}|{OCR_MAX_SIDE}|{OCR_BINARIZE}"
+
+async def _ocr_many(func, file_path: str, indexes: List[int]) -> List[str]:
+    """Sayfaları OCR süreçlerine paylaştır - en fazla ``OCR_WORKERS`` sayfa aynı anda gönderilir.
+
+    Başarısız sayfalar ``OCR_PAGE_RETRIES`` kez yeniden denenir; yine başarısız olan
+    varsa ``OcrFailed`` fırlatılır (sayfa sessizce boş metin olarak indekslenmez).
+    """
+    slots = asyncio.Semaphore(OCR_WORKERS)
+
+    async def ocr_one(index: int) -> str:
+        async with slots:
+            return await ocr_pool.run(func, file_path, index)
+
+    texts: Dict[int, str] = {}
+    pending = list(indexes)
+    for attempt in range(OCR_PAGE_RETRIES + 1):
+        results = await asyncio.gather(*(ocr_one(index) for index in pending), return_exceptions=True)
+        failed = []
+        for index, result in zip(pending, results):
+            if isinstance(result, Exception):
+                print(f"⚠️ OCR hatası (sayfa {index + 1}, deneme {attempt + 1}): {result}")
+                failed.append(index)
+            else:
+                texts[index] = result
+        pending = failed
+        if not pending:
+            break
+
+    if pending:
+        raise OcrFailed(f"{len(pending)} sayfa OCR'lanamadı: {', '.join(str(i + 1) for i in pending)}")
+    return [texts[index] for index in indexes]
+
+async def ocr_pdf_pages(file_path: str, page_indexes: List[int]) -> List[str]:
+    """Metin katmanı olmayan PDF sayfalarını paralel OCR'la"""
+    return await _ocr_many(ocr_pdf_page, file_path, page_indexes)
+
+async def ocr_image_frames(file_path: str, frame_count: Optional[int] = None) -> List[str]:
+    """Resmin (çok sayfalı TIFF dahil) tüm karelerini paralel OCR'la"""
+    if frame_count is None:
+        frame_count = await ocr_pool.run(image_frame_count, file_path)
+    return await _ocr_many(ocr_image_frame, file_path, list(range(frame_count)))
@@ -0,0 +1,39 @@
+import os
+import hashlib
+from typing import List, NamedTuple, Optional
+
+import fitz  # PyMuPDF
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Sayfa sayfa işlemede süreç havuzuna tek seferde gönderilen sayfa sayısı
+PDF_PAGE_WINDOW = int(os.getenv("PDF_PAGE_WINDOW", "16"))
+
+class PdfPage(NamedTuple):
+    text: str
+    fingerprint: Optional[str]  # Sadece metin katmanı olmayan (OCR gereken) sayfalar için
+
+def _page_fingerprint(pdf_document, page) -> str:
+    """Sayfanın içerik akışı ve gömülü resimlerinin özeti - OCR önbellek anahtarı"""
+    digest = hashlib.sha256(f"{page.rect.width:.1f}x{page.rect.height:.1f}:{page.rotation}\0".encode())
+    digest.update(page.read_contents())
+    for image in page.get_images(full=True):
+        digest.update(pdf_document.xref_stream_raw(image[0]) or b"")
+    return digest.hexdigest()
+
+def pdf_page_count(file_path: str) -> int:
+    with fitz.open(file_path) as pdf_document:
+        return pdf_document.page_count
+
+def extract_pdf_pages(file_path: str, start: int = 0, stop: Optional[int] = None) -> List[PdfPage]:
+    """[start, stop) sayfalarının metin katmanını döndür - taranmış sayfalar boş metin ve parmak izi döner"""
+    pages = []
+    with fitz.open(file_path) as pdf_document:
+        stop = pdf_document.page_count if stop is None else min(stop, pdf_document.page_count)
+        for page_index in range(start, stop):
+            page = pdf_document[page_index]
+            text = page.get_text()
+            fingerprint = None if text.strip() else _page_fingerprint(pdf_document, page)
+            pages.append(PdfPage(text, fingerprint))
+    return pages
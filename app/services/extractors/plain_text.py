@@ -0,0 +1,81 @@
+import os
+import re
+import codecs
+from typing import Iterator, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# BOM ve UTF-8 dışında kalan (Türkçe Windows) dosyalar için varsayılan kodlama
+TEXT_FALLBACK_ENCODING = os.getenv("TEXT_FALLBACK_ENCODING", "cp1254")
+
+# Kodlama tespiti için okunan ön örnek ve akış halinde okuma blok boyutu
+ENCODING_SAMPLE_BYTES = 64 * 1024
+TEXT_BLOCK_CHARS = 256 * 1024
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_\-:.]+)""", re.IGNORECASE)
+
+def _known_encoding(name: str) -> Optional[str]:
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+def detect_encoding(sample: bytes, html: bool = False) -> str:
+    """Ön örnekten kodlamayı tespit et: BOM → (HTML meta charset) → UTF-8 → cp1254"""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    if html:
+        match = _META_CHARSET.search(sample)
+        declared = _known_encoding(match.group(1).decode("ascii", "ignore")) if match else None
+        if declared:
+            # Türkçe sayfalarda iso-8859-9 beyanı genelde cp1254 karakterleri içerir
+            return "cp1254" if declared in ("iso8859-9", "latin-1", "iso8859-1") else declared
+
+    # Örnek bir çok byte'lı karakterin ortasında kesilmiş olabilir - final=False
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return TEXT_FALLBACK_ENCODING
+
+def detect_file_encoding(file_path: str, html: bool = False) -> str:
+    with open(file_path, "rb") as file:
+        return detect_encoding(file.read(ENCODING_SAMPLE_BYTES), html)
+
+def iter_decoded(file_path: str, encoding: str, block_chars: int = TEXT_BLOCK_CHARS) -> Iterator[str]:
+    """Dosyayı sabit boyutlu karakter blokları halinde çöz"""
+    with open(file_path, "r", encoding=encoding, errors="replace", newline=None) as file:
+        while True:
+            block = file.read(block_chars)
+            if not block:
+                return
+            yield block
+
+def iter_text_blocks(file_path: str, block_chars: int = TEXT_BLOCK_CHARS) -> Iterator[str]:
+    """Metin dosyasını satır sınırlarında bölünmüş bloklar halinde üret - sabit bellek"""
+    encoding = detect_file_encoding(file_path)
+    print(f"🔤 Metin kodlaması: {encoding}")
+    pending = ""
+    for block in iter_decoded(file_path, encoding, block_chars):
+        pending += block
+        cut = pending.rfind("\n")
+        if cut == -1:
+            if len(pending) < block_chars * 4:
+                continue
+            cut = len(pending) - 1  # Satır sonu olmayan dev satır
+        text, pending = pending[:cut + 1], pending[cut + 1:]
+        if text.strip():
+            yield text
+    if pending.strip():
+        yield pending
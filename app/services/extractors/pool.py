@@ -0,0 +1,176 @@
+import os
+import asyncio
+import queue
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Metin çıkarma süreç havuzu ayarları
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 2)))
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "300"))
+# PyMuPDF/openpyxl bellek sızıntılarını sınırlamak için süreç bu kadar işten sonra yenilenir
+EXTRACTION_MAX_TASKS_PER_CHILD = int(os.getenv("EXTRACTION_MAX_TASKS_PER_CHILD", "50"))
+EXTRACTION_START_METHOD = os.getenv("EXTRACTION_START_METHOD", "spawn")
+
+# Sürecin başlatılması (initializer dahil) için süre sınırı
+_STARTUP_TIMEOUT = 120
+
+class ExtractionTimeout(TimeoutError):
+    """Çıkarma işi süre sınırını aştı - takılan süreç sonlandırıldı"""
+
+class WorkerCrashed(RuntimeError):
+    """Çıkarma süreci iş sırasında beklenmedik şekilde sonlandı (ör. segfault)"""
+
+def _worker_main(conn, initializer: Optional[Callable], initargs: Tuple):
+    """Süreç döngüsü: (fonksiyon, argümanlar) al, (başarılı, sonuç) gönder; None gelince çık"""
+    if initializer is not None:
+        initializer(*initargs)
+    conn.send(("ready", None))
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        func, args = task
+        try:
+            reply = ("ok", func(*args))
+        except Exception as e:
+            reply = ("error", e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Sonuç ya da hata pickle edilemiyorsa hatayı metin olarak gönder
+            conn.send(("error", RuntimeError(f"{type(reply[1]).__name__}: {reply[1]} ({e})")))
+
+class _Worker:
+    """Tek çıkarma süreci ve ona bağlı pipe"""
+
+    def __init__(self, context, initializer: Optional[Callable], initargs: Tuple):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, initializer, initargs), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+        if not self.conn.poll(_STARTUP_TIMEOUT):
+            self.kill()
+            raise WorkerCrashed("Çıkarma süreci başlatılamadı (süre aşımı)")
+        try:
+            self.conn.recv()
+        except (EOFError, OSError):
+            self.kill()
+            raise WorkerCrashed("Çıkarma süreci başlatılırken sonlandı")
+
+    def call(self, func, args: Tuple, timeout: float):
+        """İşi bu süreçte çalıştır - süre, süreç işi aldığı anda başlar"""
+        self.conn.send((func, args))
+        if not self.conn.poll(timeout):
+            raise ExtractionTimeout(f"{func.__name__} {timeout:.0f}s içinde bitmedi")
+        status, value = self.conn.recv()
+        self.tasks += 1
+        if status == "error":
+            raise value
+        return value
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(5)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(5)
+        self.conn.close()
+
+class ExtractionPool:
+    """CPU-yoğun çıkarıcıları (PDF, DOCX, Excel, Tesseract) ayrı süreçlerde çalıştırır.
+
+    Görevler modül seviyesindeki senkron fonksiyonlardır ve düz metin ya da sayfa
+    listesi döndürür. Her iş boştaki bir sürece verilir; süre sınırı iş sürece
+    ulaştığında başlar. Süre aşımında sadece o süreç sonlandırılıp yenisi açılır,
+    diğer süreçlerdeki işler etkilenmez.
+    """
+
+    def __init__(self, max_workers: int = EXTRACTION_WORKERS, timeout: float = EXTRACTION_TIMEOUT,
+                 max_tasks_per_child: int = EXTRACTION_MAX_TASKS_PER_CHILD,
+                 initializer: Optional[Callable] = None, initargs: Tuple = (), name: str = "Çıkarma"):
+        self.name = name
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_tasks_per_child = max_tasks_per_child
+        # Her süreç başlarken bir kez çalışır (ör. OCR motorunu dil modelleriyle yüklemek)
+        self.initializer = initializer
+        self.initargs = initargs
+        self._context = multiprocessing.get_context(EXTRACTION_START_METHOD)
+        # Boştaki süreçler; None = henüz başlatılmamış (ya da yenilenecek) yuva
+        self._idle: "queue.LifoQueue[Optional[_Worker]]" = queue.LifoQueue()
+        for _ in range(max_workers):
+            self._idle.put(None)
+        # Süreç başına bir bekleme thread'i - fazla işler burada sıraya girer
+        self._threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-havuz")
+        self.completed = 0
+        self.timeouts = 0
+        self.recycles = 0
+
+    def _start_worker(self) -> _Worker:
+        return _Worker(self._context, self.initializer, self.initargs)
+
+    def _execute(self, func, args: Tuple, timeout: float):
+        worker = self._idle.get()
+        try:
+            if worker is None or not worker.process.is_alive():
+                worker = self._start_worker()
+            result = worker.call(func, args, timeout)
+        except ExtractionTimeout:
+            self.timeouts += 1
+            self._replace(worker)
+            worker = None
+            raise
+        except (EOFError, OSError, BrokenPipeError) as e:
+            self._replace(worker)
+            worker = None
+            raise WorkerCrashed(f"{func.__name__} çalışırken süreç sonlandı: {e}")
+        finally:
+            if worker is not None and self.max_tasks_per_child and worker.tasks >= self.max_tasks_per_child:
+                worker.stop()  # Bellek sızıntılarına karşı süreç yenilenir
+                worker = None
+            self._idle.put(worker)
+
+        self.completed += 1
+        return result
+
+    def _replace(self, worker: Optional[_Worker]):
+        """Takılan ya da çöken süreci sonlandır - yuvası bir sonraki işte yeniden açılır"""
+        if worker is not None:
+            worker.kill()
+        self.recycles += 1
+        print(f"♻️ {self.name} süreci yenilendi")
+
+    async def run(self, func, *args, timeout: Optional[float] = None):
+        """``func(*args)``'ı havuzda çalıştır ve sonucunu bekle"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._threads, self._execute, func, args, timeout or self.timeout)
+
+    def shutdown(self):
+        """Süren işleri bekle ve süreçleri kapat - havuz sonra yeniden kullanılabilir"""
+        threads, self._threads = self._threads, ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=f"{self.name}-havuz"
+        )
+        threads.shutdown(wait=True)
+        for _ in range(self.max_workers):
+            worker = self._idle.get()
+            if worker is not None:
+                worker.stop()
+        for _ in range(self.max_workers):
+            self._idle.put(None)
+
+extraction_pool = ExtractionPool()
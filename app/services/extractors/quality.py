@@ -0,0 +1,42 @@
+import os
+import unicodedata
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Okunabilir karakter oranı bunun altındaysa metin çöp (ikili veri, bozuk kodlama) sayılır
+TEXT_QUALITY_MIN_RATIO = float(os.getenv("TEXT_QUALITY_MIN_RATIO", "0.85"))
+
+# Kontrol için metnin başından alınan örnek uzunluğu
+_SAMPLE_CHARS = 20000
+# Boşluksuz bu uzunluktan uzun "kelimeler" ikili veri belirtisidir
+_MAX_TOKEN_CHARS = 40
+
+def readable_ratio(text: str) -> float:
+    """Harf, rakam, boşluk ve noktalama karakterlerinin oranı"""
+    sample = text[:_SAMPLE_CHARS]
+    if not sample:
+        return 0.0
+    readable = 0
+    for char in sample:
+        category = unicodedata.category(char)
+        if category[0] in "LNPZ" or char in "\n\t" or category in ("Sm", "Sc"):
+            readable += 1
+    return readable / len(sample)
+
+def looks_like_garbage(text: str) -> bool:
+    """Metin embed etmeye değmeyecek kadar bozuk mu (ikili veri, yanlış kodlama)?"""
+    sample = text[:_SAMPLE_CHARS]
+    if not sample.strip():
+        return True
+    if readable_ratio(sample) < TEXT_QUALITY_MIN_RATIO:
+        return True
+
+    tokens = sample.split()
+    alphanumerics = sum(1 for char in sample if char.isalnum())
+    # Harf/rakam oranı çok düşük ya da kelimelerin çoğu anormal uzun
+    if alphanumerics < len(sample) * 0.3:
+        return True
+    long_tokens = sum(1 for token in tokens if len(token) > _MAX_TOKEN_CHARS)
+    return bool(tokens) and long_tokens > len(tokens) * 0.2
@@ -0,0 +1,169 @@
+import os
+import datetime
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import openpyxl
+from openpyxl.utils import get_column_letter
+
+# Satır başına serileştirilen en fazla hücre metni uzunluğu (uzun not/açıklama hücreleri)
+MAX_CELL_CHARS = 500
+
+def _format_cell(value) -> str:
+    """Hücre değerini kısa metne çevir (boş hücre için boş metin)"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "Evet" if value else "Hayır"
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else f"{value:.10g}"
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat() if value.time() == datetime.time() else value.isoformat(sep=" ")
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    text = " ".join(str(value).split())
+    return text[:MAX_CELL_CHARS]
+
+def _trim(cells: List[str]) -> Tuple[int, List[str]]:
+    """Baştaki ve sondaki boş hücreleri at - (ilk dolu sütun indeksi, hücreler)"""
+    start = 0
+    while start < len(cells) and not cells[start]:
+        start += 1
+    end = len(cells)
+    while end > start and not cells[end - 1]:
+        end -= 1
+    return start, cells[start:end]
+
+def _is_header(values: Sequence) -> bool:
+    """Sadece metin içeren ve en az iki dolu hücresi olan satır başlık sayılabilir"""
+    filled = [value for value in values if value not in (None, "")]
+    return len(filled) >= 2 and all(isinstance(value, str) for value in filled)
+
+def serialize_sheet(sheet_name: str, rows: Iterable[Sequence]) -> Iterator[str]:
+    """Sayfayı satır satır kompakt metne çevir.
+
+    Sayfanın ilk dolu satırı başlıksa her satır ``Başlık: değer; ...`` olarak yazılır (chunk'lar
+    tek başına anlamlı kalır); boş satırlar, boş sütunlar ve boş hücreler atlanır.
+    """
+    header: Optional[List[str]] = None
+    header_offset = 0
+    wrote_title = False
+
+    for values in rows:
+        offset, cells = _trim([_format_cell(value) for value in values])
+        if not cells:
+            continue
+
+        if not wrote_title:
+            yield f"--- {sheet_name} ---"
+            wrote_title = True
+            # Başlık adayı sadece ilk dolu satırdır - aradaki "Toplam | Not" gibi
+            # metin satırları sonraki satırların sütun adlarını değiştirmez
+            if _is_header(values):
+                header, header_offset = cells, offset
+                continue
+        if header is not None and cells == header and offset == header_offset:
+            continue  # Tekrarlanan başlık satırı
+
+        if header is None:
+            yield " | ".join(cells)
+            continue
+
+        pairs = []
+        for column, cell in enumerate(cells, start=offset):
+            if not cell:
+                continue
+            index = column - header_offset
+            name = header[index] if 0 <= index < len(header) and header[index] else get_column_letter(column + 1)
+            pairs.append(f"{name}: {cell}")
+        yield "; ".join(pairs)
+
+def _iter_xlsx_sheets(file_path: str) -> Iterator[Tuple[str, Iterable[Sequence]]]:
+    """openpyxl read-only modu - satırlar XML'den akış halinde okunur"""
+    # Dosya nesnesiyle açılır - openpyxl dosya adı verilirse uzantıyı (.xls, .doc) reddeder
+    with open(file_path, "rb") as file:
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        try:
+            for sheet in workbook.worksheets:
+                yield sheet.title, sheet.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+def _iter_xls_sheets(file_path: str) -> Iterator[Tuple[str, Iterable[Sequence]]]:
+    """xlrd on_demand modu - sayfalar tek tek yüklenip bırakılır"""
+    import xlrd
+
+    workbook = xlrd.open_workbook(file_path, on_demand=True)
+    try:
+        for index in range(workbook.nsheets):
+            sheet = workbook.sheet_by_index(index)
+            yield sheet.name, _xls_rows(sheet, workbook.datemode)
+            workbook.unload_sheet(index)
+    finally:
+        workbook.release_resources()
+
+def _xls_rows(sheet, datemode: int) -> Iterator[List]:
+    import xlrd
+
+    for row_index in range(sheet.nrows):
+        row = []
+        for cell in sheet.row(row_index):
+            if cell.ctype == xlrd.XL_CELL_DATE:
+                try:
+                    row.append(xlrd.xldate.xldate_as_datetime(cell.value, datemode))
+                    continue
+                except Exception:
+                    pass
+            elif cell.ctype == xlrd.XL_CELL_BOOLEAN:
+                row.append(bool(cell.value))
+                continue
+            elif cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+                row.append(None)
+                continue
+            row.append(cell.value)
+        yield row
+
+def _serialize_workbook(sheets: Iterator[Tuple[str, Iterable[Sequence]]]) -> str:
+    lines = []
+    for sheet_name, rows in sheets:
+        lines.extend(serialize_sheet(sheet_name, rows))
+    return "\n".join(lines)
+
+def extract_excel_text(file_path: str, file_type: Optional[str] = None) -> str:
+    """Excel dosyasından metin çıkar - Hem .xlsx hem .xls formatlarını destekler
+
+    ``file_type`` içerikten tespit edilen formattır (ör. ``.docx`` uzantılı çalışma kitabı);
+    verilmezse dosya uzantısı kullanılır.
+    """
+    try:
+        print(f"🔍 Excel dosyası işleniyor: {file_path} ({os.path.getsize(file_path)} bytes)")
+
+        file_type = (file_type or os.path.splitext(file_path)[1].lstrip(".")).lower()
+        if file_type == 'xlsx':
+            print("📊 .xlsx dosyası openpyxl (read-only) ile işleniyor...")
+            text = _serialize_workbook(_iter_xlsx_sheets(file_path))
+
+        elif file_type == 'xls':
+            print("📊 .xls dosyası xlrd (on_demand) ile işleniyor...")
+            try:
+                text = _serialize_workbook(_iter_xls_sheets(file_path))
+            except Exception as xlrd_error:
+                print(f"❌ xlrd hatası: {xlrd_error}")
+                # Bazen .xls uzantılı dosyalar aslında .xlsx formatındadır
+                print("🔄 openpyxl ile deneniyor...")
+                text = _serialize_workbook(_iter_xlsx_sheets(file_path))
+
+        else:
+            print(f"⚠️ Bilinmeyen Excel formatı: {file_type}")
+            return f"Excel dosyasından metin çıkarılamadı: Desteklenmeyen format ({file_type})"
+
+        if not text.strip():
+            print("⚠️ Çıkarılan metin boş!")
+            return "Excel dosyasından metin çıkarılamadı: Boş içerik"
+
+        print(f"✅ Excel metin çıkarma başarılı: {len(text)} karakter")
+        return text.strip()
+
+    except Exception as e:
+        print(f"❌ Excel metin çıkarma hatası: {e}")
+        print(f"❌ Hata türü: {type(e)}")
+        return f"Excel dosyasından metin çıkarılamadı: {str(e)}"
@@ -0,0 +1,205 @@
+import re
+import struct
+from typing import Dict, List, Optional
+
+# Eski Word (.doc, Word 97-2003) ikili formatı için saf Python metin çıkarıcı:
+# 1. OLE Compound File (CFB) içinden WordDocument ve 0Table/1Table akışları okunur
+# 2. FIB'den CLX (piece table) konumu bulunur
+# 3. Her parça (piece) sıkıştırılmış (cp1252) ya da UTF-16LE olarak çözülür
+
+OLE_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+_END_OF_CHAIN = 0xFFFFFFFE
+_FREE_SECTOR = 0xFFFFFFFF
+_CELL_SEPARATORS = re.compile(r"(?:\s*\|\s*)+")
+
+class DocFormatError(ValueError):
+    """Dosya desteklenen bir Word 97-2003 dökümanı değil (ya da şifreli/bozuk)"""
+
+class OleFile:
+    """Minimal OLE Compound File okuyucu - sadece akış okuma"""
+
+    def __init__(self, data: bytes):
+        if data[:8] != OLE_SIGNATURE:
+            raise DocFormatError("OLE imzası bulunamadı")
+        self.data = data
+        self.sector_size = 1 << struct.unpack_from("<H", data, 0x1E)[0]
+        self.mini_sector_size = 1 << struct.unpack_from("<H", data, 0x20)[0]
+        (fat_count, first_dir, _, self.mini_cutoff, first_mini_fat, mini_fat_count,
+         first_difat, difat_count) = struct.unpack_from("<IIIIIIII", data, 0x2C)
+
+        self.fat = self._read_fat(first_difat, difat_count, fat_count)
+        self.entries = self._read_directory(first_dir)
+        root = self.entries.get("Root Entry")
+        self.mini_stream = self._read_chain(root[0], root[1]) if root and root[0] != _END_OF_CHAIN else b""
+        mini_fat_data = self._read_chain(first_mini_fat, mini_fat_count * self.sector_size) if mini_fat_count else b""
+        self.mini_fat = list(struct.unpack(f"<{len(mini_fat_data) // 4}I", mini_fat_data))
+
+    def _sector(self, sector_id: int) -> bytes:
+        offset = (sector_id + 1) * self.sector_size
+        if offset >= len(self.data):
+            raise DocFormatError(f"Geçersiz sektör: {sector_id}")
+        return self.data[offset:offset + self.sector_size]
+
+    def _read_fat(self, first_difat: int, difat_count: int, fat_count: int) -> List[int]:
+        fat_sectors = [s for s in struct.unpack_from("<109I", self.data, 0x4C) if s != _FREE_SECTOR]
+        per_sector = self.sector_size // 4
+        sector_id = first_difat
+        for _ in range(difat_count):
+            if sector_id in (_END_OF_CHAIN, _FREE_SECTOR):
+                break
+            values = struct.unpack(f"<{per_sector}I", self._sector(sector_id))
+            fat_sectors.extend(s for s in values[:-1] if s != _FREE_SECTOR)
+            sector_id = values[-1]
+
+        fat: List[int] = []
+        for sector_id in fat_sectors[:fat_count or len(fat_sectors)]:
+            fat.extend(struct.unpack(f"<{per_sector}I", self._sector(sector_id)))
+        return fat
+
+    def _chain(self, start: int, table: List[int]) -> List[int]:
+        chain, sector_id = [], start
+        while sector_id not in (_END_OF_CHAIN, _FREE_SECTOR):
+            if sector_id >= len(table) or len(chain) > len(table):
+                raise DocFormatError("Bozuk sektör zinciri")
+            chain.append(sector_id)
+            sector_id = table[sector_id]
+        return chain
+
+    def _read_chain(self, start: int, size: Optional[int] = None) -> bytes:
+        data = b"".join(self._sector(s) for s in self._chain(start, self.fat))
+        return data if size is None else data[:size]
+
+    def _read_directory(self, first_dir: int) -> Dict[str, tuple]:
+        data = self._read_chain(first_dir)
+        entries = {}
+        for offset in range(0, len(data) - 127, 128):
+            name_length, entry_type = struct.unpack_from("<HB", data, offset + 64)
+            if entry_type not in (1, 2, 5) or name_length < 2:
+                continue
+            name = data[offset:offset + name_length - 2].decode("utf-16-le", errors="ignore")
+            start, size = struct.unpack_from("<II", data, offset + 116)
+            entries.setdefault(name, (start, size, entry_type))
+        return entries
+
+    def read_stream(self, name: str) -> bytes:
+        entry = self.entries.get(name)
+        if not entry or entry[2] != 2:
+            raise DocFormatError(f"Akış bulunamadı: {name}")
+        start, size, _ = entry
+        if size < self.mini_cutoff:
+            chain = self._chain(start, self.mini_fat)
+            data = b"".join(
+                self.mini_stream[s * self.mini_sector_size:(s + 1) * self.mini_sector_size] for s in chain
+            )
+            return data[:size]
+        return self._read_chain(start, size)
+
+def ole_stream_names(file_path: str) -> set:
+    """OLE dosyasındaki akış adları (WordDocument → Word, Workbook/Book → Excel)"""
+    with open(file_path, "rb") as file:
+        ole = OleFile(file.read())
+    return {name for name, (_, _, entry_type) in ole.entries.items() if entry_type == 2}
+
+def _read_pieces(word_stream: bytes, table_stream: bytes, fc_clx: int, lcb_clx: int):
+    """CLX içindeki PlcPcd'den (cp_başlangıç, cp_bitiş, fc, sıkıştırılmış) parçaları döndür"""
+    clx = table_stream[fc_clx:fc_clx + lcb_clx]
+    position = 0
+    while position < len(clx) and clx[position] == 0x01:  # Prc (biçim bilgisi) atlanır
+        position += 3 + struct.unpack_from("<h", clx, position + 1)[0]
+    if position >= len(clx) or clx[position] != 0x02:
+        raise DocFormatError("Piece table (Pcdt) bulunamadı")
+
+    lcb = struct.unpack_from("<I", clx, position + 1)[0]
+    plc = clx[position + 5:position + 5 + lcb]
+    count = (len(plc) - 4) // 12
+    cps = struct.unpack_from(f"<{count + 1}I", plc, 0)
+    pieces = []
+    for i in range(count):
+        fc_value = struct.unpack_from("<I", plc, (count + 1) * 4 + i * 8 + 2)[0]
+        compressed = bool(fc_value & 0x40000000)
+        fc = (fc_value & 0x3FFFFFFF) // 2 if compressed else fc_value & 0x3FFFFFFF
+        pieces.append((cps[i], cps[i + 1], fc, compressed))
+    return pieces
+
+def _clean_word_text(text: str) -> str:
+    """Word kontrol karakterlerini düz metne çevir - alan kodları çıkarılır, sonuçları kalır"""
+    output = []
+    field_states = []  # Her açık alan için: True = kod kısmı (atlanır), False = sonuç kısmı
+    for char in text:
+        code = ord(char)
+        if code == 0x13:  # Alan başlangıcı
+            field_states.append(True)
+            continue
+        if code == 0x14:  # Alan ayırıcı - sonuç başlıyor
+            if field_states:
+                field_states[-1] = False
+            continue
+        if code == 0x15:  # Alan sonu
+            if field_states:
+                field_states.pop()
+            continue
+        if field_states and field_states[-1]:
+            continue
+
+        if char == "\r" or code in (0x0B, 0x0C, 0x0E):  # Paragraf, satır, sayfa/bölüm, sütun sonu
+            output.append("\n")
+        elif code == 0x07:  # Hücre sonu; art arda ikincisi satır sonu
+            if output and output[-1] == " | ":
+                output[-1] = "\n"
+            else:
+                output.append(" | ")
+        elif code == 0x1E:  # Bölünmez tire
+            output.append("-")
+        elif code == 0xA0:
+            output.append(" ")
+        elif code < 0x20 and char != "\t":
+            continue  # Resim/nesne çapaları, isteğe bağlı tire vb.
+        else:
+            output.append(char)
+
+    lines = (_CELL_SEPARATORS.sub(" | ", " ".join(line.split())) for line in "".join(output).split("\n"))
+    return "\n".join(line.strip(" |") for line in lines if line.strip(" |"))
+
+def extract_doc_text(file_path: str) -> str:
+    """Word 97-2003 (.doc) dökümanının ana metni, dipnotları ve üst/alt bilgileri"""
+    with open(file_path, "rb") as file:
+        ole = OleFile(file.read())
+
+    word_stream = ole.read_stream("WordDocument")
+    if len(word_stream) < 0x200:
+        raise DocFormatError("WordDocument akışı çok kısa")
+    w_ident, n_fib = struct.unpack_from("<HH", word_stream, 0)
+    flags = struct.unpack_from("<H", word_stream, 0x0A)[0]
+    if w_ident != 0xA5EC:
+        raise DocFormatError("Word FIB imzası bulunamadı")
+    if flags & 0x0100:
+        raise DocFormatError("Şifreli Word dökümanı")
+    if n_fib < 101:
+        raise DocFormatError(f"Word 6/95 formatı desteklenmiyor (nFib={n_fib})")
+
+    table_stream = ole.read_stream("1Table" if flags & 0x0200 else "0Table")
+
+    # FibBase (32 byte) → fibRgW → fibRgLw → fibRgFcLcb
+    position = 32
+    csw = struct.unpack_from("<H", word_stream, position)[0]
+    position += 2 + csw * 2
+    cslw = struct.unpack_from("<H", word_stream, position)[0]
+    rg_lw = struct.unpack_from(f"<{cslw}i", word_stream, position + 2)
+    position += 2 + cslw * 4
+    position += 2  # cbRgFcLcb
+    fc_clx, lcb_clx = struct.unpack_from("<II", word_stream, position + 33 * 8)
+
+    # Ana metin + dipnotlar + üst/alt bilgiler (ccpText, ccpFtn, ccpHdd)
+    cp_limit = sum(max(0, value) for value in rg_lw[3:6])
+
+    parts = []
+    for cp_start, cp_end, fc, compressed in _read_pieces(word_stream, table_stream, fc_clx, lcb_clx):
+        if cp_start >= cp_limit:
+            break
+        length = min(cp_end, cp_limit) - cp_start
+        if compressed:
+            parts.append(word_stream[fc:fc + length].decode("cp1252", errors="replace"))
+        else:
+            parts.append(word_stream[fc:fc + length * 2].decode("utf-16-le", errors="replace"))
+
+    return _clean_word_text("".join(parts))
@@ -0,0 +1,70 @@
+import re
+import math
+from collections import Counter
+from typing import Dict, List, Sequence
+
+# Yerel (API'siz) yedek yöntemler - Gemini erişilemezken kullanılır
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Puanlamada dikkate alınmayan sık Türkçe/İngilizce kelimeler
+STOPWORDS = {
+    "ve", "veya", "ile", "bir", "bu", "şu", "o", "da", "de", "için", "gibi", "olarak", "olan",
+    "daha", "çok", "en", "ne", "mi", "mı", "mu", "mü", "ki", "ise", "her", "kadar", "sonra",
+    "the", "and", "or", "of", "to", "in", "for", "on", "is", "are", "with", "by", "as", "at", "an", "a",
+}
+
+def tokenize(text: str) -> List[str]:
+    """Küçük harfe çevrilmiş, durak kelimeleri ayıklanmış kelimeler"""
+    return [w for w in _WORD_RE.findall(text.lower()) if len(w) > 2 and w not in STOPWORDS]
+
+def extractive_summary(text: str, max_sentences: int = 5, max_chars: int = 20000) -> str:
+    """Kelime sıklığına göre en önemli cümleleri orijinal sırasıyla döndür"""
+    sample = text[:max_chars]
+    sentences = [s.strip() for s in _SENTENCE_RE.split(sample) if len(s.strip()) > 20]
+    if not sentences:
+        return sample[:500].strip()
+
+    frequencies = Counter(tokenize(sample))
+    if not frequencies:
+        return " ".join(sentences[:max_sentences])
+
+    def score(sentence: str) -> float:
+        words = tokenize(sentence)
+        return sum(frequencies[w] for w in words) / (len(words) or 1)
+
+    top = sorted(range(len(sentences)), key=lambda i: score(sentences[i]), reverse=True)[:max_sentences]
+    return " ".join(sentences[i] for i in sorted(top))
+
+def local_keywords(text: str, limit: int = 10, max_chars: int = 20000) -> List[str]:
+    """En sık geçen anlamlı kelimeler"""
+    return [word for word, _ in Counter(tokenize(text[:max_chars])).most_common(limit)]
+
+def lexical_search(query: str, items: Sequence, text_of, limit: int = 20) -> List[Dict]:
+    """Embedding olmadan sorgu kelimelerine göre TF-IDF benzeri sıralama.
+
+    ``text_of(item)`` her öğenin metnini döndürür; sonuç ``{'item', 'score'}`` listesidir
+    ve skorlar 0-1 aralığındadır.
+    """
+    query_terms = set(tokenize(query))
+    if not query_terms or not items:
+        return []
+
+    token_counts = [Counter(tokenize(text_of(item))) for item in items]
+    document_frequency = Counter()
+    for counts in token_counts:
+        document_frequency.update(query_terms.intersection(counts))
+
+    total = len(items)
+    idf = {term: math.log(1 + total / (1 + document_frequency[term])) for term in query_terms}
+    max_score = sum(idf.values())
+
+    results = []
+    for item, counts in zip(items, token_counts):
+        score = sum(idf[t] * (1 + math.log(counts[t])) for t in query_terms if counts[t])
+        if score > 0:
+            results.append({'item': item, 'score': min(1.0, score / (max_score * 2))})
+
+    results.sort(key=lambda r: r['score'], reverse=True)
+    return results[:limit]
@@ -1,21 +1,126 @@
-import google.generativeai as genai
 import os
 import json
 import numpy as np
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 
+from app.services.rate_limiter import scheduler
+from app.services.context_packer import pack_context
+from app.services.generation_cache import generation_cache, make_generation_key
+from app.services.embedding_cache import embedding_cache
+from app.services.extraction_cache import DegradedText
+from app.services.fallbacks import extractive_summary, local_keywords
+from app.services.providers import get_provider
+from app.services.extractors import extraction_pool
+from app.services.extractors import image_prep, ocr
+
 load_dotenv()
 
+# Prompt şablonu değiştiğinde ilgili versiyonu artırın - eski önbellek kayıtları kullanılmaz
+PROMPT_VERSIONS = {
+    "summary": "1",
+    "keywords": "1",
+    "analysis": "1",
+    "vision": "1",
+}
+
+NO_DOCUMENTS_MESSAGE = "Henüz sisteme döküman yüklenmemiş. Lütfen önce döküman yükleyerek sistemi eğitin."
+CHAT_ERROR_MESSAGE = "Üzgünüm, şu anda sorunuzu yanıtlayamıyorum."
+
+# Çağrı başına zaman aşımları (saniye)
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "60"))
+GEMINI_EMBED_TIMEOUT = float(os.getenv("GEMINI_EMBED_TIMEOUT", "20"))
+
+# Tek batchEmbedContents isteğinde gönderilecek en fazla metin sayısı (API sınırı: 100)
+EMBED_BATCH_SIZE = int(os.getenv("GEMINI_EMBED_BATCH_SIZE", "100"))
+
+def mean_embedding(embeddings: List[List[float]]) -> List[float]:
+    """Boş olmayan vektörlerin ortalamasını al"""
+    vectors = [e for e in embeddings if e]
+    if not vectors:
+        return []
+    return np.mean(vectors, axis=0).tolist()
+
 class GeminiService:
+    """AI işlemleri - seçili sağlayıcıyı (``AI_PROVIDER``) kota, önbellek ve yedeklerle sarar"""
+    
     def __init__(self):
-        self.api_key = os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
+        self.provider = get_provider()
+    
+    @property
+    def embedding_model(self) -> str:
+        return self.provider.embedding_model
+    
+    async def _generate(self, prompt: str, task: str = "chat", source_text: Optional[str] = None,
+                        timeout: Optional[float] = None, call_type: str = "generate",
+                        json_output: bool = False) -> str:
+        """Sağlayıcıdan event loop'u bloklamadan yanıt al (kota ve yeniden deneme ile)"""
+        return await scheduler.run(
+            call_type,
+            lambda attempt_timeout: self.provider.generate(
+                prompt, attempt_timeout, task=task, source_text=source_text, json_output=json_output
+            ),
+            timeout=timeout or GEMINI_TIMEOUT
+        )
+    
+    async def _generate_cached(self, kind: str, produce, *cache_inputs, model_name: Optional[str] = None,
+                               validate=None) -> str:
+        """Chat dışı üretim çağrıları için önbellek - ``produce()`` yanıt metnini döndüren coroutine'dir.
         
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
-        # embedding-001 is accessed directly via genai.embed_content
+        ``validate`` verilirse sadece doğrulamadan geçen yanıtlar önbelleğe yazılır.
+        """
+        model_name = model_name or self.provider.generation_model
+        cache_key = make_generation_key(model_name, kind, PROMPT_VERSIONS[kind], *cache_inputs)
+        cached = generation_cache.get(cache_key)
+        if cached is not None:
+            print(f"💾 Üretim önbelleği isabeti: {kind}")
+            return cached
+        
+        text = await produce()
+        if validate:
+            validate(text)
+        generation_cache.put(cache_key, kind, model_name, text)
+        return text
+    
+    async def _embed(self, texts: List[str], task_type: str, timeout: Optional[float] = None,
+                     call_type: str = "embed_batch", model: Optional[str] = None) -> List[List[float]]:
+        """Sağlayıcı embedding çağrısı (kota ve yeniden deneme ile)"""
+        return await scheduler.run(
+            call_type,
+            lambda attempt_timeout: self.provider.embed(texts, task_type, attempt_timeout, model=model),
+            timeout=timeout or GEMINI_EMBED_TIMEOUT
+        )
+    
+    async def embed_query(self, query: str, model: Optional[str] = None) -> List[float]:
+        """Arama sorgusu için embedding vektörü oluştur"""
+        embeddings = await self._embed([query], task_type="retrieval_query", call_type="embed_query", model=model)
+        return embeddings[0]
+    
+    async def embed_documents(self, texts: List[str], model: Optional[str] = None) -> List[List[float]]:
+        """Metin listesini toplu (batch) isteklerle embed et - sıra korunur"""
+        embeddings = []
+        for i in range(0, len(texts), EMBED_BATCH_SIZE):
+            batch = texts[i:i + EMBED_BATCH_SIZE]
+            embeddings.extend(await self._embed(batch, task_type="retrieval_document", model=model))
+        return embeddings
+    
+    async def embed_documents_cached(self, texts: List[str], model: Optional[str] = None) -> List[List[float]]:
+        """Önce içerik hash önbelleğine bak, sadece eksik metinleri API'ye gönder"""
+        task_type = "retrieval_document"
+        model = model or self.embedding_model
+        cached = embedding_cache.get_many(texts, model, task_type)
+        
+        # Aynı batch içindeki tekrar eden metinler de bir kez embed edilir
+        missing = list(dict.fromkeys(text for i, text in enumerate(texts) if i not in cached))
+        print(f"💾 Embedding önbelleği: {len(cached)}/{len(texts)} isabet, {len(missing)} API'ye gidecek")
+        
+        fresh = {}
+        if missing:
+            missing_embeddings = await self.embed_documents(missing, model=model)
+            fresh = dict(zip(missing, missing_embeddings))
+            embedding_cache.put_many(missing, missing_embeddings, model, task_type)
+        
+        return [cached[i] if i in cached else fresh[text] for i, text in enumerate(texts)]
     
     async def generate_summary(self, text: str) -> str:
         """Metinden özet çıkar"""
@@ -26,11 +131,12 @@ class GeminiService:
             {text[:4000]}  # İlk 4000 karakteri al
             """
             
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            return await self._generate_cached(
+                "summary", lambda: self._generate(prompt, task="summary", source_text=text[:4000]), prompt
+            )
         except Exception as e:
-            print(f"Summary generation error: {e}")
-            return "Özet oluşturulamadı."
+            print(f"Summary generation error: {e} - yerel özet kullanılıyor")
+            return extractive_summary(text)
     
     async def extract_keywords(self, text: str) -> List[str]:
         """Metinden anahtar kelimeler çıkar"""
@@ -42,49 +148,68 @@ class GeminiService:
             {text[:3000]}
             """
             
-            response = self.model.generate_content(prompt)
-            keywords_text = response.text.strip()
+            keywords_text = await self._generate_cached(
+                "keywords", lambda: self._generate(prompt, task="keywords", source_text=text[:3000]), prompt
+            )
             keywords = [kw.strip() for kw in keywords_text.split(',')]
             return keywords[:10]  # Maksimum 10 anahtar kelime
         except Exception as e:
-            print(f"Keywords extraction error: {e}")
-            return []
+            print(f"Keywords extraction error: {e} - yerel anahtar kelimeler kullanılıyor")
+            return local_keywords(text)
     
-    async def generate_embeddings(self, text: str) -> List[float]:
-        """Metin için embedding vektörü oluştur"""
+    async def analyze_document(self, text: str) -> Dict:
+        """Özet ve anahtar kelimeleri tek bir yapılandırılmış (JSON) çağrıda çıkar.
+        
+        Yanıt doğrulanamazsa ayrı ``generate_summary`` / ``extract_keywords`` çağrılarına düşer.
+        """
+        prompt = f"""
+        Aşağıdaki metni analiz et ve yalnızca şu JSON nesnesini döndür:
+        {{"summary": "<Türkçe, kısa, net ve önemli noktaları içeren özet>",
+          "keywords": ["<anahtar kelime>", "..."]}}
+        En fazla 10 anahtar kelime ver.
+        
+        {text[:4000]}
+        """
+        
         try:
-            # Metni parçalara böl (embedding modeli için)
-            chunks = self._split_text(text, max_length=1000)
-            embeddings = []
-            
-            for chunk in chunks:
-                response = genai.embed_content(
-                    model="models/embedding-001",
-                    content=chunk,
-                    task_type="retrieval_document"
-                )
-                embeddings.append(response['embedding'])
-            
-            # Ortalama embedding al
-            if embeddings:
-                avg_embedding = np.mean(embeddings, axis=0)
-                return avg_embedding.tolist()
-            return []
-        except Exception as e:
-            print(f"Embeddings generation error: {e}")
-            return []
+            raw = await self._generate_cached(
+                "analysis",
+                lambda: self._generate(prompt, task="analysis", source_text=text[:4000], json_output=True),
+                prompt,
+                validate=self._parse_analysis
+            )
+            return self._parse_analysis(raw)
+        except ValueError as e:
+            # json.JSONDecodeError da ValueError'dır
+            print(f"⚠️ Analiz yanıtı ayrıştırılamadı, ayrı çağrılara dönülüyor: {e}")
+            return {
+                "summary": await self.generate_summary(text),
+                "keywords": await self.extract_keywords(text)
+            }
+    
+    def _parse_analysis(self, raw: str) -> Dict:
+        """Analiz yanıtını doğrula - geçersizse ValueError"""
+        raw = raw.strip()
+        if raw.startswith("```"):
+            raw = raw.strip("`")
+            raw = raw[raw.find("{"):]
+        data = json.loads(raw)
+        
+        summary = data.get("summary") if isinstance(data, dict) else None
+        keywords = data.get("keywords") if isinstance(data, dict) else None
+        if not isinstance(summary, str) or not summary.strip():
+            raise ValueError("summary alanı eksik")
+        if not isinstance(keywords, list) or not all(isinstance(kw, str) for kw in keywords):
+            raise ValueError("keywords alanı geçersiz")
+        
+        keywords = [kw.strip() for kw in keywords if kw.strip()]
+        return {"summary": summary.strip(), "keywords": keywords[:10]}
     
     async def extract_text_from_image(self, image_path: str) -> str:
-        """Resimden metin çıkar (OCR) - Gemini Vision API kullanarak"""
+        """Resimden metin çıkar (OCR) - Sağlayıcının Vision modeli ile"""
         try:
-            import base64
-            
-            # Resmi base64'e çevir
-            with open(image_path, "rb") as image_file:
-                image_data = base64.b64encode(image_file.read()).decode('utf-8')
-            
-            # Gemini Vision modeli kullan
-            vision_model = genai.GenerativeModel('gemini-2.0-flash-exp')
+            # EXIF yönü, küçültme ve gri ton - yükleme boyutu ve gecikme düşer
+            image_bytes, mime_type = await extraction_pool.run(image_prep.prepare_for_vision, image_path)
             
             prompt = """
             Bu resimdeki tüm metni çıkar. Lütfen:
@@ -96,15 +221,17 @@ class GeminiService:
             """
             
             # Resim ve prompt'u birleştir
-            response = vision_model.generate_content([
-                prompt,
-                {
-                    "mime_type": "image/jpeg" if image_path.lower().endswith('.jpg') else "image/png",
-                    "data": image_data
-                }
-            ])
+            extracted_text = await self._generate_cached(
+                "vision",
+                lambda: scheduler.run(
+                    "vision",
+                    lambda attempt_timeout: self.provider.vision(prompt, image_bytes, mime_type, attempt_timeout),
+                    timeout=GEMINI_TIMEOUT
+                ),
+                prompt, image_bytes,
+                model_name=self.provider.vision_model
+            )
             
-            extracted_text = response.text.strip()
             print(f"✅ Gemini OCR başarılı: {len(extracted_text)} karakter çıkarıldı")
             return extracted_text
             
@@ -112,47 +239,71 @@ class GeminiService:
             print(f"❌ Gemini OCR hatası: {e}")
             # Fallback olarak Tesseract kullan
             try:
-                import pytesseract
-                from PIL import Image
-                
                 print("🔄 Tesseract fallback kullanılıyor...")
-                image = Image.open(image_path)
-                text = pytesseract.image_to_string(image, lang='tur+eng')
+                text = await ocr.ocr_pool.run(ocr.ocr_image_file, image_path)
                 print(f"✅ Tesseract fallback başarılı: {len(text)} karakter çıkarıldı")
-                return text
+                # Vision hatası geçici olabilir - fallback sonucu kalıcı olarak önbelleğe alınmaz
+                return DegradedText(text)
                 
             except Exception as fallback_error:
                 print(f"❌ Tesseract fallback da başarısız: {fallback_error}")
                 return f"Resimden metin çıkarılamadı. Hata: {str(e)}"
     
-    async def chat_with_context(self, question: str, context_documents: List[Dict]) -> str:
+    async def chat_with_context(self, question: str, context_documents: List[Dict], history: str = "") -> str:
         """Döküman bağlamında soru cevapla - Optimize edilmiş prompt"""
         try:
             if not context_documents:
-                return "Henüz sisteme döküman yüklenmemiş. Lütfen önce döküman yükleyerek sistemi eğitin."
-            
-            # En alakalı chunk'ları al
-            relevant_chunks = []
-            for doc in context_documents[:12]:  # En fazla 12 döküman kullan
-                relevant_chunks.append({
-                    'filename': doc.get('filename', 'Bilinmeyen'),
-                    'content': doc.get('content_text', '')[:2000],  # Daha uzun içerik
-                    'summary': doc.get('summary', '')
-                })
+                return NO_DOCUMENTS_MESSAGE
             
-            # Bağlam oluştur
-            context = ""
-            for i, chunk in enumerate(relevant_chunks, 1):
-                context += f"\n[KAYNAK {i}: {chunk['filename']}]\n"
-                if chunk['summary']:
-                    context += f"Özet: {chunk['summary']}\n"
-                context += f"İçerik: {chunk['content']}\n"
-            
-            prompt = f"""Sen uzman bir döküman analisti ve yardımcı asistansın. Görevin kullanıcının sorularını yalnızca verilen kaynaklardan yanıtlamaktır.
+            prompt, context = self._build_chat_prompt(question, context_documents, history)
+            return await self._generate(prompt, task="chat", source_text=context, call_type="chat")
+        except Exception as e:
+            print(f"Chat error: {e}")
+            return CHAT_ERROR_MESSAGE
+    
+    async def stream_chat_with_context(self, question: str, context_documents: List[Dict],
+                                       history: str = "") -> AsyncIterator[str]:
+        """``chat_with_context``'in akış (streaming) versiyonu - metin parçalarını üretildikçe döndürür.
+        
+        Hatalar çağırana yükselir: yarım kalan yanıt tamamlanmış gibi kaydedilmemeli.
+        """
+        if not context_documents:
+            yield NO_DOCUMENTS_MESSAGE
+            return
+        
+        prompt, context = self._build_chat_prompt(question, context_documents, history)
+        # Akışın açılması kota/yeniden deneme katmanından geçer, parçalar sonra okunur
+        stream = await scheduler.run(
+            "chat",
+            lambda attempt_timeout: self.provider.generate_stream(prompt, attempt_timeout, source_text=context),
+            timeout=GEMINI_TIMEOUT
+        )
+        async for text in stream:
+            yield text
+    
+    def _build_chat_prompt(self, question: str, context_documents: List[Dict], history: str = "") -> Tuple[str, str]:
+        """Kaynak dökümanlardan chat prompt'unu oluştur - (prompt, bağlam) döndürür"""
+        # Komşu chunk'ları birleştir, özetleri bir kez yaz, token bütçesini skora göre doldur
+        sources = pack_context(context_documents)
+        
+        # Bağlam oluştur
+        context_parts = []
+        for i, source in enumerate(sources, 1):
+            context_parts.append(f"\n[KAYNAK {i}: {source['filename']}]\n")
+            if source['summary']:
+                context_parts.append(f"Özet: {source['summary']}\n")
+            for span in source['spans']:
+                context_parts.append(f"İçerik: {span}\n")
+        context = "".join(context_parts)
+        
+        # Sohbet geçmişi (özet + son turlar) sadece takip soruları için bağlam sağlar
+        history_section = f"\nSOHBET GEÇMİŞİ:\n{history}\n" if history else ""
+        
+        prompt = f"""Sen uzman bir döküman analisti ve yardımcı asistansın. Görevin kullanıcının sorularını yalnızca verilen kaynaklardan yanıtlamaktır.
 
 KAYNAK DÖKÜMANLAR:
 {context}
-
+{history_section}
 KULLANICI SORUSU: {question}
 
 YÖNERGELER:
@@ -163,61 +314,24 @@ YÖNERGELER:
 5. Spekülasyon yapma, sadece kaynaklardaki bilgileri kullan
 
 CEVAP:"""
-            
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
-        except Exception as e:
-            print(f"Chat error: {e}")
-            return "Üzgünüm, şu anda sorunuzu yanıtlayamıyorum."
+        return prompt, context
     
-    async def search_similar_documents(self, query: str, document_embeddings: List[Dict]) -> List[Dict]:
-        """Query'e benzer dökümanları bul"""
+    async def summarize_history(self, previous_summary: str, new_messages: str) -> str:
+        """Önceki oturum özetini yeni mesajlarla güncelle (artımlı özet)"""
+        source = f"{previous_summary}\n{new_messages}".strip()
         try:
-            # Query embedding'i oluştur
-            query_response = genai.embed_content(
-                model="models/embedding-001",
-                content=query,
-                task_type="retrieval_query"
-            )
-            query_embedding = np.array(query_response['embedding'])
-            
-            # Benzerlik skorları hesapla
-            similarities = []
-            for doc in document_embeddings:
-                if doc.get('embeddings'):
-                    doc_embedding = np.array(json.loads(doc['embeddings']))
-                    similarity = np.dot(query_embedding, doc_embedding) / (
-                        np.linalg.norm(query_embedding) * np.linalg.norm(doc_embedding)
-                    )
-                    similarities.append((doc, similarity))
-            
-            # Skor'a göre sırala
-            similarities.sort(key=lambda x: x[1], reverse=True)
-            
-            # En benzer 5 dökümanı döndür
-            return [doc for doc, score in similarities[:5] if score > 0.3]
+            prompt = f"""Aşağıda bir sohbetin mevcut özeti ve özete henüz eklenmemiş yeni mesajlar var.
+Yeni mesajları özete katarak güncel özeti yaz. Kullanıcının ilgilendiği konuları,
+sorulan soruları ve verilen önemli cevapları koru. En fazla 150 kelime, Türkçe.
+
+MEVCUT ÖZET:
+{previous_summary or "(yok)"}
+
+YENİ MESAJLAR:
+{new_messages}
+
+GÜNCEL ÖZET:"""
+            return (await self._generate(prompt, task="history", source_text=source)).strip()
         except Exception as e:
-            print(f"Search error: {e}")
-            return document_embeddings[:5]  # Fallback
-    
-    def _split_text(self, text: str, max_length: int = 1000) -> List[str]:
-        """Metni parçalara böl"""
-        chunks = []
-        words = text.split()
-        current_chunk = []
-        current_length = 0
-        
-        for word in words:
-            if current_length + len(word) + 1 <= max_length:
-                current_chunk.append(word)
-                current_length += len(word) + 1
-            else:
-                if current_chunk:
-                    chunks.append(' '.join(current_chunk))
-                current_chunk = [word]
-                current_length = len(word)
-        
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
-        
-        return chunks
+            print(f"History summary error: {e} - yerel özet kullanılıyor")
+            return extractive_summary(source, max_sentences=6)
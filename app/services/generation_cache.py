@@ -0,0 +1,124 @@
+import os
+import sys
+import hashlib
+import argparse
+from typing import Optional, Union
+
+from sqlalchemy import func
+from dotenv import load_dotenv
+
+from app.database.database import SessionLocal, engine, Base
+from app.models.cache import GenerationCache
+
+load_dotenv()
+
+# Önbelleğin diskte kaplayabileceği en fazla yanıt boyutu (byte)
+GENERATION_CACHE_MAX_BYTES = int(os.getenv("GENERATION_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+def make_generation_key(model: str, kind: str, version: str, *inputs: Union[str, bytes]) -> str:
+    """hash(model, prompt şablon versiyonu, girdi) anahtarı"""
+    digest = hashlib.sha256(f"{model}\0{kind}\0{version}\0".encode("utf-8"))
+    for item in inputs:
+        digest.update(item.encode("utf-8") if isinstance(item, str) else item)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+class GenerationCacheStore:
+    """Özet, anahtar kelime ve Vision OCR yanıtları için kalıcı önbellek"""
+
+    def __init__(self, max_bytes: int = GENERATION_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+
+    def get(self, cache_key: str) -> Optional[str]:
+        """Kayıtlı yanıtı döndür (yoksa None)"""
+        db = SessionLocal()
+        try:
+            entry = db.query(GenerationCache).filter(GenerationCache.cache_key == cache_key).first()
+            if not entry:
+                return None
+            entry.last_used_at = func.now()
+            response = entry.response
+            db.commit()
+            return response
+        except Exception as e:
+            print(f"❌ Üretim önbelleği okuma hatası: {e}")
+            db.rollback()
+            return None
+        finally:
+            db.close()
+
+    def put(self, cache_key: str, kind: str, model: str, response: str):
+        """Yanıtı kaydet ve boyut sınırı aşılırsa en eski kullanılanları sil"""
+        db = SessionLocal()
+        try:
+            if db.query(GenerationCache.id).filter(GenerationCache.cache_key == cache_key).first():
+                return
+            db.add(GenerationCache(
+                cache_key=cache_key,
+                kind=kind,
+                model=model,
+                response=response,
+                size_bytes=len(response.encode("utf-8"))
+            ))
+            db.commit()
+            self._evict(db)
+        except Exception as e:
+            print(f"❌ Üretim önbelleği yazma hatası: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def invalidate(self, kind: Optional[str] = None) -> int:
+        """Önbelleği (veya sadece bir türü) temizle - silinen kayıt sayısını döndür"""
+        db = SessionLocal()
+        try:
+            query = db.query(GenerationCache)
+            if kind:
+                query = query.filter(GenerationCache.kind == kind)
+            deleted = query.delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def _evict(self, db):
+        """Toplam boyut sınırı aşıldıysa en eski kullanılan kayıtları sil"""
+        total = db.query(func.coalesce(func.sum(GenerationCache.size_bytes), 0)).scalar()
+        if total <= self.max_bytes:
+            return
+
+        stale_ids = []
+        for entry_id, size_bytes in db.query(GenerationCache.id, GenerationCache.size_bytes).order_by(
+            GenerationCache.last_used_at.asc(), GenerationCache.id.asc()
+        ).all():
+            if total <= self.max_bytes:
+                break
+            stale_ids.append(entry_id)
+            total -= size_bytes
+
+        for i in range(0, len(stale_ids), 500):
+            db.query(GenerationCache).filter(
+                GenerationCache.id.in_(stale_ids[i:i + 500])
+            ).delete(synchronize_session=False)
+        db.commit()
+        print(f"🧹 Üretim önbelleğinden {len(stale_ids)} kayıt silindi")
+
+generation_cache = GenerationCacheStore()
+
+def main(argv=None):
+    """Önbellek yönetim komutu: python -m app.services.generation_cache clear [--kind summary]"""
+    parser = argparse.ArgumentParser(description="Üretim (özet/anahtar kelime/OCR) önbelleği yönetimi")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    clear_parser = subparsers.add_parser("clear", help="Önbelleği temizle")
+    clear_parser.add_argument("--kind", choices=["summary", "keywords", "analysis", "vision"],
+                              help="Sadece bu türdeki kayıtları sil")
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    if args.command == "clear":
+        deleted = generation_cache.invalidate(args.kind)
+        print(f"✅ {deleted} önbellek kaydı silindi")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
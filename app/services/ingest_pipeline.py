@@ -0,0 +1,84 @@
+import os
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, Optional, TypeVar
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.services.chunker import TextChunker
+
+load_dotenv()
+
+# Aşamalar arası kuyrukta bekleyebilecek en fazla chunk batch'i - dolunca üretici bekler
+INGEST_QUEUE_BATCHES = int(os.getenv("INGEST_QUEUE_BATCHES", "2"))
+# Dökümanın content_text alanında saklanan en fazla karakter - chunk'lama bundan etkilenmez
+INGEST_CONTENT_MAX_CHARS = int(os.getenv("INGEST_CONTENT_MAX_CHARS", "5000000"))
+
+T = TypeVar("T")
+
+async def iterate_in_thread(iterator: Iterator[T]) -> AsyncIterator[T]:
+    """Senkron (dosya okuyan) bir iterator'ı event loop'u bloklamadan tüket"""
+    done = object()
+    while (item := await asyncio.to_thread(next, iterator, done)) is not done:
+        yield item
+
+class RunningMean:
+    """Boş olmayan vektörlerin ortalaması - vektörleri saklamadan"""
+
+    def __init__(self):
+        self._sum: Optional[np.ndarray] = None
+        self.count = 0
+
+    def add(self, vector: List[float]):
+        if not vector:
+            return
+        if self._sum is None:
+            self._sum = np.zeros(len(vector), dtype=np.float64)
+        self._sum += vector
+        self.count += 1
+
+    def value(self) -> List[float]:
+        return (self._sum / self.count).tolist() if self.count else []
+
+async def run_pipeline(pages: AsyncIterator[str], chunker: TextChunker, batch_size: int,
+                       embed_batch: Callable[[List[str]], Awaitable[List[List[float]]]],
+                       persist_batch: Callable[[List[str], List[List[float]]], Awaitable[None]],
+                       queue_size: int = INGEST_QUEUE_BATCHES):
+    """sayfa → chunk → embed → kaydet aşamalarını sınırlı kuyruklarla eşzamanlı çalıştır.
+
+    Çıkarma, embedding ve veritabanı yazımı birbiriyle örtüşür; kuyruklar dolunca
+    önceki aşama bekler (backpressure), böylece bellekte en fazla birkaç batch bulunur.
+    """
+    chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    embedded_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    async def produce():
+        pending: List[str] = []
+        async for page in pages:
+            pending.extend(chunker.feed(page))
+            while len(pending) >= batch_size:
+                await chunk_queue.put(pending[:batch_size])
+                pending = pending[batch_size:]
+        pending.extend(chunker.flush())
+        for i in range(0, len(pending), batch_size):
+            await chunk_queue.put(pending[i:i + batch_size])
+        await chunk_queue.put(None)
+
+    async def embed():
+        while (batch := await chunk_queue.get()) is not None:
+            await embedded_queue.put((batch, await embed_batch(batch)))
+        await embedded_queue.put(None)
+
+    async def persist():
+        while (item := await embedded_queue.get()) is not None:
+            await persist_batch(*item)
+
+    tasks = [asyncio.create_task(stage()) for stage in (produce, embed, persist)]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # Bir aşama hata verirse diğerleri dolu/boş kuyrukta sonsuza dek beklemesin
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -0,0 +1,197 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+
+from app.database.database import SessionLocal
+from app.models.job import ProcessingJob
+
+load_dotenv()
+
+# Kuyruk ayarları
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "30"))
+
+# İş tipleri ve varsayılan öncelikleri - indeksleme (aranabilirlik) zenginleştirmeden önce gelir
+JOB_PRIORITIES = {
+    "index_document": 10,
+    "enrich_document": 0,
+    "embed_shadow": -5,  # Kullanıcı bazında embedding göçü (document_id yok)
+}
+# Toplu yeniden indeksleme yeni yüklemelerin önüne geçmesin
+REINDEX_PRIORITY = 5
+
+class PermanentJobError(Exception):
+    """Yeniden denenmesi anlamsız hata (ör. döküman silinmiş)"""
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def enqueue(db: Session, job_type: str, user_id: int, document_id: Optional[int] = None,
+            priority: Optional[int] = None, max_attempts: int = JOB_MAX_ATTEMPTS) -> ProcessingJob:
+    """İşi kuyruğa ekle - aynı döküman için bekleyen aynı tip iş varsa onu döndür"""
+    if job_type not in JOB_PRIORITIES:
+        raise ValueError(f"Bilinmeyen iş tipi: {job_type}")
+
+    if document_id is not None:
+        existing = db.query(ProcessingJob).filter(
+            ProcessingJob.job_type == job_type,
+            ProcessingJob.document_id == document_id,
+            ProcessingJob.status == "queued"
+        ).first()
+    else:
+        # Kullanıcı bazındaki işler (embedding göçü): çalışan iş de yeterlidir
+        existing = active_job(db, job_type, user_id)
+    if existing:
+        return existing
+
+    job = ProcessingJob(
+        job_type=job_type,
+        user_id=user_id,
+        document_id=document_id,
+        priority=JOB_PRIORITIES[job_type] if priority is None else priority,
+        status="queued",
+        attempts=0,
+        max_attempts=max_attempts,
+        run_after=utcnow()
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    print(f"📥 İş kuyruğa eklendi: #{job.id} {job_type} (document {document_id})")
+    return job
+
+def active_job(db: Session, job_type: str, user_id: int) -> Optional[ProcessingJob]:
+    """Kullanıcının bekleyen ya da çalışan (document_id'siz) işi"""
+    return db.query(ProcessingJob).filter(
+        ProcessingJob.job_type == job_type,
+        ProcessingJob.user_id == user_id,
+        ProcessingJob.document_id.is_(None),
+        ProcessingJob.status.in_(("queued", "running"))
+    ).first()
+
+def _claimable(now: datetime):
+    """Bekleyen ya da kiralama süresi dolmuş (çalışanı ölmüş) işler"""
+    return or_(
+        and_(ProcessingJob.status == "queued", ProcessingJob.run_after <= now),
+        and_(ProcessingJob.status == "running", ProcessingJob.lease_until < now)
+    )
+
+def claim(worker_id: str, job_types: Optional[List[str]] = None, candidates: int = 10) -> Optional[ProcessingJob]:
+    """Sıradaki işi kirala.
+
+    Koşullu UPDATE ile (optimistic) kiralanır; aynı veritabanını kullanan birden
+    fazla node'daki worker'lar aynı işi alamaz.
+    """
+    db = SessionLocal()
+    try:
+        now = utcnow()
+        # Deneme hakkı bitmiş işler, worker'ı çöktüyse tekrar alınmaz
+        db.query(ProcessingJob).filter(
+            ProcessingJob.status == "running",
+            ProcessingJob.lease_until < now,
+            ProcessingJob.attempts >= ProcessingJob.max_attempts
+        ).update({
+            ProcessingJob.status: "failed",
+            ProcessingJob.lease_until: None,
+            ProcessingJob.last_error: "Kiralama süresi doldu (worker yanıt vermedi)",
+            ProcessingJob.finished_at: now,
+        }, synchronize_session=False)
+        db.commit()
+
+        query = db.query(ProcessingJob.id).filter(_claimable(now))
+        if job_types:
+            query = query.filter(ProcessingJob.job_type.in_(job_types))
+        job_ids = [row[0] for row in query.order_by(
+            ProcessingJob.priority.desc(), ProcessingJob.id.asc()
+        ).limit(candidates).all()]
+
+        for job_id in job_ids:
+            claimed = db.query(ProcessingJob).filter(
+                ProcessingJob.id == job_id,
+                _claimable(now)
+            ).update({
+                ProcessingJob.status: "running",
+                ProcessingJob.worker_id: worker_id,
+                ProcessingJob.lease_until: now + timedelta(seconds=JOB_LEASE_SECONDS),
+                ProcessingJob.attempts: ProcessingJob.attempts + 1,
+                ProcessingJob.started_at: now,
+            }, synchronize_session=False)
+            db.commit()
+            if claimed:
+                job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
+                db.expunge(job)
+                return job
+        return None
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def _update_owned(job_id: int, worker_id: str, values: dict) -> bool:
+    """Sadece işi hâlâ bu worker kiralıyorsa güncelle"""
+    db = SessionLocal()
+    try:
+        updated = db.query(ProcessingJob).filter(
+            ProcessingJob.id == job_id,
+            ProcessingJob.worker_id == worker_id,
+            ProcessingJob.status == "running"
+        ).update(values, synchronize_session=False)
+        db.commit()
+        return bool(updated)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def heartbeat(job_id: int, worker_id: str) -> bool:
+    """Kiralama süresini uzat - iş başka worker'a geçtiyse False"""
+    return _update_owned(job_id, worker_id, {
+        ProcessingJob.lease_until: utcnow() + timedelta(seconds=JOB_LEASE_SECONDS)
+    })
+
+def complete(job_id: int, worker_id: str) -> bool:
+    return _update_owned(job_id, worker_id, {
+        ProcessingJob.status: "succeeded",
+        ProcessingJob.lease_until: None,
+        ProcessingJob.last_error: None,
+        ProcessingJob.finished_at: utcnow(),
+    })
+
+def fail(job: ProcessingJob, worker_id: str, error: str, permanent: bool = False) -> bool:
+    """Hata kaydet - deneme hakkı kaldıysa üstel bekleme ile tekrar kuyruğa al"""
+    now = utcnow()
+    if not permanent and job.attempts < job.max_attempts:
+        delay = JOB_RETRY_BASE_SECONDS * (2 ** (job.attempts - 1))
+        print(f"🔁 İş #{job.id} {delay:.0f}s sonra tekrar denenecek ({job.attempts}/{job.max_attempts}): {error}")
+        return _update_owned(job.id, worker_id, {
+            ProcessingJob.status: "queued",
+            ProcessingJob.run_after: now + timedelta(seconds=delay),
+            ProcessingJob.lease_until: None,
+            ProcessingJob.last_error: error,
+        })
+
+    print(f"❌ İş #{job.id} başarısız: {error}")
+    return _update_owned(job.id, worker_id, {
+        ProcessingJob.status: "failed",
+        ProcessingJob.lease_until: None,
+        ProcessingJob.last_error: error,
+        ProcessingJob.finished_at: now,
+    })
+
+def retry(db: Session, job: ProcessingJob) -> ProcessingJob:
+    """Başarısız işi yeni deneme hakkıyla tekrar kuyruğa al"""
+    job.status = "queued"
+    job.attempts = 0
+    job.run_after = utcnow()
+    job.worker_id = None
+    job.finished_at = None
+    db.commit()
+    db.refresh(job)
+    return job
@@ -0,0 +1,28 @@
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from .base import AIProvider, run_blocking
+
+load_dotenv()
+
+_provider: Optional[AIProvider] = None
+
+def get_provider() -> AIProvider:
+    """``AI_PROVIDER`` ayarına göre (gemini | local) paylaşılan sağlayıcıyı döndür"""
+    global _provider
+    if _provider is None:
+        name = os.getenv("AI_PROVIDER", "gemini").lower()
+        if name == "gemini":
+            from .gemini import GeminiProvider
+            _provider = GeminiProvider()
+        elif name == "local":
+            from .local import LocalProvider
+            _provider = LocalProvider()
+        else:
+            raise ValueError(f"Unknown AI_PROVIDER: {name}")
+        print(f"🤖 AI sağlayıcı: {_provider.name}")
+    return _provider
+
+__all__ = ["AIProvider", "get_provider", "run_blocking"]
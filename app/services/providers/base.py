@@ -0,0 +1,54 @@
+import os
+import asyncio
+import functools
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Async karşılığı olmayan bloklayıcı çağrılar için sınırlı havuz
+GEMINI_MAX_WORKERS = int(os.getenv("GEMINI_MAX_WORKERS", "16"))
+_executor = ThreadPoolExecutor(max_workers=GEMINI_MAX_WORKERS, thread_name_prefix="ai-provider")
+
+async def run_blocking(func, *args, **kwargs):
+    """Bloklayıcı bir çağrıyı paylaşılan havuzda çalıştır"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+class AIProvider(ABC):
+    """Embedding, metin üretimi ve vision için sağlayıcı arayüzü.
+
+    Kota, yeniden deneme ve devre kesici ``GeminiService`` tarafından uygulanır;
+    sağlayıcılar sadece tek bir denemeyi verilen ``timeout`` içinde yapar.
+    """
+
+    name: str
+    embedding_model: str
+    generation_model: str
+    vision_model: str
+
+    @abstractmethod
+    async def embed(self, texts: List[str], task_type: str, timeout: float,
+                    model: Optional[str] = None) -> List[List[float]]:
+        """Metinleri sırası korunarak embed et (``model`` verilmezse ``embedding_model``)"""
+
+    @abstractmethod
+    async def generate(self, prompt: str, timeout: float, task: str = "chat",
+                       source_text: Optional[str] = None, json_output: bool = False) -> str:
+        """Prompt'tan yanıt üret.
+
+        ``task`` (summary, keywords, analysis, chat) ve ``source_text`` (prompt'a giren
+        ham metin) API'siz sağlayıcıların şablon yanıt üretebilmesi içindir.
+        """
+
+    @abstractmethod
+    async def generate_stream(self, prompt: str, timeout: float,
+                              source_text: Optional[str] = None) -> AsyncIterator[str]:
+        """Akışı aç ve metin parçalarını veren bir async iterator döndür"""
+
+    @abstractmethod
+    async def vision(self, prompt: str, image_bytes: bytes, mime_type: str, timeout: float) -> str:
+        """Resimdeki metni çıkar"""
@@ -0,0 +1,79 @@
+import os
+import base64
+from typing import AsyncIterator, List, Optional
+
+import google.generativeai as genai
+
+from app.services.providers.base import AIProvider, run_blocking
+
+_configured_api_key: Optional[str] = None
+
+def _configure_once(api_key: str):
+    """genai'yi süreç başına bir kez yapılandır.
+
+    Her ``configure`` çağrısı SDK'nın önbelleğe aldığı istemcileri sıfırlar;
+    tek seferlik yapılandırma ile tüm servisler aynı bağlantı havuzunu kullanır.
+    """
+    global _configured_api_key
+    if _configured_api_key != api_key:
+        genai.configure(api_key=api_key)
+        _configured_api_key = api_key
+
+class GeminiProvider(AIProvider):
+    """Google Gemini API sağlayıcısı"""
+
+    name = "gemini"
+    embedding_model = "models/embedding-001"
+    generation_model = "gemini-2.0-flash"
+    vision_model = "gemini-2.0-flash-exp"
+
+    def __init__(self):
+        self.api_key = os.getenv("GEMINI_API_KEY")
+        if not self.api_key:
+            raise ValueError("GEMINI_API_KEY not found in environment variables")
+
+        _configure_once(self.api_key)
+        self.model = genai.GenerativeModel(self.generation_model)
+        self._vision_model = genai.GenerativeModel(self.vision_model)
+
+    async def embed(self, texts: List[str], task_type: str, timeout: float,
+                    model: Optional[str] = None) -> List[List[float]]:
+        kwargs = dict(model=model or self.embedding_model, content=list(texts), task_type=task_type,
+                      request_options={"timeout": timeout})
+        embed_async = getattr(genai, "embed_content_async", None)
+        if embed_async is not None:
+            response = await embed_async(**kwargs)
+        else:
+            response = await run_blocking(genai.embed_content, **kwargs)
+        return response['embedding']
+
+    async def generate(self, prompt: str, timeout: float, task: str = "chat",
+                       source_text: Optional[str] = None, json_output: bool = False) -> str:
+        kwargs = {"request_options": {"timeout": timeout}}
+        if json_output:
+            kwargs["generation_config"] = {"response_mime_type": "application/json"}
+        response = await self.model.generate_content_async(prompt, **kwargs)
+        return response.text.strip()
+
+    async def generate_stream(self, prompt: str, timeout: float,
+                              source_text: Optional[str] = None) -> AsyncIterator[str]:
+        response = await self.model.generate_content_async(
+            prompt, stream=True, request_options={"timeout": timeout}
+        )
+        return self._iter_text(response)
+
+    async def _iter_text(self, response) -> AsyncIterator[str]:
+        async for chunk in response:
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+    async def vision(self, prompt: str, image_bytes: bytes, mime_type: str, timeout: float) -> str:
+        response = await self._vision_model.generate_content_async([
+            prompt,
+            {
+                "mime_type": mime_type,
+                "data": base64.b64encode(image_bytes).decode('utf-8')
+            }
+        ], request_options={"timeout": timeout})
+        return response.text.strip()
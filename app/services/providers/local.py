@@ -0,0 +1,102 @@
+import os
+import json
+import math
+import random
+import asyncio
+import hashlib
+from collections import Counter
+from typing import AsyncIterator, List, Optional
+
+from dotenv import load_dotenv
+
+from app.services.providers.base import AIProvider
+from app.services.fallbacks import tokenize, extractive_summary, local_keywords
+
+load_dotenv()
+
+# Yerel sağlayıcı ayarları - ağ olmadan tekrarlanabilir benchmark için
+LOCAL_EMBEDDING_DIM = int(os.getenv("LOCAL_EMBEDDING_DIM", "768"))
+LOCAL_AI_LATENCY_MS = float(os.getenv("LOCAL_AI_LATENCY_MS", "0"))
+LOCAL_AI_LATENCY_JITTER_MS = float(os.getenv("LOCAL_AI_LATENCY_JITTER_MS", "0"))
+LOCAL_AI_TOKEN_LATENCY_MS = float(os.getenv("LOCAL_AI_TOKEN_LATENCY_MS", "0"))
+LOCAL_AI_SEED = int(os.getenv("LOCAL_AI_SEED", "42"))
+
+def hashed_bow_embedding(text: str, dim: int = LOCAL_EMBEDDING_DIM) -> List[float]:
+    """Hash'lenmiş bag-of-words vektörü (işaretli feature hashing, L2 normalize)"""
+    vector = [0.0] * dim
+    for token, count in Counter(tokenize(text)).items():
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        sign = 1.0 if value & 1 else -1.0
+        vector[(value >> 1) % dim] += sign * (1.0 + math.log(count))
+
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0:
+        # Boş metin için sabit, sıfır olmayan vektör (kosinüs benzerliği tanımlı kalsın)
+        vector[0] = 1.0
+        return vector
+    return [v / norm for v in vector]
+
+class LocalProvider(AIProvider):
+    """Deterministik yerel sağlayıcı: hash'li BoW embedding, şablon özetler, ayarlanabilir gecikme"""
+
+    name = "local"
+    embedding_model = f"local-hash-bow-{LOCAL_EMBEDDING_DIM}"
+    generation_model = "local-template"
+    vision_model = "local-template"
+
+    def __init__(self):
+        self._random = random.Random(LOCAL_AI_SEED)
+
+    async def _simulate_latency(self):
+        """Yapılandırılmış sabit + jitter gecikmesini uygula"""
+        delay_ms = LOCAL_AI_LATENCY_MS
+        if LOCAL_AI_LATENCY_JITTER_MS:
+            delay_ms += self._random.uniform(-LOCAL_AI_LATENCY_JITTER_MS, LOCAL_AI_LATENCY_JITTER_MS)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000.0)
+
+    async def embed(self, texts: List[str], task_type: str, timeout: float,
+                    model: Optional[str] = None) -> List[List[float]]:
+        await self._simulate_latency()
+        # "local-hash-bow-<boyut>" adlı modeller farklı boyutlarda vektör üretir (göç denemeleri için)
+        dim = LOCAL_EMBEDDING_DIM
+        if model and model.startswith("local-hash-bow-") and model.rsplit("-", 1)[1].isdigit():
+            dim = int(model.rsplit("-", 1)[1])
+        return [hashed_bow_embedding(text, dim) for text in texts]
+
+    async def generate(self, prompt: str, timeout: float, task: str = "chat",
+                       source_text: Optional[str] = None, json_output: bool = False) -> str:
+        await self._simulate_latency()
+        return self._template_response(task, source_text if source_text is not None else prompt)
+
+    async def generate_stream(self, prompt: str, timeout: float,
+                              source_text: Optional[str] = None) -> AsyncIterator[str]:
+        await self._simulate_latency()
+        return self._iter_words(self._template_response("chat", source_text if source_text is not None else prompt))
+
+    async def _iter_words(self, text: str) -> AsyncIterator[str]:
+        for i, word in enumerate(text.split(" ")):
+            if LOCAL_AI_TOKEN_LATENCY_MS:
+                await asyncio.sleep(LOCAL_AI_TOKEN_LATENCY_MS / 1000.0)
+            yield word if i == 0 else f" {word}"
+
+    async def vision(self, prompt: str, image_bytes: bytes, mime_type: str, timeout: float) -> str:
+        await self._simulate_latency()
+        digest = hashlib.sha256(image_bytes).hexdigest()[:16]
+        return f"Yerel OCR çıktısı ({mime_type}, {len(image_bytes)} byte, {digest})"
+
+    def _template_response(self, task: str, text: str) -> str:
+        """Görev tipine göre deterministik şablon yanıt"""
+        if task == "summary":
+            return f"Bu döküman özetle şunları içeriyor: {extractive_summary(text, max_sentences=3)}"
+        if task == "history":
+            return extractive_summary(text, max_sentences=6)
+        if task == "keywords":
+            return ", ".join(local_keywords(text))
+        if task == "analysis":
+            return json.dumps({
+                "summary": f"Bu döküman özetle şunları içeriyor: {extractive_summary(text, max_sentences=3)}",
+                "keywords": local_keywords(text)
+            }, ensure_ascii=False)
+        return f"Kaynaklara göre: {extractive_summary(text, max_sentences=3)}"
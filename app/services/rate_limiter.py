@@ -0,0 +1,265 @@
+import asyncio
+import os
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from dotenv import load_dotenv
+
+from app.services.resilience import CircuitBreaker
+
+load_dotenv()
+
+T = TypeVar("T")
+
+# Gemini kota ayarları (dakika başına istek, 0 = sınırsız)
+GEMINI_GENERATE_RPM = float(os.getenv("GEMINI_GENERATE_RPM", "60"))
+GEMINI_EMBED_RPM = float(os.getenv("GEMINI_EMBED_RPM", "600"))
+
+# Çağrı tipi başına eşzamanlılık sınırları
+GEMINI_CONCURRENCY = {
+    "generate": int(os.getenv("GEMINI_GENERATE_CONCURRENCY", "4")),
+    "chat": int(os.getenv("GEMINI_CHAT_CONCURRENCY", "8")),
+    "vision": int(os.getenv("GEMINI_VISION_CONCURRENCY", "2")),
+    "embed_query": int(os.getenv("GEMINI_EMBED_QUERY_CONCURRENCY", "16")),
+    "embed_batch": int(os.getenv("GEMINI_EMBED_BATCH_CONCURRENCY", "4")),
+}
+
+# Çağrı tipi -> kullandığı kota kovası
+CALL_QUOTA = {
+    "generate": "generate",
+    "chat": "generate",
+    "vision": "generate",
+    "embed_query": "embed",
+    "embed_batch": "embed",
+}
+
+# Yeniden deneme (jitter'lı üstel bekleme) ayarları
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "5"))
+GEMINI_BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE", "1.0"))
+GEMINI_BACKOFF_MAX = float(os.getenv("GEMINI_BACKOFF_MAX", "30.0"))
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Çağrı tipi başına toplam süre sınırı (kuyruk + tüm denemeler, saniye)
+GEMINI_DEADLINES = {
+    "generate": float(os.getenv("GEMINI_GENERATE_DEADLINE", "120")),
+    "chat": float(os.getenv("GEMINI_CHAT_DEADLINE", "45")),
+    "vision": float(os.getenv("GEMINI_VISION_DEADLINE", "120")),
+    "embed_query": float(os.getenv("GEMINI_EMBED_QUERY_DEADLINE", "5")),
+    "embed_batch": float(os.getenv("GEMINI_EMBED_BATCH_DEADLINE", "120")),
+}
+
+# Gecikmeye duyarlı çağrılar için hedge: ilk deneme bu süre içinde bitmezse ikinci bir deneme başlatılır
+GEMINI_HEDGE_AFTER = {
+    "embed_query": float(os.getenv("GEMINI_EMBED_QUERY_HEDGE_AFTER", "1.0")),
+}
+
+
+class TokenBucket:
+    """Dakikalık kotaya göre dolan token kovası"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1.0, rate_per_minute / 60.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, tokens: float = 1.0):
+        """Yeterli token birikene kadar bekle (kota 0 ise sınırsız)"""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+class CallStats:
+    """Çağrı tipi başına kuyruk ve bekleme metrikleri"""
+
+    def __init__(self):
+        self.queued = 0
+        self.in_flight = 0
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.failures = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "queue_depth": self.queued,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "failures": self.failures,
+            "avg_wait_seconds": round(self.total_wait / self.calls, 4) if self.calls else 0.0,
+            "max_wait_seconds": round(self.max_wait, 4),
+        }
+
+
+class ProviderTimeout(asyncio.TimeoutError):
+    """Sağlayıcıya giden çağrı zaman aşımına uğradı (yerel kuyruktaki bekleme değil)"""
+
+
+def is_retryable(error: Exception) -> bool:
+    """429/5xx ve zaman aşımı hataları yeniden denenir"""
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    # google.api_core hataları HTTP durum kodunu ``code`` alanında taşır
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and code in RETRYABLE_STATUS_CODES
+
+
+class GeminiScheduler:
+    """Tüm Gemini çağrılarının önünde duran paylaşılan zamanlayıcı.
+
+    Kota için token kovası, çağrı tipi başına eşzamanlılık sınırı, 429/5xx
+    hatalarında jitter'lı üstel bekleme, çağrı başına toplam süre sınırı (deadline),
+    kota grubu başına devre kesici ve gecikmeye duyarlı çağrılarda hedge uygular.
+    """
+
+    def __init__(self):
+        self.buckets = {
+            "generate": TokenBucket(GEMINI_GENERATE_RPM),
+            "embed": TokenBucket(GEMINI_EMBED_RPM),
+        }
+        self.breakers = {name: CircuitBreaker(name) for name in self.buckets}
+        self.semaphores = {
+            call_type: asyncio.Semaphore(limit) for call_type, limit in GEMINI_CONCURRENCY.items()
+        }
+        self.stats = {call_type: CallStats() for call_type in GEMINI_CONCURRENCY}
+
+    async def run(self, call_type: str, call: Callable[[float], Awaitable[T]], timeout: float,
+                  deadline: Optional[float] = None) -> T:
+        """``call(timeout)``'ı kota, eşzamanlılık ve süre sınırları içinde, gerekirse yeniden deneyerek çalıştır.
+
+        ``deadline`` mutlak ``time.monotonic()`` değeridir; verilmezse çağrı tipinin varsayılanı kullanılır.
+        Devre açıksa ``CircuitOpenError``, süre dolarsa ``asyncio.TimeoutError`` fırlatılır.
+        Devre kesiciye sadece sağlayıcı tarafı hatalar sayılır; süre yerel kuyrukta
+        (eşzamanlılık/kota beklemesi) dolduysa yerel yoğunluk paylaşılan devreyi açmaz.
+        """
+        stats = self.stats[call_type]
+        breaker = self.breakers[CALL_QUOTA[call_type]]
+        deadline = deadline or time.monotonic() + GEMINI_DEADLINES[call_type]
+        hedge_after = GEMINI_HEDGE_AFTER.get(call_type)
+
+        attempt = 0
+        while True:
+            breaker.before_call()
+            recorded = False
+            try:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError(f"Gemini {call_type} süre sınırı aşıldı")
+                attempt_timeout = min(timeout, remaining)
+
+                if hedge_after is not None and hedge_after < attempt_timeout:
+                    coro = self._hedged(call_type, call, attempt_timeout, hedge_after)
+                else:
+                    coro = self._attempt(call_type, call, attempt_timeout)
+                # Kuyrukta bekleme de süre sınırına dahildir
+                result = await asyncio.wait_for(coro, timeout=remaining)
+                breaker.record_success()
+                recorded = True
+                return result
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError) and not isinstance(e, ProviderTimeout):
+                    # Toplam süre doldu - sağlayıcı hatası değil, deneme sonucu kaydedilmez
+                    stats.failures += 1
+                    raise
+                retryable = is_retryable(e)
+                if retryable:
+                    breaker.record_failure()
+                else:
+                    # 4xx vb. hatalar servisin ayakta olduğunu gösterir
+                    breaker.record_success()
+                recorded = True
+
+                delay = random.uniform(0, min(GEMINI_BACKOFF_MAX, GEMINI_BACKOFF_BASE * 2 ** (attempt + 1)))
+                if (not retryable or attempt >= GEMINI_MAX_RETRIES
+                        or time.monotonic() + delay >= deadline or breaker.state == "open"):
+                    stats.failures += 1
+                    raise
+                attempt += 1
+                stats.retries += 1
+                print(f"⏳ Gemini {call_type} yeniden deneniyor ({attempt}/{GEMINI_MAX_RETRIES}), {delay:.1f}s sonra: {e}")
+                await asyncio.sleep(delay)
+            finally:
+                if not recorded:
+                    breaker.release()
+
+    async def _attempt(self, call_type: str, call: Callable[[float], Awaitable[T]], timeout: float) -> T:
+        """Tek deneme: eşzamanlılık ve kota sırasını bekle, sonra çağrıyı yap"""
+        stats = self.stats[call_type]
+        bucket = self.buckets[CALL_QUOTA[call_type]]
+
+        queued_at = time.monotonic()
+        dequeued = False
+        stats.queued += 1
+        try:
+            async with self.semaphores[call_type]:
+                await bucket.acquire()
+                stats.queued -= 1
+                dequeued = True
+                waited = time.monotonic() - queued_at
+                stats.calls += 1
+                stats.total_wait += waited
+                stats.max_wait = max(stats.max_wait, waited)
+
+                stats.in_flight += 1
+                try:
+                    return await asyncio.wait_for(call(timeout), timeout=timeout)
+                except asyncio.TimeoutError as e:
+                    raise ProviderTimeout(f"Gemini {call_type} yanıtı {timeout:.1f}s içinde gelmedi") from e
+                finally:
+                    stats.in_flight -= 1
+        finally:
+            # Kuyrukta beklerken iptal edilen çağrılar sayaçta kalmasın
+            if not dequeued:
+                stats.queued -= 1
+
+    async def _hedged(self, call_type: str, call: Callable[[float], Awaitable[T]], timeout: float,
+                      hedge_after: float) -> T:
+        """İlk deneme ``hedge_after`` içinde bitmezse paralel ikinci deneme başlat, ilk başarılıyı döndür"""
+        tasks = {asyncio.ensure_future(self._attempt(call_type, call, timeout))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done:
+                self.stats[call_type].hedges += 1
+                tasks.add(asyncio.ensure_future(self._attempt(call_type, call, timeout)))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def metrics(self) -> Dict:
+        """Kuyruk derinliği, bekleme süresi ve devre kesici metrikleri"""
+        metrics = {call_type: stats.as_dict() for call_type, stats in self.stats.items()}
+        metrics["circuit_breakers"] = {name: breaker.as_dict() for name, breaker in self.breakers.items()}
+        return metrics
+
+
+scheduler = GeminiScheduler()
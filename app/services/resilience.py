@@ -0,0 +1,76 @@
+import os
+import time
+from typing import Dict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Devre kesici ayarları
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("GEMINI_CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("GEMINI_CIRCUIT_RESET_TIMEOUT", "30"))
+
+
+class CircuitOpenError(Exception):
+    """Servis sağlıksızken çağrı yapılmadan hemen dönen hata"""
+
+
+class CircuitBreaker:
+    """Ardışık hatalarda devreyi açıp çağrıları hızlıca reddeden devre kesici.
+
+    closed -> (eşik kadar ardışık hata) -> open -> (bekleme süresi) -> half_open
+    half_open durumunda tek bir deneme çağrısına izin verilir; başarılıysa devre kapanır.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.rejected = 0
+
+    def before_call(self):
+        """Devre açıksa CircuitOpenError fırlat"""
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(f"Gemini {self.name} devresi açık - çağrı yapılmadı")
+            self.state = "half_open"
+            self.trial_in_flight = False
+
+        if self.state == "half_open":
+            if self.trial_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(f"Gemini {self.name} devresi deneme aşamasında")
+            self.trial_in_flight = True
+
+    def record_success(self):
+        if self.state != "closed":
+            print(f"✅ Gemini {self.name} devresi kapandı")
+        self.state = "closed"
+        self.failures = 0
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                print(f"⚠️ Gemini {self.name} devresi açıldı ({self.failures} ardışık hata)")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Sonucu kaydedilmeden biten (ör. iptal edilen) deneme çağrısını serbest bırak"""
+        self.trial_in_flight = False
+
+    def as_dict(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+        }
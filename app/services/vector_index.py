@@ -0,0 +1,139 @@
+import os
+import json
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from dotenv import load_dotenv
+
+from app.database.database import SessionLocal
+from app.models.document import Document, DocumentChunk
+from app.services.providers import get_provider
+
+load_dotenv()
+
+# Bellekte tutulacak en fazla kullanıcı vektör kümesi sayısı
+VECTOR_INDEX_MAX_USERS = int(os.getenv("VECTOR_INDEX_MAX_USERS", "32"))
+
+class IndexedChunk(NamedTuple):
+    id: int
+    document_id: int
+    chunk_index: int
+    chunk_text: str
+
+class UserVectors:
+    """Bir kullanıcının chunk'ları ve normalize edilmiş embedding matrisi"""
+
+    def __init__(self, fingerprint: Tuple, chunks: List[IndexedChunk], matrix: Optional[np.ndarray],
+                 model: Optional[str] = None):
+        self.fingerprint = fingerprint
+        self.chunks = chunks
+        self.matrix = matrix
+        self.model = model  # Vektörleri üreten embedding modeli - sorgu da bu modelle embed edilmeli
+        self.positions = {(c.document_id, c.chunk_index): i for i, c in enumerate(chunks)}
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1] if self.matrix is not None else 0
+
+    def similarities(self, query_embedding: List[float]) -> Optional[np.ndarray]:
+        """Tüm chunk'lar için kosinüs benzerliği (boyut uyuşmazsa None)"""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if self.matrix is None or query.shape[0] != self.dimension or norm == 0:
+            return None
+        return self.matrix @ (query / norm)
+
+class VectorIndex:
+    """Kullanıcı başına chunk vektörlerini bellekte tutar.
+
+    Her istekte ucuz bir parmak izi sorgusu (chunk sayısı, en büyük chunk id,
+    model etiketleri) çalışır; değişmediyse JSON embedding'ler yeniden parse edilmez.
+    """
+
+    def __init__(self, max_users: int = VECTOR_INDEX_MAX_USERS):
+        self.max_users = max_users
+        self._cache: "OrderedDict[int, UserVectors]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _chunk_query(self, db, user_id: int, *columns):
+        return db.query(*columns).join(Document, Document.id == DocumentChunk.document_id).filter(
+            Document.user_id == user_id,
+            Document.processed == True,  # İndeksleme tamamlanmış (aranabilir) dökümanlar
+            DocumentChunk.staged == False,  # Yeniden indekslemenin henüz devreye girmemiş chunk'ları hariç
+            DocumentChunk.embeddings.isnot(None)
+        )
+
+    def load(self, user_id: int) -> UserVectors:
+        """Kullanıcının vektör kümesini döndür (gerekirse veritabanından yükle) - senkron"""
+        db = SessionLocal()
+        try:
+            fingerprint = tuple(self._chunk_query(
+                db, user_id, func.count(DocumentChunk.id), func.max(DocumentChunk.id),
+                func.min(DocumentChunk.embedding_model), func.max(DocumentChunk.embedding_model)
+            ).one())
+            with self._lock:
+                cached = self._cache.get(user_id)
+                if cached and cached.fingerprint == fingerprint:
+                    self._cache.move_to_end(user_id)
+                    return cached
+
+            rows = self._chunk_query(
+                db, user_id, DocumentChunk.id, DocumentChunk.document_id,
+                DocumentChunk.chunk_index, DocumentChunk.chunk_text, DocumentChunk.embeddings,
+                DocumentChunk.embedding_model
+            ).order_by(DocumentChunk.id.asc()).all()
+        finally:
+            db.close()
+
+        vectors = self._build(fingerprint, rows)
+        with self._lock:
+            self._cache[user_id] = vectors
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.max_users:
+                self._cache.popitem(last=False)
+        print(f"🧮 Vector index loaded for user {user_id}: {len(vectors.chunks)} chunks")
+        return vectors
+
+    def model_hint(self, user_id: int) -> Optional[str]:
+        """Önbellekteki vektör kümesinin modeli (sorguyu yüklemeden önce embed edebilmek için)"""
+        with self._lock:
+            cached = self._cache.get(user_id)
+            return cached.model if cached else None
+
+    def invalidate(self, user_id: Optional[int] = None):
+        with self._lock:
+            if user_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(user_id, None)
+
+    def _build(self, fingerprint: Tuple, rows) -> UserVectors:
+        default_model = get_provider().embedding_model
+        parsed = []
+        for chunk_id, document_id, chunk_index, chunk_text, embeddings, model in rows:
+            try:
+                vector = json.loads(embeddings)
+            except (TypeError, ValueError):
+                continue
+            if vector:
+                parsed.append((IndexedChunk(chunk_id, document_id, chunk_index, chunk_text),
+                               vector, model or default_model))
+
+        if not parsed:
+            return UserVectors(fingerprint, [], None)
+
+        # Farklı modellerin vektörleri karışmasın - en yaygın model (ve boyut) kullanılır
+        model = Counter(m for _, _, m in parsed).most_common(1)[0][0]
+        parsed = [(c, v) for c, v, m in parsed if m == model]
+        dimension = Counter(len(v) for _, v in parsed).most_common(1)[0][0]
+        parsed = [(c, v) for c, v in parsed if len(v) == dimension]
+
+        matrix = np.asarray([v for _, v in parsed], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return UserVectors(fingerprint, [c for c, _ in parsed], matrix / norms, model)
+
+vector_index = VectorIndex()
@@ -0,0 +1,30 @@
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Dict
+
+class StageTimer:
+    """İstek aşamalarının süresini (ms) ölçer - eşzamanlı aşamalar ayrı ayrı kaydedilir"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    async def measure(self, name: str, awaitable: Awaitable):
+        """Bir coroutine'i bekle ve süresini ``name`` aşaması olarak kaydet"""
+        with self.stage(name):
+            return await awaitable
+
+    def mark(self, name: str):
+        """İstek başlangıcından bu ana kadar geçen süreyi ``name`` olarak kaydet"""
+        self.stages[name] = round((time.perf_counter() - self.started) * 1000, 1)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {**self.stages, "total": round((time.perf_counter() - self.started) * 1000, 1)}
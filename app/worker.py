@@ -0,0 +1,143 @@
+import os
+import sys
+import uuid
+import socket
+import asyncio
+import argparse
+import traceback
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from app.database.database import SessionLocal, engine, Base, ensure_columns
+from app.models import user, document, cache, job, chat as chat_models  # Import models to create tables
+from app.models.document import Document
+from app.models.job import ProcessingJob
+from app.services import job_queue
+from app.services.job_queue import PermanentJobError, JOB_LEASE_SECONDS
+from app.services.extractors import extraction_pool, ocr_pool
+
+load_dotenv()
+
+# Worker ayarları
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "2"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+
+class Worker:
+    """Kuyruktaki işleme işlerini kiralayıp çalıştıran süreç.
+
+    API sunucusundan bağımsız çalışır; aynı veritabanına bağlı birden fazla
+    node'da başlatılarak ingestion kapasitesi artırılabilir.
+    """
+
+    def __init__(self, worker_id: Optional[str] = None, concurrency: int = WORKER_CONCURRENCY,
+                 job_types: Optional[List[str]] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.concurrency = concurrency
+        self.job_types = job_types
+        self._stopping = asyncio.Event()
+        # DocumentProcessor ağır bağımlılıklar (PyMuPDF, OCR) yükler - sadece worker'da oluşturulur
+        from app.services.document_processor import DocumentProcessor
+        self.processor = DocumentProcessor()
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run(self):
+        """``concurrency`` kadar eşzamanlı iş döngüsü çalıştır"""
+        print(f"👷 Worker başladı: {self.worker_id} (eşzamanlılık {self.concurrency})")
+        try:
+            await asyncio.gather(*(self._loop() for _ in range(self.concurrency)))
+        finally:
+            extraction_pool.shutdown()
+            ocr_pool.shutdown()
+        print(f"👋 Worker durdu: {self.worker_id}")
+
+    async def _loop(self):
+        while not self._stopping.is_set():
+            try:
+                claimed = await asyncio.to_thread(job_queue.claim, self.worker_id, self.job_types)
+            except Exception as e:
+                print(f"❌ İş kiralama hatası: {e}")
+                claimed = None
+
+            if claimed is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._execute(claimed)
+
+    async def _execute(self, claimed: ProcessingJob):
+        """İşi kiralama süresini uzatarak çalıştır ve sonucunu kaydet"""
+        print(f"⚙️ İş #{claimed.id} başlıyor: {claimed.job_type} (document {claimed.document_id}, deneme {claimed.attempts})")
+        heartbeat = asyncio.create_task(self._heartbeat(claimed.id))
+        try:
+            await self._handle(claimed)
+            await asyncio.to_thread(job_queue.complete, claimed.id, self.worker_id)
+            print(f"✅ İş #{claimed.id} tamamlandı")
+        except PermanentJobError as e:
+            await asyncio.to_thread(job_queue.fail, claimed, self.worker_id, str(e), True)
+        except Exception as e:
+            print(f"❌ İş #{claimed.id} hatası: {traceback.format_exc()}")
+            await asyncio.to_thread(job_queue.fail, claimed, self.worker_id, str(e) or type(e).__name__)
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: int):
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            if not await asyncio.to_thread(job_queue.heartbeat, job_id, self.worker_id):
+                print(f"⚠️ İş #{job_id} kiralaması kaybedildi")
+                return
+
+    async def _handle(self, claimed: ProcessingJob):
+        if claimed.job_type == "embed_shadow":
+            from app.services.embedding_migration import get_embedding_migrator
+            await get_embedding_migrator().run_shadow(claimed.user_id)
+            return
+
+        db = SessionLocal()
+        try:
+            doc = db.query(Document).filter(Document.id == claimed.document_id).first()
+            if not doc:
+                raise PermanentJobError(f"Döküman bulunamadı: {claimed.document_id}")
+
+            if claimed.job_type == "index_document":
+                if not await self.processor.index_document(doc, db):
+                    # Geçici hatalar index_document'ten yükselir; False = çıkarılabilir metin yok
+                    raise PermanentJobError(f"Çıkarılabilir metin yok: {doc.filename}")
+                # Döküman aranabilir - özet/anahtar kelimeler daha düşük öncelikle
+                job_queue.enqueue(db, "enrich_document", doc.user_id, doc.id)
+            elif claimed.job_type == "enrich_document":
+                if not await self.processor.enrich_document(doc, db):
+                    raise RuntimeError(f"Zenginleştirme başarısız: {doc.filename}")
+            else:
+                raise PermanentJobError(f"Bilinmeyen iş tipi: {claimed.job_type}")
+        finally:
+            db.close()
+
+def main(argv=None):
+    """Worker komutu: python -m app.worker [--concurrency 4] [--job-type index_document]"""
+    parser = argparse.ArgumentParser(description="Döküman işleme worker'ı")
+    parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY,
+                        help="Eşzamanlı çalıştırılacak iş sayısı")
+    parser.add_argument("--worker-id", help="Worker kimliği (varsayılan: host-pid-rastgele)")
+    parser.add_argument("--job-type", action="append", choices=sorted(job_queue.JOB_PRIORITIES),
+                        help="Sadece bu tipteki işleri al (birden fazla verilebilir)")
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    ensure_columns()
+
+    worker = Worker(args.worker_id, args.concurrency, args.job_type)
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        print("\n👋 Worker durduruldu.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+DOCX metin çıkarma karşılaştırması: python-docx (eski yöntem) ve iterparse tabanlı akış çıkarıcı.
+
+Kullanım:
+    python benchmarks/docx_extraction.py                     # Sentetik büyük döküman üretir
+    python benchmarks/docx_extraction.py sozlesme.docx       # Mevcut dosyalar
+    python benchmarks/docx_extraction.py --paragraphs 50000 --tables 500 --rows 40
+
+Not: tepe bellek tracemalloc ile ölçülür; lxml'in (python-docx) C tarafındaki
+ayırmaları sayılmaz, eski yöntemin gerçek bellek kullanımı daha yüksektir.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document as DocxDocument
+
+from app.services.extractors.docx_text import extract_docx_text
+
+def legacy_extract(file_path: str) -> str:
+    """Eski yöntem: python-docx DOM'u, sadece gövde paragrafları"""
+    doc = DocxDocument(file_path)
+    return "\n".join(p.text for p in doc.paragraphs if p.text.strip())
+
+def build_sample(path: str, paragraphs: int, tables: int, rows: int):
+    """Paragraf ve tablolardan oluşan sentetik sözleşme dökümanı"""
+    doc = DocxDocument()
+    doc.sections[0].header.paragraphs[0].text = "Gizli - Hizmet Sözleşmesi"
+    per_table = max(1, paragraphs // max(1, tables))
+    for i in range(paragraphs):
+        doc.add_paragraph(f"Madde {i + 1}: Taraflar işbu sözleşmenin {i + 1}. maddesinde belirtilen "
+                          f"yükümlülükleri süresi içinde ve eksiksiz yerine getirmeyi kabul eder.")
+        if tables and i % per_table == per_table - 1:
+            table = doc.add_table(rows=rows, cols=4)
+            for r, row in enumerate(table.rows):
+                for c, cell in enumerate(row.cells):
+                    cell.text = "Kalem" if r == 0 else f"Ürün {i}-{r}-{c} ₺{r * 125 + c}"
+    doc.save(path)
+
+def measure(func, file_path: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    text = func(file_path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return text, elapsed, peak
+
+def report(file_path: str):
+    print(f"\n📄 {file_path} ({os.path.getsize(file_path) / 1024 / 1024:.1f} MB)")
+    results = {}
+    for name, func in (("python-docx", legacy_extract), ("iterparse", extract_docx_text)):
+        text, elapsed, peak = measure(func, file_path)
+        results[name] = text
+        print(f"  {name:<12} {elapsed * 1000:9.0f} ms   tepe bellek {peak / 1024 / 1024:8.1f} MB   "
+              f"{len(text):>10} karakter")
+
+    legacy_words = set(results["python-docx"].split())
+    missing = legacy_words - set(results["iterparse"].split())
+    print(f"  Eski yöntemin kelimelerinden eksik olan: {len(missing)}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DOCX çıkarıcı karşılaştırması")
+    parser.add_argument("files", nargs="*", help="Karşılaştırılacak DOCX dosyaları")
+    parser.add_argument("--paragraphs", type=int, default=20000)
+    parser.add_argument("--tables", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    files = list(args.files)
+    temp_dir = None
+    if not files:
+        temp_dir = tempfile.TemporaryDirectory()
+        sample = os.path.join(temp_dir.name, "sample.docx")
+        print(f"🛠️ Sentetik döküman oluşturuluyor: {args.paragraphs} paragraf, {args.tables} tablo")
+        build_sample(sample, args.paragraphs, args.tables, args.rows)
+        files.append(sample)
+
+    for file_path in files:
+        report(file_path)
+
+    if temp_dir:
+        temp_dir.cleanup()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
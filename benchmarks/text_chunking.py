@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Metin normalleştirme ve chunk'lama karşılaştırması: eski çok geçişli yöntem ve tek geçişli chunker.
+
+Kullanım:
+    python benchmarks/text_chunking.py                   # 1, 4 ve 16 MB sentetik metin
+    python benchmarks/text_chunking.py --sizes 2 32      # MB cinsinden boyutlar
+    python benchmarks/text_chunking.py metin.txt         # Mevcut dosyalar (UTF-8)
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.chunker import TextChunker, normalize_text
+
+WORDS = ("sözleşme", "madde", "taraflar", "yükümlülük", "ödeme", "süresi", "içinde", "fatura",
+         "teslim", "hizmet", "bedeli", "3.250,00", "TL", "gün", "işbu", "kabul", "eder", "ve")
+
+def legacy_normalize(text: str) -> str:
+    """Eski _clean_and_normalize_text: satır listesi + üç regex geçişi"""
+    lines = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if line:
+            if line.endswith('-') and len(line) > 1:
+                line = line[:-1]
+            lines.append(line)
+    normalized = ' '.join(lines)
+    normalized = re.sub(r'\s+', ' ', normalized)
+    normalized = re.sub(r'([.!?])\s*', r'\1 ', normalized)
+    normalized = re.sub(r'\n\s*\n', '\n\n', normalized)
+    return normalized.strip()
+
+def legacy_chunks(text: str, chunk_size: int = 1200, overlap: int = 250):
+    """Eski _split_text_into_chunks: örtüşen dilimler"""
+    chunks, start = [], 0
+    while start < len(text):
+        end = start + chunk_size
+        chunk = text[start:end]
+        if end < len(text) and not text[end].isspace():
+            last_space = chunk.rfind(' ')
+            if last_space > 0:
+                chunk = chunk[:last_space]
+                end = start + last_space
+        if chunk.strip():
+            chunks.append(chunk.strip())
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+def build_sample(megabytes: float, seed: int = 7) -> str:
+    """PDF çıktısına benzer metin: kısa satırlar, satır sonu tireleri, paragraflar"""
+    rng = random.Random(seed)
+    target = int(megabytes * 1024 * 1024)
+    lines, size = [], 0
+    while size < target:
+        line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 12)))
+        if rng.random() < 0.3:
+            line += "."
+        elif rng.random() < 0.1:
+            line += " söz-"
+        lines.append(line)
+        if rng.random() < 0.08:
+            lines.append("")
+        size += len(line) + 1
+    return "\n".join(lines)
+
+def measure(func, *args):
+    """Süre ve tepe bellek ayrı çalıştırmalarda ölçülür (tracemalloc süreyi şişirir)"""
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def streamed_chunks(text: str, unit: str):
+    """Sayfa sayfa besleyerek (ingest hattındaki gibi) chunk'la"""
+    chunker = TextChunker(unit=unit) if unit == "chars" else TextChunker(300, 60, unit)
+    chunks = []
+    for position in range(0, len(text), 64 * 1024):
+        chunks.extend(chunker.feed(text[position:position + 64 * 1024]))
+    chunks.extend(chunker.flush())
+    return chunks
+
+def report(label: str, text: str):
+    print(f"\n📄 {label} ({len(text) / 1024 / 1024:.1f} MB)")
+    cases = (
+        ("eski normalize", legacy_normalize, (text,)),
+        ("yeni normalize", normalize_text, (text,)),
+        ("eski chunk", legacy_chunks, (legacy_normalize(text),)),
+        ("yeni chunk", streamed_chunks, (normalize_text(text), "chars")),
+        ("yeni chunk (token)", streamed_chunks, (normalize_text(text), "tokens")),
+    )
+    for name, func, args in cases:
+        result, elapsed, peak = measure(func, *args)
+        count = len(result) if isinstance(result, list) else len(result.split("\n\n"))
+        unit = "chunk" if isinstance(result, list) else "paragraf"
+        print(f"  {name:<20} {elapsed * 1000:9.0f} ms   tepe bellek {peak / 1024 / 1024:8.1f} MB   "
+              f"{count:>8} {unit}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Normalleştirme/chunk'lama karşılaştırması")
+    parser.add_argument("files", nargs="*", help="Karşılaştırılacak metin dosyaları")
+    parser.add_argument("--sizes", nargs="*", type=float, default=[1, 4, 16], help="Sentetik metin boyutları (MB)")
+    args = parser.parse_args(argv)
+
+    if args.files:
+        for file_path in args.files:
+            with open(file_path, "r", encoding="utf-8", errors="replace") as file:
+                report(file_path, file.read())
+    else:
+        for megabytes in args.sizes:
+            report("sentetik metin", build_sample(megabytes))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
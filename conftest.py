@@ -0,0 +1,6 @@
+"""pytest ayarları - birim testleri ağsız, deterministik sağlayıcıyla çalışır (GEMINI_API_KEY gerekmez)"""
+
+import os
+
+# .env'den önce ayarlanır; load_dotenv mevcut ortam değişkenlerini ezmez
+os.environ.setdefault("AI_PROVIDER", "local")
@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+AI Döküman Yönetim Sistemi İşleme Worker'ı Başlatıcı
+"""
+
+import sys
+
+from app.worker import main
+
+if __name__ == "__main__":
+    print("👷 Döküman işleme worker'ı başlatılıyor...")
+    print("🛑 Durdurmak için: Ctrl+C")
+    print("-" * 50)
+    sys.exit(main())
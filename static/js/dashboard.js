@@ -976,35 +976,72 @@ async function handleChatMessage(e) {
         document.getElementById('chatMessages').insertAdjacentHTML('beforeend', typingHtml);
         document.getElementById('chatMessages').scrollTop = document.getElementById('chatMessages').scrollHeight;
         
-        // Send message to API
-        const response = await axios.post('/api/chat/', {
-            message: message,
-            session_id: currentChatSession?.id
+        // Send message to API (SSE stream - tokens arrive while the answer is generated)
+        const response = await fetch('/api/chat/stream', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Authorization': `Bearer ${localStorage.getItem('token')}`
+            },
+            body: JSON.stringify({
+                message: message,
+                session_id: currentChatSession?.id
+            })
         });
         
-        const chatResponse = response.data;
+        if (!response.ok) {
+            throw new Error(`Chat stream failed: ${response.status}`);
+        }
         
-        // Remove typing indicator
+        // Replace typing indicator with the streaming AI message
         const typingIndicator = document.getElementById('typingIndicator');
         if (typingIndicator) {
             typingIndicator.remove();
         }
         
-        // Update current session if new one was created
-        if (!currentChatSession || currentChatSession.id !== chatResponse.session_id) {
-            currentChatSession = { id: chatResponse.session_id, session_name: 'Yeni Sohbet' };
-            loadChatSessions(); // Reload sessions
-        }
-        
-        // Add AI response to UI
         const aiMessageHtml = `
             <div class="message-bubble assistant">
-                <div class="message-content">${chatResponse.response}</div>
+                <div class="message-content"></div>
                 <div class="message-time">${formatDate(new Date().toISOString())}</div>
             </div>
         `;
-        document.getElementById('chatMessages').insertAdjacentHTML('beforeend', aiMessageHtml);
-        document.getElementById('chatMessages').scrollTop = document.getElementById('chatMessages').scrollHeight;
+        const chatMessages = document.getElementById('chatMessages');
+        chatMessages.insertAdjacentHTML('beforeend', aiMessageHtml);
+        const aiContent = chatMessages.lastElementChild.querySelector('.message-content');
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let chatResponse = null;
+        
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            
+            buffer += decoder.decode(value, { stream: true });
+            const events = buffer.split('\n\n');
+            buffer = events.pop();
+            
+            for (const rawEvent of events) {
+                const eventLine = rawEvent.split('\n').find(line => line.startsWith('event: '));
+                const dataLine = rawEvent.split('\n').find(line => line.startsWith('data: '));
+                if (!dataLine) continue;
+                
+                const data = JSON.parse(dataLine.slice(6));
+                if (eventLine === 'event: done') {
+                    chatResponse = data;
+                } else {
+                    aiContent.textContent += data.text;
+                    chatMessages.scrollTop = chatMessages.scrollHeight;
+                }
+            }
+        }
+        
+        // Update current session if new one was created
+        if (chatResponse && (!currentChatSession || currentChatSession.id !== chatResponse.session_id)) {
+            currentChatSession = { id: chatResponse.session_id, session_name: 'Yeni Sohbet' };
+            loadChatSessions(); // Reload sessions
+        }
         
     } catch (error) {
         showError('Mesaj gönderilirken hata oluştu');
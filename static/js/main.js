@@ -581,8 +581,8 @@ function renderDocuments() {
                                 </div>
                             ` : ''}
                             <div class="doc-stats">
-                                <span>AI Analizi: ${doc.processed ? 'Tamamlandı' : 'Devam ediyor'}</span>
-                                <span>${doc.processed ? '✓' : '⏳'}</span>
+                                <span>AI Analizi: ${doc.enrichment_status === 'done' ? 'Tamamlandı' : doc.enrichment_status === 'failed' ? 'Başarısız' : 'Devam ediyor'}</span>
+                                <span>${doc.enrichment_status === 'done' ? '✓' : doc.enrichment_status === 'failed' ? '✗' : '⏳'}</span>
                             </div>
                 </div>
             </div>
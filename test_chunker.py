@@ -0,0 +1,86 @@
+"""Metin normalleştirme ve chunk'lama testleri"""
+
+import random
+
+import pytest
+
+from app.services.chunker import TextChunker, count_tokens, iter_chunks, normalize_text, split_text
+
+WORDS = ("sözleşme", "madde", "taraflar", "ödeme", "3.250,00", "TL", "yükümlülük", "ve", "işbu")
+
+def build_text(word_count: int, seed: int = 3) -> str:
+    """Cümle ve paragraf sınırları olan rastgele metin"""
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(word_count):
+        parts.append(rng.choice(WORDS))
+        roll = rng.random()
+        parts.append(". " if roll < 0.06 else "\n\n" if roll < 0.08 else " ")
+    return "".join(parts).strip()
+
+def test_normalize_joins_lines_and_hyphenated_words():
+    text = "  Bu bir söz-\nleşmedir.   Madde\n1 devam\n\n\n İkinci   paragraf\nTÜRK-\nİş"
+    assert normalize_text(text) == "Bu bir sözleşmedir. Madde 1 devam\n\nİkinci paragraf TÜRK- İş"
+
+def test_normalize_keep_lines():
+    assert normalize_text("a\nb\n\n c ", keep_lines=True) == "a\n\nb\n\nc"
+    assert normalize_text("") == ""
+
+@pytest.mark.parametrize("chunk_size,overlap", [(1200, 250), (200, 50), (100, 0)])
+def test_chunks_cover_text_with_bounded_overlap(chunk_size, overlap):
+    text = build_text(3000)
+    chunks = list(iter_chunks(text, chunk_size, overlap, "chars"))
+
+    assert chunks[0].start == 0
+    assert chunks[-1].end == len(text)
+    for chunk in chunks:
+        assert text[chunk.start:chunk.end] == chunk.text
+        assert len(chunk.text) <= chunk_size
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.start > previous.start
+        # Chunk'lar arasında atlanan metin sadece boşluk olabilir
+        assert not text[previous.end:current.start].strip()
+        # Örtüşme overlap'ı aşmaz; overlap varsa chunk'lar gerçekten örtüşür
+        assert previous.end - current.start <= overlap
+        if overlap:
+            assert current.start < previous.end
+
+def test_token_chunks_respect_token_limit():
+    text = build_text(3000)
+    chunks = list(iter_chunks(text, 120, 20, "tokens"))
+
+    assert chunks[-1].end == len(text)
+    for chunk in chunks:
+        assert count_tokens(chunk.text) <= 120
+    for previous, current in zip(chunks, chunks[1:]):
+        assert not text[previous.end:current.start].strip()
+        assert count_tokens(text[current.start:previous.end]) <= 20
+
+def test_streaming_matches_single_pass():
+    text = build_text(5000)
+    chunker = TextChunker(500, 100, "chars")
+    chunks = []
+    # Sayfalar boşlukta bölünür - aradaki ayırıcı metni değiştirmez
+    pages = text.split(" ")
+    for index, page in enumerate(pages):
+        chunks.extend(chunker.feed(page + (" " if index < len(pages) - 1 else "")))
+    chunks.extend(chunker.flush())
+
+    assert chunks == split_text(text, 500, 100, "chars")
+
+def test_cuts_at_paragraph_then_sentence_boundaries():
+    text = "Birinci paragraf cümlesi burada bitiyor.\n\nİkinci paragraf biraz daha uzun bir cümle içeriyor. Sonra devam."
+    chunks = split_text(text, 60, 0, "chars")
+    assert chunks == [
+        "Birinci paragraf cümlesi burada bitiyor.",
+        "İkinci paragraf biraz daha uzun bir cümle içeriyor.",
+        "Sonra devam.",
+    ]
+
+def test_long_word_is_split_at_limit():
+    chunks = split_text("x" * 250, 100, 0, "chars")
+    assert chunks == ["x" * 100, "x" * 100, "x" * 50]
+
+def test_invalid_unit():
+    with pytest.raises(ValueError):
+        TextChunker(unit="words")
@@ -0,0 +1,35 @@
+"""Metin kalite (çöp metin) kontrolü testleri"""
+
+from app.services.extractors.quality import TEXT_QUALITY_MIN_RATIO, looks_like_garbage, readable_ratio
+
+def test_normal_text_passes():
+    text = "Sözleşmenin 3. maddesi uyarınca ödeme 30 gün içinde yapılır; toplam tutar 3.250,00 TL'dir.\n" * 20
+    assert readable_ratio(text) == 1.0
+    assert not looks_like_garbage(text)
+
+def test_empty_or_whitespace_is_garbage():
+    assert looks_like_garbage("")
+    assert looks_like_garbage(" \n\t ")
+    assert readable_ratio("") == 0.0
+
+def test_binary_data_is_garbage():
+    text = "".join(chr(code) for code in range(0, 32) if chr(code) not in "\n\t") * 50 + "metin"
+    assert readable_ratio(text) < TEXT_QUALITY_MIN_RATIO
+    assert looks_like_garbage(text)
+
+def test_readable_ratio_threshold():
+    # Okunabilir oran eşiğin hemen üstünde ve altında
+    assert not looks_like_garbage("abcd " * 18 + "\x01" * 10)  # %90
+    assert looks_like_garbage("abcd " * 16 + "\x01" * 20)  # %80
+
+def test_mostly_punctuation_is_garbage():
+    # Okunabilir sayılır ama harf/rakam oranı %30'un altında
+    text = "--- ... ;;; " * 30 + "abc"
+    assert readable_ratio(text) >= TEXT_QUALITY_MIN_RATIO
+    assert looks_like_garbage(text)
+
+def test_long_tokens_are_garbage():
+    base64_like = "QUJDREVGR0hJSktMTU5PUFFSU1RVVldYWVphYmNkZWZnaGlqa2xtbm9wcXJzdHV2"
+    assert looks_like_garbage(" ".join([base64_like] * 8 + ["normal", "kelime"]))
+    # Tek bir uzun token metni çöp yapmaz
+    assert not looks_like_garbage(" ".join([base64_like] + ["normal", "kelime"] * 10))
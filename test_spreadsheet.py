@@ -0,0 +1,51 @@
+"""Excel sayfası serileştirme testleri"""
+
+import datetime
+
+from app.services.extractors.spreadsheet import MAX_CELL_CHARS, serialize_sheet
+
+def test_header_rows_become_labels():
+    rows = [("Ad", "Tutar", "Tarih"), ("Ayşe", 1250.0, datetime.datetime(2024, 3, 1)), ("Ali", 99.5, None)]
+    assert list(serialize_sheet("Fatura", rows)) == [
+        "--- Fatura ---",
+        "Ad: Ayşe; Tutar: 1250; Tarih: 2024-03-01",
+        "Ad: Ali; Tutar: 99.5",
+    ]
+
+def test_without_header_rows_are_joined():
+    rows = [(1, 2, 3), (4, 5, 6), ("Toplam", "Not", None), (7, 8, 9)]
+    assert list(serialize_sheet("S", rows)) == ["--- S ---", "1 | 2 | 3", "4 | 5 | 6", "Toplam | Not", "7 | 8 | 9"]
+
+def test_later_text_rows_do_not_replace_header():
+    rows = [("Ad", "Tutar"), ("a", 1), ("Ad", "Tutar"), ("Toplam", "Not"), ("b", 2)]
+    assert list(serialize_sheet("S", rows)) == [
+        "--- S ---",
+        "Ad: a; Tutar: 1",
+        "Ad: Toplam; Tutar: Not",
+        "Ad: b; Tutar: 2",
+    ]
+
+def test_offset_table_and_empty_cells():
+    rows = [
+        (None, None, None),
+        (None, "Ürün", "Adet", None),
+        (None, "Kalem", None, None),
+        (None, None, 3),
+        (None, None, None, None, "Not"),
+    ]
+    assert list(serialize_sheet("Stok", rows)) == [
+        "--- Stok ---",
+        "Ürün: Kalem",
+        "Adet: 3",
+        "E: Not",
+    ]
+
+def test_empty_sheet_has_no_output():
+    assert list(serialize_sheet("Boş", [(None, ""), ()])) == []
+
+def test_cell_values_are_formatted():
+    rows = [(True, False, 3.0, " çok   boşluklu\nhücre ", "x" * (MAX_CELL_CHARS + 10))]
+    line = list(serialize_sheet("S", rows))[1]
+    assert line.startswith("Evet | Hayır | 3 | çok boşluklu hücre | ")
+    assert line.endswith("x" * MAX_CELL_CHARS)
+    assert len(line.split(" | ")[-1]) == MAX_CELL_CHARS
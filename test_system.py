@@ -12,8 +12,8 @@ from pathlib import Path
 def check_python_version():
     """Python versiyonunu kontrol et"""
     version = sys.version_info
-    if version.major < 3 or (version.major == 3 and version.minor < 8):
-        print(f"❌ Python 3.8+ gerekli. Mevcut versiyon: {version.major}.{version.minor}")
+    if version.major < 3 or (version.major == 3 and version.minor < 9):
+        print(f"❌ Python 3.9+ gerekli. Mevcut versiyon: {version.major}.{version.minor}")
         return False
     print(f"✅ Python versiyonu: {version.major}.{version.minor}.{version.micro}")
     return True
@@ -0,0 +1,116 @@
+"""Word 97-2003 (.doc) çıkarıcı testleri - elle oluşturulan minimal OLE/CFB dosyalarıyla"""
+
+import struct
+from typing import Optional
+
+import pytest
+
+from app.services.extractors.word97 import DocFormatError, OLE_SIGNATURE, extract_doc_text, ole_stream_names
+
+_SECTOR = 512
+_END_OF_CHAIN = 0xFFFFFFFE
+_FREE_SECTOR = 0xFFFFFFFF
+_FAT_SECTOR = 0xFFFFFFFD
+# Mini akış kullanmamak için akışlar bu boyuta tamamlanır (mini stream cutoff)
+_STREAM_SIZE = 4096
+
+def _dir_entry(name: str, entry_type: int, start: int = _END_OF_CHAIN, size: int = 0,
+               child: int = _FREE_SECTOR, right: int = _FREE_SECTOR) -> bytes:
+    encoded = (name + "\0").encode("utf-16-le")
+    entry = bytearray(128)
+    entry[:len(encoded)] = encoded
+    struct.pack_into("<HBB", entry, 64, len(encoded), entry_type, 1)
+    struct.pack_into("<III", entry, 68, _FREE_SECTOR, right, child)
+    struct.pack_into("<II", entry, 116, start, size)
+    return bytes(entry)
+
+def build_ole(streams: dict) -> bytes:
+    """Sektör 0 = FAT, sektör 1 = dizin, sonrası akışlar (her biri >= 4096 byte)"""
+    fat = [_FAT_SECTOR, _END_OF_CHAIN]
+    entries = [_dir_entry("Root Entry", 5, child=1)]
+    body = b""
+    for index, (name, data) in enumerate(streams.items(), start=1):
+        data = data.ljust(_STREAM_SIZE, b"\0")
+        sectors = -(-len(data) // _SECTOR)
+        first = len(fat)
+        fat.extend(range(first + 1, first + sectors))
+        fat.append(_END_OF_CHAIN)
+        right = index + 1 if index < len(streams) else _FREE_SECTOR
+        entries.append(_dir_entry(name, 2, first, len(data), right=right))
+        body += data.ljust(sectors * _SECTOR, b"\0")
+    assert len(fat) <= _SECTOR // 4 and len(entries) <= _SECTOR // 128
+
+    header = bytearray(_SECTOR)
+    header[:8] = OLE_SIGNATURE
+    struct.pack_into("<HHHHH", header, 0x18, 0x3E, 3, 0xFFFE, 9, 6)
+    struct.pack_into("<IIIIIIII", header, 0x2C, 1, 1, 0, _STREAM_SIZE, _END_OF_CHAIN, 0, _END_OF_CHAIN, 0)
+    struct.pack_into("<109I", header, 0x4C, 0, *([_FREE_SECTOR] * 108))
+
+    fat_sector = struct.pack(f"<{len(fat)}I", *fat).ljust(_SECTOR, b"\xff")
+    directory = b"".join(entries).ljust(_SECTOR, b"\0")
+    return bytes(header) + fat_sector + directory + body
+
+def build_doc(pieces, use_1table: bool = True, flags: int = 0, ccp_text: Optional[int] = None) -> bytes:
+    """Parçaları (metin, sıkıştırılmış mı) piece table ile WordDocument akışına yerleştir"""
+    word = bytearray(_STREAM_SIZE)
+    text_offset = 0x800
+    cps, descriptors, cp = [0], [], 0
+    for text, compressed in pieces:
+        encoded = text.encode("cp1252" if compressed else "utf-16-le")
+        word[text_offset:text_offset + len(encoded)] = encoded
+        fc_value = (text_offset * 2) | 0x40000000 if compressed else text_offset
+        descriptors.append(struct.pack("<HIH", 0, fc_value, 0))
+        text_offset += len(encoded)
+        cp += len(text)
+        cps.append(cp)
+
+    plc_pcd = struct.pack(f"<{len(cps)}I", *cps) + b"".join(descriptors)
+    clx = b"\x02" + struct.pack("<I", len(plc_pcd)) + plc_pcd
+    table = bytes(0x10) + clx
+
+    # FibBase
+    flags |= 0x0200 if use_1table else 0
+    struct.pack_into("<HH", word, 0, 0xA5EC, 0x00C1)
+    struct.pack_into("<H", word, 0x0A, flags)
+    # fibRgW (14 kelime), fibRgLw (22 uzun - [3] = ccpText), fibRgFcLcb (93 çift - [33] = Clx)
+    struct.pack_into("<H", word, 32, 14)
+    struct.pack_into("<H", word, 62, 22)
+    struct.pack_into("<i", word, 64 + 3 * 4, cp if ccp_text is None else ccp_text)
+    struct.pack_into("<H", word, 152, 93)
+    struct.pack_into("<II", word, 154 + 33 * 8, 0x10, len(clx))
+
+    return build_ole({"WordDocument": bytes(word), "1Table" if use_1table else "0Table": table})
+
+PIECES = [
+    ("Rapor 2024\rSayfa \x13 PAGE \x143\x15\r", True),
+    ("Gizli \x13HYPERLINK \"http://ornek\"\x14bağlantı\x15 metni\rA\x07B\x07\x07", False),
+]
+
+@pytest.mark.parametrize("use_1table", [True, False])
+def test_extracts_pieces_and_field_results(tmp_path, use_1table):
+    path = tmp_path / "ornek.doc"
+    path.write_bytes(build_doc(PIECES, use_1table=use_1table))
+
+    assert extract_doc_text(str(path)) == "Rapor 2024\nSayfa 3\nGizli bağlantı metni\nA | B"
+
+def test_text_beyond_ccp_text_is_ignored(tmp_path):
+    path = tmp_path / "kisa.doc"
+    path.write_bytes(build_doc([("Ana metin\r", True), ("Makro çöpü\r", False)], ccp_text=len("Ana metin\r")))
+    assert extract_doc_text(str(path)) == "Ana metin"
+
+def test_stream_names(tmp_path):
+    path = tmp_path / "ornek.doc"
+    path.write_bytes(build_doc(PIECES))
+    assert ole_stream_names(str(path)) == {"WordDocument", "1Table"}
+
+def test_rejects_encrypted_document(tmp_path):
+    path = tmp_path / "sifreli.doc"
+    path.write_bytes(build_doc(PIECES, flags=0x0100))
+    with pytest.raises(DocFormatError):
+        extract_doc_text(str(path))
+
+def test_rejects_non_ole_file(tmp_path):
+    path = tmp_path / "sahte.doc"
+    path.write_bytes(b"PK\x03\x04" + bytes(600))
+    with pytest.raises(DocFormatError):
+        extract_doc_text(str(path))